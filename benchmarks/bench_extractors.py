@@ -0,0 +1,225 @@
+"""离线测量各提取函数的吞吐量和每页内存分配，与保存的基线比较
+
+对语料中的每类页面运行对应的提取函数（见 corpus.build_extractors），每个函数跑多轮取最快一轮，
+再用 tracemalloc 单独跑一遍记录每页的峰值分配。吞吐量受机器和当时负载影响，每轮之前先跑一段
+固定的HTML解析负载作为校准，比较的是吞吐量与校准速度之比；分配量与机器无关，直接比较。
+吞吐量下降或分配增加超过容差时返回非零退出码。
+
+分配量取决于解析后端和JSON库（装有 orjson 时 ifeng_alldata 用它解码 allData），
+基线按"解析后端+JSON库"分别保存，只与本环境对应的基线比较；--no-orjson 可在装有 orjson
+的机器上测量标准库 json 的情况，用来生成另一份基线。
+
+仓库自带的语料是 make_pages.py 生成的合成页面，不是从网站保存的真实页面，
+吞吐量和分配量只用于发现提取函数自身的回归，不代表线上页面的实际数字。
+
+用法:
+    python benchmarks/make_pages.py                      # 语料不存在时先生成
+    python benchmarks/bench_extractors.py                 # 与基线比较
+    python benchmarks/bench_extractors.py --update-baseline
+    python benchmarks/bench_extractors.py --no-orjson --update-baseline
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import time
+import tracemalloc
+from html.parser import HTMLParser
+
+from corpus import DEFAULT_CORPUS_DIR, load_pages, build_extractors, run_quietly
+
+import html_parser
+import ifeng_alldata
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline_extractors.json')
+
+
+class _TextCollector(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.parts = []
+
+    def handle_data(self, data):
+        self.parts.append(data.strip())
+
+
+CALIBRATION_DOCUMENT = ''.join(f'<div class="item"><a href="/news/{i}">海军某驱逐舰支队开展远海训练{i}</a>'
+                               f'<p>参训官兵克服困难，圆满完成各项训练任务。</p></div>' for i in range(200))
+
+
+def calibration_round(count=5):
+    """用标准库 HTMLParser 解析固定的HTML count 次，返回耗时（秒）"""
+    start = time.perf_counter()
+    for _ in range(count):
+        collector = _TextCollector()
+        collector.feed(CALIBRATION_DOCUMENT)
+        collector.close()
+    return (time.perf_counter() - start) / count
+
+
+def passes_per_round(func, kind_pages, min_round_seconds):
+    """每轮把语料重复跑几遍，使一轮至少 min_round_seconds 秒，太短的一轮受调度抖动影响大"""
+    start = time.perf_counter()
+    for _, html_content in kind_pages:
+        run_quietly(func, html_content)
+    elapsed = time.perf_counter() - start
+    return max(1, int(min_round_seconds / max(elapsed, 1e-6)) + 1)
+
+
+def measure_speed(func, kind_pages, repeat, min_round_seconds=0.2):
+    """校准和提取交替跑 repeat 轮，返回(最快一轮的每秒页数, 最快的每秒校准次数)"""
+    passes = passes_per_round(func, kind_pages, min_round_seconds)
+    calibration_count = max(5, int(min_round_seconds / calibration_round()) + 1)
+    best_run = best_calibration = None
+    for _ in range(repeat):
+        calibration = calibration_round(calibration_count)
+        start = time.perf_counter()
+        for _ in range(passes):
+            for _, html_content in kind_pages:
+                run_quietly(func, html_content)
+        elapsed = (time.perf_counter() - start) / passes
+        best_run = elapsed if best_run is None else min(best_run, elapsed)
+        best_calibration = calibration if best_calibration is None else min(best_calibration, calibration)
+    return len(kind_pages) / best_run, 1 / best_calibration
+
+
+def measure_memory(func, kind_pages):
+    """每页的平均峰值分配（KB）
+
+    测量时关闭循环垃圾回收，解析树的引用环不会在随机时刻被回收，峰值每次相同。
+    """
+    peaks = []
+    gc.collect()
+    gc.disable()
+    tracemalloc.start()
+    try:
+        for _, html_content in kind_pages:
+            tracemalloc.reset_peak()
+            baseline, _ = tracemalloc.get_traced_memory()
+            run_quietly(func, html_content)
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - baseline)
+            gc.collect()
+    finally:
+        tracemalloc.stop()
+        gc.enable()
+    return sum(peaks) / len(peaks) / 1024
+
+
+def environment_key(backend):
+    """基线按环境区分：解析后端+JSON库"""
+    json_backend = 'orjson' if ifeng_alldata.orjson is not None else 'json'
+    return f"{backend}+{json_backend}"
+
+
+def is_synthetic(pages):
+    return all(filename.startswith('synthetic_') for kind_pages in pages.values() for filename, _ in kind_pages)
+
+
+def run_benchmarks(pages, extractors, repeat):
+    results = {}
+    for kind, kind_pages in pages.items():
+        for name, func in extractors.get(kind, []):
+            # 预热一遍，排除第一次调用的导入和缓存开销
+            for _, html_content in kind_pages:
+                run_quietly(func, html_content)
+            pages_per_second, calibration = measure_speed(func, kind_pages, repeat)
+            results[name] = {
+                'kind': kind,
+                'pages': len(kind_pages),
+                'pages_per_second': round(pages_per_second, 2),
+                # 每秒页数与每秒校准次数之比，跨机器比较用这个值
+                'relative_speed': round(pages_per_second / calibration, 4),
+                'peak_kb_per_page': round(measure_memory(func, kind_pages), 1),
+            }
+    return results
+
+
+def compare(results, baseline, speed_tolerance, memory_tolerance):
+    """返回 {提取函数: [回归说明]}，吞吐量按相对校准的速度比较"""
+    regressions = {}
+    for name, result in results.items():
+        base = baseline.get('extractors', {}).get(name)
+        if base is None:
+            continue
+        problems = []
+        change = result['relative_speed'] / base['relative_speed'] - 1
+        if change < -speed_tolerance:
+            problems.append(f"相对吞吐量下降 {-change:.0%}（{result['pages_per_second']:.1f} 页/秒）")
+        if result['peak_kb_per_page'] > base['peak_kb_per_page'] * (1 + memory_tolerance):
+            problems.append(f"每页峰值分配 {result['peak_kb_per_page']:.0f}KB，基线 {base['peak_kb_per_page']:.0f}KB")
+        if problems:
+            regressions[name] = problems
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="提取函数离线基准测试")
+    parser.add_argument('--corpus', default=DEFAULT_CORPUS_DIR, help="已保存页面所在目录")
+    parser.add_argument('--repeat', type=int, default=5, help="每个提取函数跑的轮数，取最快一轮")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="基线文件")
+    parser.add_argument('--update-baseline', action='store_true', help="用本次结果覆盖基线")
+    parser.add_argument('--speed-tolerance', type=float, default=0.25, help="允许的吞吐量下降比例")
+    parser.add_argument('--memory-tolerance', type=float, default=0.25, help="允许的分配增加比例")
+    parser.add_argument('--no-orjson', action='store_true', help="即使装有 orjson 也用标准库 json 解码 allData")
+    args = parser.parse_args()
+
+    if args.no_orjson:
+        ifeng_alldata.orjson = None
+
+    pages = load_pages(args.corpus)
+    if not pages:
+        print(f"语料目录中没有页面: {args.corpus}，先运行 python benchmarks/make_pages.py")
+        return 1
+
+    backend = html_parser.get_parser_backend()
+    environment = environment_key(backend)
+    print(f"语料: {sum(len(items) for items in pages.values())} 个页面, 环境: {environment}")
+    if is_synthetic(pages):
+        print("注意: 语料全部是 make_pages.py 生成的合成页面，不是真实的新浪/凤凰网页面，"
+              "下面的数字只用于和基线比较，不代表线上页面的吞吐量")
+
+    results = run_benchmarks(pages, build_extractors(), args.repeat)
+
+    print(f"\n{'提取函数':<56}{'页/秒':>10}{'相对速度':>10}{'峰值KB/页':>12}")
+    for name, result in results.items():
+        print(f"{name:<56}{result['pages_per_second']:>10.1f}{result['relative_speed']:>10.3f}"
+              f"{result['peak_kb_per_page']:>12.1f}")
+
+    baselines = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            baselines = json.load(f).get('environments', {})
+
+    if args.update_baseline:
+        baselines[environment] = {
+            'python': platform.python_version(),
+            'synthetic_corpus': is_synthetic(pages),
+            'extractors': results,
+        }
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({'environments': baselines}, f, ensure_ascii=False, indent=2)
+            f.write('\n')
+        print(f"\n基线已更新: {args.baseline} ({environment})")
+        return 0
+
+    baseline = baselines.get(environment)
+    if baseline is None:
+        print(f"\n基线文件中没有 {environment} 环境的基线（已有: {', '.join(baselines) or '无'}），"
+              f"使用 --update-baseline 生成")
+        return 0
+
+    regressions = compare(results, baseline, args.speed_tolerance, args.memory_tolerance)
+    if regressions:
+        print("\n性能回归:")
+        for name, problems in regressions.items():
+            for problem in problems:
+                print(f"   {name}: {problem}")
+        return 1
+    print("\n与基线相比没有性能回归")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,86 @@
+"""测量爬虫模块的导入耗时，并检查导入时没有加载重量级依赖
+
+每个模块在新的子进程中用 python -X importtime 导入，取多轮中的最小值。
+导入时加载了禁止的依赖或超过时间预算时返回非零退出码，可作为启动速度的守卫。
+
+用法: python benchmarks/bench_import_time.py [--modules 模块 ...] [--repeat 次数] [--budget-ms 毫秒]
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MODULES = ('sina_txt_crawler', 'sina_image_crawler', 'ifeng_txt_crawler', 'ifeng_picture_crawler')
+# 只应在第一次使用时加载的依赖（分析模块只在 --profile 时需要）
+HEAVY_PACKAGES = ('pandas', 'playwright', 'bs4', 'lxml', 'requests', 'urllib3', 'openpyxl',
+                  'cProfile', 'pstats', 'tracemalloc')
+
+
+def measure_import(module):
+    """在子进程中导入模块，返回(累计耗时微秒, [(自身耗时微秒, 模块名)])"""
+    env = dict(os.environ, PYTHONPATH=ROOT_DIR)
+    completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                               cwd=ROOT_DIR, env=env, capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f"导入 {module} 失败:\n{completed.stderr}")
+
+    total = None
+    imports = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        name = name.strip()
+        if name == 'site':
+            # 解释器启动时 site 导入的模块不算在被测模块头上
+            imports = []
+            continue
+        imports.append((int(self_us), name))
+        if name == module:
+            total = int(cumulative_us)
+    return total, imports
+
+
+def heavy_imports(imports):
+    """导入过程中加载的重量级顶层包"""
+    loaded = {name.split('.')[0] for _, name in imports}
+    return sorted(loaded.intersection(HEAVY_PACKAGES))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="爬虫模块导入耗时基准测试")
+    parser.add_argument('--modules', nargs='+', default=list(DEFAULT_MODULES), help="要测量的模块")
+    parser.add_argument('--repeat', type=int, default=5, help="每个模块导入的轮数，取最小值")
+    parser.add_argument('--budget-ms', type=float, default=150.0, help="单个模块导入耗时上限（毫秒）")
+    parser.add_argument('--top', type=int, default=5, help="列出自身耗时最多的导入数")
+    args = parser.parse_args()
+
+    failed = False
+    print(f"{'模块':<24}{'导入耗时(ms)':>14}  重量级依赖")
+    for module in args.modules:
+        runs = [measure_import(module) for _ in range(args.repeat)]
+        total, imports = min(runs, key=lambda run: run[0])
+        heavy = heavy_imports(imports)
+        total_ms = total / 1000
+
+        over_budget = total_ms > args.budget_ms
+        failed = failed or over_budget or bool(heavy)
+        status = ", ".join(heavy) if heavy else "无"
+        if over_budget:
+            status += f" (超过预算 {args.budget_ms:.0f}ms)"
+        print(f"{module:<24}{total_ms:>14.1f}  {status}")
+
+        slowest = sorted(imports, reverse=True)[:args.top]
+        print("    " + ", ".join(f"{name} {self_us / 1000:.1f}ms" for self_us, name in slowest))
+
+    if failed:
+        print("\n导入守卫未通过：重量级依赖应在第一次使用时再导入")
+        return 1
+    print("\n导入守卫通过")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,74 @@
+"""比较不同HTML解析后端的提取速度，并校验提取结果是否一致
+
+用法: python benchmarks/bench_parsers.py [--corpus 目录] [--repeat 次数] [--backends lxml html.parser]
+"""
+import argparse
+import time
+
+from corpus import DEFAULT_CORPUS_DIR, load_pages, build_extractors, run_quietly
+
+import html_parser
+
+
+def run_backend(backend, pages, extractors, repeat):
+    """用指定后端跑完整个语料，返回(页数/秒, {(提取函数, 文件名): 结果})"""
+    html_parser.set_parser_backend(backend)
+    outputs = {}
+    page_count = 0
+
+    start = time.perf_counter()
+    for round_index in range(repeat):
+        for kind, kind_pages in pages.items():
+            for filename, html_content in kind_pages:
+                page_count += 1
+                for name, func in extractors[kind]:
+                    result = run_quietly(func, html_content)
+                    if round_index == 0:
+                        outputs[(name, filename)] = result
+    elapsed = time.perf_counter() - start
+
+    return page_count / elapsed if elapsed else 0.0, outputs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTML解析后端基准测试")
+    parser.add_argument('--corpus', default=DEFAULT_CORPUS_DIR, help="已保存页面所在目录")
+    parser.add_argument('--repeat', type=int, default=5, help="每个后端重复的轮数")
+    parser.add_argument('--backends', nargs='+', default=None, help="要测试的后端，默认全部可用后端")
+    args = parser.parse_args()
+
+    pages = load_pages(args.corpus)
+    if not pages:
+        print(f"语料目录中没有页面: {args.corpus}")
+        return 1
+
+    extractors = build_extractors()
+    backends = args.backends or html_parser.available_backends()
+    print(f"语料: {sum(len(items) for items in pages.values())} 个页面, 重复 {args.repeat} 轮")
+
+    # 以 html.parser 的结果为基准
+    _, reference = run_backend('html.parser', pages, extractors, 1)
+
+    results = []
+    for backend in backends:
+        pages_per_sec, outputs = run_backend(backend, pages, extractors, args.repeat)
+        mismatches = sorted({name for (name, filename), result in outputs.items()
+                             if result != reference.get((name, filename))})
+        results.append((backend, pages_per_sec, mismatches))
+
+    html_parser.set_parser_backend(html_parser.DEFAULT_BACKEND)
+
+    print(f"\n{'后端':<14}{'页/秒':>10}  结果")
+    for backend, pages_per_sec, mismatches in sorted(results, key=lambda item: -item[1]):
+        status = "与 html.parser 一致" if not mismatches else "不一致: " + ", ".join(mismatches)
+        print(f"{backend:<14}{pages_per_sec:>10.1f}  {status}")
+
+    identical = [item for item in results if not item[2]]
+    if identical:
+        fastest = max(identical, key=lambda item: item[1])
+        print(f"\n结果一致的后端中最快的是: {fastest[0]} (设置 CRAWLER_HTML_PARSER={fastest[0]})")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,98 @@
+"""基准测试用的已保存页面加载和提取函数注册
+
+页面按类型放在 pages/<类型>/*.html 下，类型见 PAGE_KINDS。
+"""
+import contextlib
+import io
+import os
+import sys
+import tempfile
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+DEFAULT_CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pages')
+PAGE_KINDS = ('sina_list', 'sina_article', 'ifeng_list', 'ifeng_article')
+
+# 提取函数需要的文章信息（与列表页发现的字段一致）
+SINA_ARTICLE_INFO = {'title': '基准测试文章', 'link': 'https://mil.news.sina.com.cn/benchmark.shtml', 'time': ''}
+IFENG_ARTICLE_INFO = {'title': '基准测试文章', 'url': 'https://mil.ifeng.com/c/benchmark', 'news_time': ''}
+
+
+class StaticPage:
+    """模拟 Playwright page，只提供 content()"""
+
+    def __init__(self, html_content):
+        self.html_content = html_content
+
+    def content(self):
+        return self.html_content
+
+
+def load_pages(corpus_dir=DEFAULT_CORPUS_DIR):
+    """读取语料，返回 {类型: [(文件名, HTML)]}"""
+    pages = {}
+    for kind in PAGE_KINDS:
+        kind_dir = os.path.join(corpus_dir, kind)
+        if not os.path.isdir(kind_dir):
+            continue
+        for filename in sorted(os.listdir(kind_dir)):
+            if not filename.endswith(('.html', '.htm')):
+                continue
+            with open(os.path.join(kind_dir, filename), 'r', encoding='utf-8') as f:
+                pages.setdefault(kind, []).append((filename, f.read()))
+    return pages
+
+
+def build_extractors():
+    """返回 {页面类型: [(提取函数名, func(html))]}"""
+    from sina_txt_crawler import SinaMilitaryTextCrawler
+    from sina_image_crawler import SinaMilitaryImageCrawler
+    from ifeng_txt_crawler import PhoenixTextCrawler
+    from ifeng_picture_crawler import PhoenixNewsImageCrawler
+
+    # 爬虫构造时会创建输出目录，放到临时目录里避免污染仓库
+    work_dir = tempfile.mkdtemp(prefix='crawler_bench_')
+    old_cwd = os.getcwd()
+    os.chdir(work_dir)
+    try:
+        sina_text = SinaMilitaryTextCrawler()
+        sina_image = SinaMilitaryImageCrawler()
+        ifeng_text = PhoenixTextCrawler(os.path.join(work_dir, 'test'))
+        ifeng_image = PhoenixNewsImageCrawler(os.path.join(work_dir, 'test'))
+    finally:
+        os.chdir(old_cwd)
+
+    def ifeng_article_urls(html_content):
+        ifeng_image.get_page_content = lambda url: html_content
+        return ifeng_image.get_article_urls()
+
+    return {
+        'sina_list': [
+            ('SinaMilitaryTextCrawler.extract_articles_from_playwright_page',
+             lambda html: sina_text.extract_articles_from_playwright_page(StaticPage(html))),
+        ],
+        'sina_article': [
+            ('SinaMilitaryTextCrawler.extract_text_from_article',
+             lambda html: sina_text.extract_text_from_article(html, SINA_ARTICLE_INFO)),
+            ('SinaMilitaryImageCrawler.extract_images_from_article',
+             lambda html: sina_image.extract_images_from_article(html, SINA_ARTICLE_INFO['title'])),
+        ],
+        'ifeng_list': [
+            ('PhoenixTextCrawler.extract_articles_from_html', ifeng_text.extract_articles_from_html),
+            ('PhoenixNewsImageCrawler.get_article_urls', ifeng_article_urls),
+        ],
+        'ifeng_article': [
+            ('PhoenixTextCrawler.extract_text_from_article',
+             lambda html: ifeng_text.extract_text_from_article(html, IFENG_ARTICLE_INFO)),
+            ('PhoenixNewsImageCrawler.extract_images_from_article',
+             lambda html: ifeng_image.extract_images_from_article(html, IFENG_ARTICLE_INFO)),
+        ],
+    }
+
+
+def run_quietly(func, *args):
+    """执行提取函数并屏蔽其打印输出"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args)
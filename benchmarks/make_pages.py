@@ -0,0 +1,162 @@
+"""生成基准测试用的合成页面语料
+
+页面按新浪、凤凰网列表页和文章页的结构合成（卡片列表、正文容器、allData 脚本变量、
+导航和内联脚本等页面噪声），内容由固定种子生成，每次运行结果相同。
+合成页面只用于离线测量提取速度，不代表真实页面的全部写法；
+可以把浏览器保存的真实页面放进同一目录一起测试。
+
+用法: python benchmarks/make_pages.py [--corpus 目录] [--pages 每类页数]
+"""
+import argparse
+import json
+import os
+import random
+
+from corpus import DEFAULT_CORPUS_DIR
+
+SENTENCES = (
+    "海军某驱逐舰支队近日组织多艘舰艇开展远海实战化训练，检验编队协同作战能力。",
+    "训练中，各舰围绕防空反导、对海攻击和反潜作战等课目展开连贯演练。",
+    "据介绍，此次训练全程不预设脚本，导演部临机导调多种复杂情况。",
+    "专家表示，这类训练有助于提升部队在复杂电磁环境下的指挥控制水平。",
+    "空军航空兵某旅组织新型战机开展夜间低空突防训练，飞行员连续完成多个高难度动作。",
+    "参训官兵克服气象条件多变等困难，圆满完成各项训练任务。",
+    "陆军某合成旅在高原地区开展实弹射击考核，多型火炮对目标实施精确打击。",
+    "此次考核重点检验分队在陌生地域快速机动和精确打击的能力。",
+    "相关负责人介绍，下一步将继续深化实战化训练，推动战斗力稳步提升。",
+    "火箭军某旅组织跨区机动演练，检验部队全天候快速反应能力。",
+)
+TITLE_WORDS = ("远海", "联合", "实战化", "演练", "编队", "夜间", "高原", "实弹", "机动", "协同", "训练", "考核")
+NAV_ITEMS = ("首页", "新闻", "军事", "国际", "体育", "财经", "科技", "汽车", "房产", "教育", "健康", "旅游")
+
+
+def sentence_block(rng, count):
+    return "".join(rng.choice(SENTENCES) for _ in range(count))
+
+
+def title(rng, index):
+    return "".join(rng.sample(TITLE_WORDS, 4)) + f"：第{index}期军事观察"
+
+
+def noise(rng, count=40):
+    """导航、推荐链接和内联脚本，模拟真实页面中与正文无关的部分"""
+    nav = "".join(f'<li><a href="https://news.example.com/{i}">{rng.choice(NAV_ITEMS)}</a></li>'
+                  for i in range(count))
+    script = "var config = " + json.dumps({f"key{i}": "x" * rng.randint(20, 80) for i in range(count)}) + ";"
+    style = "".join(f".c{i}{{margin:{i}px;padding:{i % 7}px}}" for i in range(count))
+    return f'<style>{style}</style><ul class="nav">{nav}</ul><script>{script}</script>'
+
+
+def sina_list(rng, page_index):
+    cards = []
+    for i in range(60):
+        article_id = f"{page_index:02d}{i:04d}"
+        cards.append(
+            f'<div class="ty-card ty-card-type1"><div class="ty-card-l">'
+            f'<img src="https://n.sinaimg.cn/mil/thumb/{article_id}.jpg"></div>'
+            f'<div class="ty-card-r"><h2><a href="https://mil.news.sina.com.cn/china/2024-05-{i % 28 + 1:02d}/'
+            f'doc-{article_id}.shtml" target="_blank">{title(rng, i)}</a></h2>'
+            f'<div class="ty-card-tip"><span class="ty-card-time">05月{i % 28 + 1:02d}日 {i % 24:02d}:30</span>'
+            f'</div></div></div>')
+    return (f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>新浪军事</title>{noise(rng)}</head>'
+            f'<body><div class="header">{noise(rng)}</div>'
+            f'<div class="ty-cardlist-w">{"".join(cards)}</div>'
+            f'<div class="ty-cardlist-more"><span>加载更多</span></div>{noise(rng)}</body></html>')
+
+
+def sina_article(rng, page_index):
+    paragraphs = []
+    for i in range(30):
+        paragraphs.append(f'<p>{sentence_block(rng, rng.randint(2, 5))}</p>')
+        if i % 6 == 2:
+            paragraphs.append(f'<div class="img_wrapper"><img src="//n.sinaimg.cn/mil/transform/{page_index}_{i}.jpg" '
+                              f'alt="配图"><span class="img_descr">{rng.choice(SENTENCES)}</span></div>')
+    paragraphs.append('<img src="https://i.sso.sina.com.cn/images/login/icon.png">')
+    paragraphs.append('<script>var ad = {"slot": 1};</script>')
+    return (f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>{title(rng, page_index)}</title>'
+            f'{noise(rng)}</head><body><div class="top-nav">{noise(rng)}</div>'
+            f'<div class="main-content"><h1 class="main-title">{title(rng, page_index)}</h1>'
+            f'<div class="date-source"><span class="date">2024年05月{page_index + 1:02d}日 08:30</span>'
+            f'<a class="source" href="https://mil.news.sina.com.cn/">新浪军事</a></div>'
+            f'<div class="article" id="artibody">{"".join(paragraphs)}</div></div>'
+            f'<div class="footer">{noise(rng)}</div></body></html>')
+
+
+def ifeng_list(rng, page_index):
+    items = []
+    stream = []
+    for i in range(60):
+        article_id = f"8{page_index:02d}{i:05d}"
+        news_title = title(rng, i)
+        news_time = f"2024-05-{i % 28 + 1:02d} {i % 24:02d}:15:00"
+        items.append(
+            f'<li class="news_item" data-id="{article_id}"><a class="news-stream-newsStream-image-link" '
+            f'href="//mil.ifeng.com/c/{article_id}"><img src="https://d.ifengimg.com/q100/{article_id}.jpg"></a>'
+            f'<div class="news-stream-newsStream-text"><h2><a href="//mil.ifeng.com/c/{article_id}" '
+            f'title="{news_title}">{news_title}</a></h2><time>{news_time}</time></div></li>')
+        stream.append({'id': article_id, 'title': news_title, 'url': f"https://mil.ifeng.com/c/{article_id}",
+                       'newsTime': news_time, 'thumbnails': {'image': [{'url': f"https://d.ifengimg.com/{article_id}.jpg"}]},
+                       'summary': rng.choice(SENTENCES)})
+
+    all_data = json.dumps({'newsstream': stream, 'nav': list(NAV_ITEMS)}, ensure_ascii=False)
+    if page_index % 2:
+        # 部分页面的 allData 带有多余的逗号，需要走括号匹配修复的慢路径
+        all_data = all_data[:-1] + ',}'
+    return (f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>凤凰网军事</title>{noise(rng)}'
+            f'<script>var allData = {all_data};\nvar adKeys = [];</script></head>'
+            f'<body>{noise(rng)}<ul class="news-stream-basic-news-list">{"".join(items)}</ul>'
+            f'{noise(rng)}</body></html>')
+
+
+def ifeng_article(rng, page_index):
+    paragraphs = "".join(f'<p>{sentence_block(rng, rng.randint(2, 5))}</p>' for _ in range(30))
+    slides = [{'type': 'pic', 'url': f"https://d.ifengimg.com/ucms/2024_20/{page_index}_{i}.jpg",
+               'description': rng.choice(SENTENCES), 'width': 1080, 'height': 720}
+              for i in range(8)]
+    images = "".join(f'<p class="detailPic"><img src="https://d.ifengimg.com/ucms/2024_20/{page_index}_{i}.jpg" '
+                     f'alt="配图"></p>' for i in range(8))
+
+    if page_index % 2:
+        # 没有 allData 的页面，图片只能从 img 标签中提取
+        script = '<script>var pageConfig = {"type": "article"};</script>'
+    else:
+        all_data = json.dumps({'docData': {'title': title(rng, page_index), 'contentData': {'text': '}; 正文'}},
+                               'slideData': slides}, ensure_ascii=False)
+        script = f'<script>var allData = ({all_data});</script>'
+
+    return (f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>{title(rng, page_index)}</title>'
+            f'{noise(rng)}{script}</head><body><div class="header">{noise(rng)}</div>'
+            f'<h1 class="topic">{title(rng, page_index)}</h1>'
+            f'<div class="info"><span class="time">2024年05月{page_index + 1:02d}日 09:00</span></div>'
+            f'<div class="article-content"><div class="text">{paragraphs}{images}</div></div>'
+            f'<div class="footer">{noise(rng)}</div></body></html>')
+
+
+GENERATORS = {
+    'sina_list': sina_list,
+    'sina_article': sina_article,
+    'ifeng_list': ifeng_list,
+    'ifeng_article': ifeng_article,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="生成合成页面语料")
+    parser.add_argument('--corpus', default=DEFAULT_CORPUS_DIR, help="语料目录")
+    parser.add_argument('--pages', type=int, default=4, help="每类页面数")
+    args = parser.parse_args()
+
+    for kind, generate in GENERATORS.items():
+        kind_dir = os.path.join(args.corpus, kind)
+        os.makedirs(kind_dir, exist_ok=True)
+        for page_index in range(args.pages):
+            rng = random.Random(f"{kind}-{page_index}")
+            path = os.path.join(kind_dir, f"synthetic_{page_index + 1:02d}.html")
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(generate(rng, page_index))
+        print(f"{kind}: {args.pages} 个页面 -> {kind_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
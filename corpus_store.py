@@ -0,0 +1,197 @@
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+
+
+class _Shard:
+    """一个分片目录，顺序追加到当前段文件，超过大小上限时换新段"""
+
+    def __init__(self, directory, segment_size):
+        self.directory = directory
+        self.segment_size = segment_size
+        self.lock = threading.Lock()
+        self.file = None
+        self.segment_path = None
+        self.dirty = False
+        os.makedirs(directory, exist_ok=True)
+
+        segments = sorted(name for name in os.listdir(directory) if name.endswith('.dat'))
+        self.segment_number = int(segments[-1][4:10]) if segments else 1
+
+    def _open(self):
+        self.segment_path = os.path.join(self.directory, f"seg-{self.segment_number:06d}.dat")
+        self.file = open(self.segment_path, 'ab')
+
+    def append(self, header, source, length):
+        """写入一条记录，返回(段文件路径, 数据起始偏移)；调用方持有 lock"""
+        if self.file is None:
+            self._open()
+        elif self.file.tell() >= self.segment_size:
+            self.sync()
+            self.file.close()
+            self.segment_number += 1
+            self._open()
+
+        self.file.write(header)
+        offset = self.file.tell()
+        if isinstance(source, bytes):
+            self.file.write(source)
+        else:
+            shutil.copyfileobj(source, self.file, 1024 * 1024)
+        self.file.write(b'\n')
+        if self.file.tell() - offset - 1 != length:
+            raise IOError("写入长度与记录不一致")
+        self.dirty = True
+        return self.segment_path, offset
+
+    def sync(self):
+        if self.file is not None and self.dirty:
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.dirty = False
+
+    def close(self):
+        if self.file is not None:
+            self.sync()
+            self.file.close()
+            self.file = None
+
+
+class SegmentStore:
+    """分段追加存储，代替每条一个小文件
+
+    记录按名称哈希分到 shards 个子目录，每个分片顺序追加到 seg-000001.dat 这样的段文件，
+    单个段超过 segment_size 后换新段。每条记录前有一行JSON头（名称和长度），
+    段文件本身可以顺序扫描恢复。偏移索引保存在 SQLite 中，
+    每写入 fsync_every 条先 fsync 段文件再提交索引，索引不会指向未落盘的数据。
+    可在多个线程中调用，不同分片可并行写入。
+
+    爬虫每次运行都从 001 开始命名，索引中的键为「run_id/名称」，多次运行写入同一个存储
+    不会互相覆盖；同一次运行中重复的名称抛出 ValueError。run_id 默认按启动时间和随机数生成。
+    """
+
+    def __init__(self, root="corpus", segment_size=256 * 1024 * 1024, shards=16, fsync_every=64,
+                 run_id=None):
+        self.root = root
+        self.shard_count = shards
+        self.fsync_every = fsync_every
+        self.run_id = run_id or f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        os.makedirs(root, exist_ok=True)
+
+        self.shards = [_Shard(os.path.join(root, f"{i:02x}"), segment_size) for i in range(shards)]
+
+        self._index_lock = threading.Lock()
+        self._unsynced = 0
+        self.conn = sqlite3.connect(os.path.join(root, "index.db"), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS records ("
+            "name TEXT PRIMARY KEY, segment TEXT, offset INTEGER, length INTEGER)"
+        )
+        self.conn.commit()
+
+    def shard_for(self, name):
+        digest = hashlib.blake2b(name.encode('utf-8'), digest_size=4).digest()
+        return self.shards[int.from_bytes(digest, 'big') % self.shard_count]
+
+    @staticmethod
+    def locator(segment_path, offset, length):
+        """记录位置的文字表示，写入清单代替文件路径"""
+        return f"{os.path.abspath(segment_path)}@{offset}:{length}"
+
+    def key_for(self, name):
+        """本次运行中名称对应的索引键"""
+        return f"{self.run_id}/{name}"
+
+    def _append(self, name, source, length):
+        key = self.key_for(name)
+        shard = self.shard_for(key)
+        header = (json.dumps({'name': key, 'length': length}, ensure_ascii=False) + '\n').encode('utf-8')
+
+        with self._index_lock:
+            if self.conn.execute("SELECT 1 FROM records WHERE name = ?", (key,)).fetchone():
+                raise ValueError(f"存储中已有记录: {key}")
+
+        with shard.lock:
+            segment_path, offset = shard.append(header, source, length)
+
+        relative = os.path.relpath(segment_path, self.root)
+        with self._index_lock:
+            try:
+                self.conn.execute("INSERT INTO records VALUES (?, ?, ?, ?)", (key, relative, offset, length))
+            except sqlite3.IntegrityError:
+                # 检查之后另一个线程写入了同名记录，已追加的数据留在段文件中不被索引
+                raise ValueError(f"存储中已有记录: {key}") from None
+            self._unsynced += 1
+            if self._unsynced >= self.fsync_every:
+                self._sync_locked()
+
+        return self.locator(segment_path, offset, length)
+
+    def put(self, name, data):
+        """追加一条记录（bytes），返回位置字符串"""
+        return self._append(name, data, len(data))
+
+    def put_file(self, name, path):
+        """把已有文件（如下载的临时文件）的内容追加为一条记录，返回位置字符串"""
+        length = os.path.getsize(path)
+        with open(path, 'rb') as f:
+            return self._append(name, f, length)
+
+    def get(self, key):
+        """按索引键（见 key_for 和 names）读取记录内容，不存在时返回None"""
+        with self._index_lock:
+            row = self.conn.execute("SELECT segment, offset, length FROM records WHERE name = ?",
+                                    (key,)).fetchone()
+        if row is None:
+            return None
+
+        segment, offset, length = row
+        shard = self.shard_for(key)
+        with shard.lock:
+            if shard.file is not None:
+                shard.file.flush()
+        with open(os.path.join(self.root, segment), 'rb') as f:
+            f.seek(offset)
+            return f.read(length)
+
+    def names(self):
+        """全部记录的索引键，包括以前各次运行写入的记录"""
+        with self._index_lock:
+            return [row[0] for row in self.conn.execute("SELECT name FROM records ORDER BY name")]
+
+    def _sync_locked(self):
+        for shard in self.shards:
+            with shard.lock:
+                shard.sync()
+        self.conn.commit()
+        self._unsynced = 0
+
+    def flush(self):
+        """段文件落盘并提交索引"""
+        with self._index_lock:
+            self._sync_locked()
+
+    def close(self):
+        with self._index_lock:
+            for shard in self.shards:
+                with shard.lock:
+                    shard.close()
+            self.conn.commit()
+            self.conn.close()
+
+    def __len__(self):
+        with self._index_lock:
+            return self.conn.execute("SELECT COUNT(*) FROM records").fetchone()[0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
@@ -0,0 +1,256 @@
+"""多站点爬取调度：在一个进程内并发运行任意组合的四个爬虫
+
+各站点在自己的线程中运行，共用HTTP连接池、已处理URL索引、HTTP缓存和一个Chromium浏览器，
+全局请求预算限制所有站点同时在途的请求数，每个站点有自己的目标数量和输出目录。
+总耗时接近最慢的站点，而不是四个站点之和。
+
+用法:
+    python crawl_scheduler.py --sites sina_text ifeng_image --target 50
+    python crawl_scheduler.py --config crawl.json
+
+配置文件示例:
+    {
+        "max_concurrency": 32,
+        "shared_browser": true,
+        "crawlers": {
+            "sina_text": {"target": 100, "save_dir": "output/sina_text"},
+            "ifeng_image": {"target": 200, "max_workers": 8}
+        }
+    }
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from corpus_store import SegmentStore
+from http_cache import HttpCache
+from http_client import (get_politeness, get_request_policy, set_politeness, set_request_budget,
+                         set_request_policy)
+from journal import CrawlJournal
+from playwright_utils import SharedBrowser
+from politeness import PolitenessScheduler
+from request_policy import RequestPolicy
+from seen_index import SeenIndex
+
+DEFAULT_CONFIG = {
+    'max_concurrency': 32,
+    # 每个主机的初始请求速率（次/秒），之后按响应自动调整，最高不超过 max_request_rate；
+    # host_rates 单独指定个别主机的初始速率
+    'request_rate': 1.0,
+    'max_request_rate': 4.0,
+    'host_rates': {},
+    # 连接/读取超时（秒）、失败重试次数、慢请求是否对冲（会向站点多发重复请求，默认关闭）
+    'connect_timeout': 5,
+    'read_timeout': 15,
+    'retries': 3,
+    'hedge': False,
+    'shared_browser': True,
+    'lean_browser': True,
+    # 已处理URL索引文件，与单独运行的各爬虫默认共用同一个文件（见 seen_index.SeenIndex）
+    'seen_index': 'seen_index.db',
+    'http_cache': 'http_cache',
+    'output_dir': 'output',
+    'resume': False,
+    'crawlers': {},
+}
+
+# 每个站点的默认参数；save_dir 和 excel_file 未指定时按站点名放在 output_dir 下
+DEFAULT_SITE_CONFIG = {
+    'target': 100,
+    'max_workers': 8,
+    # 调度器是多线程进程，默认不 fork 解析进程池
+    'parse_workers': 0,
+    'discovery': 'playwright',
+    'store': None,
+}
+
+
+def run_sina_text(site, shared):
+    from sina_txt_crawler import SinaMilitaryTextCrawler
+
+    crawler = SinaMilitaryTextCrawler(max_workers=site['max_workers'], seen_index=shared['seen_index'],
+                                      http_cache=shared['http_cache'], discovery=site['discovery'],
+                                      lean_browser=shared['lean_browser'], parse_workers=site['parse_workers'],
+                                      journal=site['journal'], store=site['store'],
+                                      save_folder=site['save_dir'], excel_file=site['excel_file'])
+    return crawler.run(target_count=site['target'])['article_count']
+
+
+def run_sina_image(site, shared):
+    from sina_image_crawler import SinaMilitaryImageCrawler
+
+    crawler = SinaMilitaryImageCrawler(max_workers=site['max_workers'], seen_index=shared['seen_index'],
+                                       http_cache=shared['http_cache'], discovery=site['discovery'],
+                                       lean_browser=shared['lean_browser'], journal=site['journal'],
+                                       store=site['store'], images_folder=site['save_dir'],
+                                       excel_file=site['excel_file'])
+    crawler.max_images = site['target']
+    return crawler.run()['image_count']
+
+
+def run_ifeng_text(site, shared):
+    from ifeng_txt_crawler import PhoenixTextCrawler
+
+    crawler = PhoenixTextCrawler(site['save_dir'], seen_index=shared['seen_index'],
+                                 http_cache=shared['http_cache'], lean_browser=shared['lean_browser'],
+                                 max_workers=site['max_workers'], parse_workers=site['parse_workers'],
+                                 journal=site['journal'], store=site['store'], excel_file=site['excel_file'])
+    crawler.crawl_articles_text(target_count=site['target'])
+    return len(crawler.text_data)
+
+
+def run_ifeng_image(site, shared):
+    from ifeng_picture_crawler import PhoenixNewsImageCrawler
+
+    crawler = PhoenixNewsImageCrawler(site['save_dir'], max_workers=site['max_workers'],
+                                      seen_index=shared['seen_index'], http_cache=shared['http_cache'],
+                                      journal=site['journal'], store=site['store'],
+                                      excel_file=site['excel_file'])
+    crawler.crawl_articles_images(max_images=site['target'])
+    return len(crawler.image_data)
+
+
+# 站点名 -> 运行函数，爬虫模块在用到时才导入
+SITES = {
+    'sina_text': run_sina_text,
+    'sina_image': run_sina_image,
+    'ifeng_text': run_ifeng_text,
+    'ifeng_image': run_ifeng_image,
+}
+
+
+def load_config(path=None):
+    """读取JSON配置并补全默认值"""
+    config = dict(DEFAULT_CONFIG)
+    if path:
+        with open(path, encoding='utf-8') as f:
+            config.update(json.load(f))
+    config['crawlers'] = dict(config['crawlers'])
+    return config
+
+
+def site_config(name, config):
+    """某个站点的完整参数"""
+    if name not in SITES:
+        raise ValueError(f"未知站点: {name}，可选: {', '.join(SITES)}")
+    site = dict(DEFAULT_SITE_CONFIG)
+    site.update(config['crawlers'].get(name) or {})
+    site.setdefault('save_dir', os.path.join(config['output_dir'], name))
+    site.setdefault('excel_file', os.path.join(config['output_dir'], f"{name}.xlsx"))
+    site.setdefault('journal_path', os.path.join(site['save_dir'], f"{name}_journal.jsonl"))
+    return site
+
+
+def run_site(name, site, shared, resume):
+    """运行一个站点，出错不影响其他站点，返回运行结果"""
+    start_time = time.time()
+    result = {'site': name, 'ok': False, 'count': 0, 'error': None}
+    store = SegmentStore(site['store']) if site['store'] else None
+    try:
+        os.makedirs(site['save_dir'], exist_ok=True)
+        with CrawlJournal(site['journal_path'], resume=resume) as journal:
+            site = dict(site, journal=journal, store=store)
+            result['count'] = SITES[name](site, shared) or 0
+            result['ok'] = True
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+        print(f"[{name}] 运行失败: {result['error']}")
+    finally:
+        if store is not None:
+            store.close()
+        result['seconds'] = time.time() - start_time
+    return result
+
+
+def run_sites(config, names=None):
+    """并发运行配置中的站点，返回各站点的运行结果"""
+    names = list(names or config['crawlers'] or SITES)
+    sites = {name: site_config(name, config) for name in names}
+
+    # 全局请求预算，所有站点同时在途的HTTP请求数不超过该值
+    set_request_budget(config['max_concurrency'])
+    set_politeness(PolitenessScheduler(rate=config['request_rate'], max_rate=config['max_request_rate'],
+                                       host_rates=config['host_rates']))
+    set_request_policy(RequestPolicy(connect_timeout=config['connect_timeout'], read_timeout=config['read_timeout'],
+                                     retries=config['retries'], hedge=config['hedge']))
+    browser = SharedBrowser(lean=config['lean_browser']) if config['shared_browser'] else None
+    try:
+        if browser is not None:
+            browser.start()
+        with SeenIndex(config['seen_index']) as seen_index:
+            shared = {
+                'seen_index': seen_index,
+                'http_cache': HttpCache(config['http_cache']) if config['http_cache'] else None,
+                'lean_browser': config['lean_browser'],
+            }
+            with ThreadPoolExecutor(max_workers=len(sites), thread_name_prefix='site') as executor:
+                futures = [executor.submit(run_site, name, site, shared, config['resume'])
+                           for name, site in sites.items()]
+                return [future.result() for future in futures]
+    finally:
+        if browser is not None:
+            browser.close()
+        set_request_budget(None)
+
+
+def print_summary(results, elapsed_time):
+    print(f"\n{'=' * 60}")
+    print(f"全部站点完成，总耗时: {elapsed_time:.1f}秒")
+    for result in results:
+        status = "成功" if result['ok'] else f"失败 ({result['error']})"
+        print(f"   {result['site']:<12} {status}  数量: {result['count']}  耗时: {result['seconds']:.1f}秒")
+    scheduler = get_politeness()
+    if scheduler is not None:
+        print("各主机请求速率:")
+        for host, stats in sorted(scheduler.stats().items()):
+            print(f"   {host:<32} {stats['rate']:>6.2f}次/秒  请求: {stats['requests']}  "
+                  f"限流: {stats['throttled']}  错误: {stats['errors']}")
+    policy_stats = get_request_policy().stats()
+    print(f"重试: {policy_stats['retried']}次  对冲: {policy_stats['hedged']}次（对冲请求先完成 {policy_stats['hedge_wins']}次）")
+    print(f"{'=' * 60}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="多站点爬取调度")
+    parser.add_argument('--config', help="JSON配置文件")
+    parser.add_argument('--sites', nargs='+', choices=sorted(SITES), help="要运行的站点，默认运行配置中的全部站点")
+    parser.add_argument('--target', type=int, help="每个站点的目标数量，覆盖配置")
+    parser.add_argument('--max-concurrency', type=int, help="全局同时在途的HTTP请求数")
+    parser.add_argument('--request-rate', type=float, help="每个主机的初始请求速率（次/秒）")
+    parser.add_argument('--max-request-rate', type=float, help="每个主机自动提速的上限（次/秒）")
+    parser.add_argument('--hedge', action='store_true', help="慢请求超过主机p95耗时后再发一个相同请求，取先完成的结果")
+    parser.add_argument('--resume', action='store_true', help="从各站点的日志恢复上次中断的爬取")
+    parser.add_argument('--no-shared-browser', action='store_true', help="各站点自行启动浏览器")
+    parser.add_argument('--seen-index', help="已处理URL索引文件，覆盖配置")
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    if args.max_concurrency:
+        config['max_concurrency'] = args.max_concurrency
+    if args.request_rate:
+        config['request_rate'] = args.request_rate
+    if args.max_request_rate:
+        config['max_request_rate'] = args.max_request_rate
+    if args.hedge:
+        config['hedge'] = True
+    if args.resume:
+        config['resume'] = True
+    if args.no_shared_browser:
+        config['shared_browser'] = False
+    if args.seen_index:
+        config['seen_index'] = args.seen_index
+    names = args.sites or list(config['crawlers'] or SITES)
+    if args.target:
+        for name in names:
+            config['crawlers'][name] = dict(config['crawlers'].get(name) or {}, target=args.target)
+
+    start_time = time.time()
+    results = run_sites(config, names)
+    print_summary(results, time.time() - start_time)
+    return 0 if all(result['ok'] for result in results) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
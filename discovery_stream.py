@@ -0,0 +1,80 @@
+import queue
+import threading
+
+_DONE = object()
+
+
+class DiscoveryStream:
+    """在后台线程运行文章发现，边发现边交给抓取
+
+    batches 是无参函数，返回逐批产出文章列表的生成器。生成器在后台线程中创建和运行
+    （Playwright 同步接口只能在创建它的线程里使用）。每批文章放入有界队列，
+    抓取跟不上时发现线程在入队处等待；迭代本对象按发现顺序逐篇产出文章。
+    """
+
+    def __init__(self, batches, max_batches=4):
+        self.batches = batches
+        self.queue = queue.Queue(maxsize=max_batches)
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="discovery", daemon=True)
+        # 已交给消费者的文章数
+        self.found = 0
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def _put(self, item):
+        """入队，队列满时等待；停止后放弃并返回False"""
+        while not self.stop_event.is_set():
+            try:
+                self.queue.put(item, timeout=0.2)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _run(self):
+        generator = None
+        try:
+            generator = self.batches()
+            for batch in generator:
+                if not batch:
+                    continue
+                if not self._put(list(batch)):
+                    break
+                self.found += len(batch)
+        except Exception as e:
+            print(f"   发现文章出错: {e}")
+        finally:
+            # 提前停止时关闭生成器，执行其中的清理（如关闭浏览器）
+            if hasattr(generator, 'close'):
+                generator.close()
+            self._put(_DONE)
+
+    def __iter__(self):
+        while True:
+            batch = self.queue.get()
+            if batch is _DONE:
+                return
+            yield from batch
+
+    def close(self):
+        """停止发现并等待后台线程退出"""
+        self.stop_event.set()
+        if self.thread.is_alive():
+            self.thread.join()
+        # 唤醒可能仍在等待下一批文章的消费者
+        while True:
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                break
+        self.queue.put_nowait(_DONE)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
@@ -0,0 +1,69 @@
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+_END = object()
+
+
+def ordered_concurrent_map(func, iterable, max_workers=8, max_in_flight=None):
+    """并发执行func，按输入顺序依次产出(item, result)
+
+    最多同时保持max_in_flight个任务在途。输入由单独的线程惰性消费并提交，
+    输入是边发现边产出的流时，等待新输入不会耽误已完成结果的产出。
+    调用方提前停止迭代时，尚未开始的任务会被取消。
+    """
+    max_workers = max(1, int(max_workers))
+    if max_in_flight is None:
+        max_in_flight = max_workers * 2
+    max_in_flight = max(max_workers, int(max_in_flight))
+
+    submitted = queue.Queue()
+    slots = threading.Semaphore(max_in_flight)
+    stop_event = threading.Event()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+
+        def feed():
+            try:
+                for item in iterable:
+                    while not slots.acquire(timeout=0.2):
+                        if stop_event.is_set():
+                            return
+                    if stop_event.is_set():
+                        return
+                    submitted.put((item, executor.submit(func, item)))
+            except Exception as e:
+                submitted.put((_END, e))
+                return
+            submitted.put((_END, None))
+
+        feeder = threading.Thread(target=feed, name="fetch-feeder", daemon=True)
+        feeder.start()
+
+        pending = deque()
+        try:
+            while True:
+                item, future = submitted.get()
+                finished = item is _END
+                if not finished:
+                    pending.append((item, future))
+                # 队首已完成就立即产出；没有新提交的任务可取时等待队首完成
+                while pending and (finished or pending[0][1].done() or submitted.empty()):
+                    done_item, done_future = pending.popleft()
+                    result = done_future.result()
+                    slots.release()
+                    yield done_item, result
+                if finished:
+                    if future is not None:
+                        # 输入迭代出错
+                        raise future
+                    break
+        finally:
+            stop_event.set()
+            for _, future in pending:
+                future.cancel()
+            while not submitted.empty():
+                item, future = submitted.get_nowait()
+                if item is not _END:
+                    future.cancel()
@@ -0,0 +1,50 @@
+import os
+
+# 可选的解析后端，均通过 BeautifulSoup 的树构建器接入，提取代码无需改动
+# bs4 在第一次解析时才导入，只导入爬虫模块不会加载它
+PARSER_BACKENDS = ('lxml', 'html.parser')
+DEFAULT_BACKEND = 'html.parser'
+
+_backend = DEFAULT_BACKEND
+
+
+def available_backends():
+    """当前环境中可用的解析后端"""
+    from bs4 import BeautifulSoup, FeatureNotFound
+
+    backends = []
+    for backend in PARSER_BACKENDS:
+        try:
+            BeautifulSoup('<p></p>', backend)
+        except FeatureNotFound:
+            continue
+        backends.append(backend)
+    return backends
+
+
+def get_parser_backend():
+    return _backend
+
+
+def set_parser_backend(backend):
+    """切换解析后端；'auto' 表示选择可用后端中最快的（lxml 优先）"""
+    global _backend
+    if backend == 'auto':
+        backend = available_backends()[0]
+    if backend not in PARSER_BACKENDS:
+        raise ValueError(f"未知的解析后端: {backend}")
+    _backend = backend
+
+
+def make_soup(html_content, backend=None):
+    """用配置的后端解析HTML，后端不可用时退回 html.parser"""
+    from bs4 import BeautifulSoup, FeatureNotFound
+
+    try:
+        return BeautifulSoup(html_content, backend or _backend)
+    except FeatureNotFound:
+        return BeautifulSoup(html_content, 'html.parser')
+
+
+# 可通过环境变量选择后端，例如 CRAWLER_HTML_PARSER=lxml 或 auto
+set_parser_backend(os.environ.get('CRAWLER_HTML_PARSER', DEFAULT_BACKEND))
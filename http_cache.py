@@ -0,0 +1,87 @@
+import hashlib
+import json
+import os
+import tempfile
+
+
+class HttpCache:
+    """基于 ETag/Last-Modified 的磁盘HTTP缓存
+
+    每个URL保存一份正文和校验信息，再次请求时带上 If-None-Match/If-Modified-Since，
+    服务器返回304时直接使用本地正文，不再重新下载。
+    """
+
+    def __init__(self, cache_dir="http_cache"):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+
+    def _paths(self, url):
+        key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        directory = os.path.join(self.cache_dir, key[:2])
+        return directory, os.path.join(directory, key + '.json'), os.path.join(directory, key + '.body')
+
+    def _load(self, url):
+        _, meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(body_path, 'rb') as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None, None
+        return meta, body
+
+    def _store(self, url, response):
+        directory, meta_path, body_path = self._paths(url)
+        meta = {
+            'url': url,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+        }
+        if not meta['etag'] and not meta['last_modified']:
+            # 没有校验信息的页面无法做条件请求，不缓存
+            return
+
+        os.makedirs(directory, exist_ok=True)
+        self._write_atomic(body_path, response.content, directory)
+        self._write_atomic(meta_path, json.dumps(meta, ensure_ascii=False).encode('utf-8'), directory)
+
+    @staticmethod
+    def _write_atomic(path, data, directory):
+        fd, temp_path = tempfile.mkstemp(suffix='.tmp', dir=directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def fetch_text(self, session, url, encoding='utf-8', headers=None, **kwargs):
+        """条件GET，返回(状态码, 文本)；命中304时状态码为200、正文来自缓存"""
+        meta, body = self._load(url)
+
+        request_headers = dict(headers or {})
+        if meta:
+            if meta.get('etag'):
+                request_headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                request_headers['If-Modified-Since'] = meta['last_modified']
+
+        response = session.get(url, headers=request_headers, **kwargs)
+
+        if response.status_code == 304 and body is not None:
+            self.hits += 1
+            return 200, body.decode(encoding, errors='replace')
+
+        self.misses += 1
+        response.encoding = encoding
+        if response.status_code == 200:
+            try:
+                self._store(url, response)
+            except OSError as e:
+                print(f"写入HTTP缓存失败: {e}")
+        return response.status_code, response.text
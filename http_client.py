@@ -0,0 +1,233 @@
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+from politeness import PolitenessScheduler
+from request_policy import RequestPolicy
+
+DEFAULT_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+
+def _accept_encoding():
+    """urllib3 只有在安装了 brotli/brotlicffi 时才能解码 br"""
+    for module_name in ('brotli', 'brotlicffi'):
+        try:
+            __import__(module_name)
+            return 'gzip, deflate, br'
+        except ImportError:
+            continue
+    return 'gzip, deflate'
+
+
+ACCEPT_ENCODING = _accept_encoding()
+
+_session = None
+_session_lock = threading.Lock()
+
+# 进程内所有爬虫共用的同时请求数上限，None 表示不限制
+_request_slots = None
+
+# 进程内所有爬虫共用的按主机限速调度，None 表示不限速
+_politeness = PolitenessScheduler()
+
+# 超时、重试和对冲策略
+_request_policy = RequestPolicy()
+
+
+def create_session(pool_connections=16, pool_maxsize=32):
+    """创建带连接池和keep-alive的Session
+
+    pool_connections 为缓存的主机连接池个数，pool_maxsize 为每个主机保留的连接数。
+    复用已建立的连接可以省去重复的 TCP/TLS 握手。
+    """
+    # 第一次创建Session时才导入 requests，只导入模块不会付出这部分启动开销
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers.update({
+        'User-Agent': DEFAULT_USER_AGENT,
+        'Accept-Encoding': ACCEPT_ENCODING,
+        'Connection': 'keep-alive',
+    })
+    # 每个响应（包括条件请求的304）都反馈给限速调度
+    session.hooks['response'].append(_observe_response)
+    return session
+
+
+def _observe_response(response, *args, **kwargs):
+    scheduler = _politeness
+    if scheduler is not None:
+        scheduler.record(response.url, response.status_code,
+                         latency=response.elapsed.total_seconds(),
+                         retry_after=response.headers.get('Retry-After'))
+
+
+def disable_insecure_warnings():
+    """关闭 verify=False 请求产生的 InsecureRequestWarning"""
+    import urllib3
+    urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+
+def get_session():
+    """获取进程内共享的Session（所有爬虫共用同一组连接池）"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = create_session()
+    return _session
+
+
+def set_request_budget(max_requests):
+    """设置进程内同时进行的页面和图片请求总数上限，多个爬虫同时运行时共用；None 取消限制"""
+    global _request_slots
+    _request_slots = threading.BoundedSemaphore(max_requests) if max_requests else None
+
+
+def set_politeness(scheduler):
+    """替换进程内共用的限速调度（politeness.PolitenessScheduler）；None 取消限速"""
+    global _politeness
+    _politeness = scheduler
+
+
+def get_politeness():
+    return _politeness
+
+
+def set_request_policy(policy):
+    """替换进程内共用的请求策略（request_policy.RequestPolicy）"""
+    global _request_policy
+    _request_policy = policy
+
+
+def get_request_policy():
+    return _request_policy
+
+
+@contextmanager
+def request_slot():
+    """占用一个全局请求名额，未设置上限时直接通过"""
+    slots = _request_slots
+    if slots is None:
+        yield
+        return
+    with slots:
+        yield
+
+
+@contextmanager
+def polite_request(url):
+    """按目标主机的速率等待令牌，再占用一个全局请求名额
+
+    先等令牌再占名额，排队等待的请求不会占着名额；没有响应的连接错误也反馈给限速调度。
+    """
+    scheduler = _politeness
+    if scheduler is not None:
+        scheduler.acquire(url)
+    with request_slot():
+        try:
+            yield
+        except Exception as e:
+            from requests import RequestException
+
+            # 有响应的错误（如 raise_for_status）已由响应钩子记录
+            if scheduler is not None and isinstance(e, RequestException) and e.response is None:
+                scheduler.record_error(url)
+            raise
+
+
+def fetch_text(session, url, cache=None, encoding='utf-8', **kwargs):
+    """GET页面，返回(状态码, 文本)
+
+    传入 cache（http_cache.HttpCache）时使用条件请求，未变化的页面直接读本地缓存。
+    未指定 timeout 时使用请求策略的连接/读取超时，失败按策略重试，慢请求按策略对冲。
+    """
+    policy = _request_policy
+    kwargs.setdefault('timeout', policy.timeout)
+
+    def attempt():
+        with polite_request(url):
+            if cache is not None:
+                return cache.fetch_text(session, url, encoding=encoding, **kwargs)
+
+            response = session.get(url, **kwargs)
+            response.encoding = encoding
+            return response.status_code, response.text
+
+    return policy.run(url, attempt, status_of=lambda result: result[0], hedge=policy.hedge)
+
+
+def download_to_tempfile(session, url, dest_dir, min_size=0, max_size=None,
+                         chunk_size=64 * 1024, **kwargs):
+    """流式下载到 dest_dir 下的临时文件
+
+    根据 Content-Length 或已接收的字节数尽早放弃过小/过大的文件，内存占用只有一个分块。
+    成功返回(临时文件路径, 字节数)，调用方负责 os.replace 到最终文件名；
+    大小不符合要求返回 None，HTTP 错误抛出异常。
+    超时、重试和对冲同 fetch_text，被放弃的重复下载会删除临时文件。
+    """
+    policy = _request_policy
+    kwargs.setdefault('timeout', policy.timeout)
+
+    def attempt():
+        return _download_once(session, url, dest_dir, min_size, max_size, chunk_size,
+                              policy.download_deadline, **kwargs)
+
+    def discard(result):
+        if result:
+            os.remove(result[0])
+
+    return policy.run(url, attempt, hedge=policy.hedge_downloads, discard=discard)
+
+
+def _download_once(session, url, dest_dir, min_size, max_size, chunk_size, deadline, **kwargs):
+    started = time.monotonic()
+    with polite_request(url), session.get(url, stream=True, **kwargs) as response:
+        response.raise_for_status()
+
+        content_length = response.headers.get('Content-Length')
+        if content_length and content_length.isdigit():
+            content_length = int(content_length)
+            if content_length < min_size or (max_size is not None and content_length > max_size):
+                return None
+
+        fd, temp_path = tempfile.mkstemp(suffix='.part', dir=dest_dir)
+        size = 0
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in response.iter_content(chunk_size=chunk_size):
+                    if deadline is not None and time.monotonic() - started > deadline:
+                        from requests import Timeout
+                        raise Timeout(f"下载超过 {deadline} 秒: {url}")
+                    if not chunk:
+                        continue
+                    size += len(chunk)
+                    if max_size is not None and size > max_size:
+                        break
+                    f.write(chunk)
+        except Exception:
+            os.remove(temp_path)
+            raise
+
+    if size < min_size or (max_size is not None and size > max_size):
+        os.remove(temp_path)
+        return None
+
+    # mkstemp 创建的文件权限为 0600，改为普通文件权限
+    os.chmod(temp_path, 0o644)
+    return temp_path, size
+
+
+def close_session():
+    """关闭共享Session并释放连接"""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
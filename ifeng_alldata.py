@@ -0,0 +1,96 @@
+import json
+import re
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# 页面中 allData 变量赋值的位置，值可能被括号包裹：var allData = ({...});
+ALL_DATA_ASSIGN = re.compile(r'\ballData\s*=\s*\(?\s*(?=\{)')
+# 扫描时关注的记号：完整的字符串、'}' 或 ']' 前多余的逗号、括号
+TOKENS = re.compile(r'"(?:[^"\\]|\\.)*"|,(?=\s*[}\]])|[{}\[\]]', re.DOTALL)
+
+_decoder = json.JSONDecoder()
+
+
+def loads(text):
+    """解码JSON，优先使用 orjson"""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+def scan_object(text, start):
+    """从 text[start] 的 '{' 开始做一次线性括号匹配
+
+    字符串整体跳过，不会被其中的 '};' 截断；同时去掉 '}' 和 ']' 前多余的逗号。
+    返回可直接解码的JSON文本；对象不完整时抛出 ValueError。
+    """
+    depth = 0
+    pieces = []
+    last = start
+
+    for match in TOKENS.finditer(text, start):
+        token = match.group()
+        if token[0] == '"':
+            continue
+        if token == ',':
+            pieces.append(text[last:match.start()])
+            last = match.end()
+        elif token in '{[':
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 0:
+                pieces.append(text[last:match.end()])
+                return ''.join(pieces)
+
+    raise ValueError("allData 对象不完整")
+
+
+class AllData:
+    """凤凰网页面中 var allData = {...} 的数据
+
+    from_html 只定位赋值位置，第一次访问 data/newsstream/slide_data 时才解码：
+    先用标准库的C解码器从该位置直接解码（一次扫描即可确定对象结尾），
+    遇到多余逗号等不规范写法时再做括号匹配修复后解码。
+    """
+
+    def __init__(self, text, start=0):
+        self.text = text
+        self.start = start
+        self._data = None
+
+    @classmethod
+    def from_html(cls, html_content):
+        """定位 allData，页面中没有 allData 时返回 None"""
+        if not html_content:
+            return None
+        match = ALL_DATA_ASSIGN.search(html_content)
+        if not match:
+            return None
+        return cls(html_content, match.end())
+
+    def decode(self):
+        try:
+            data, _ = _decoder.raw_decode(self.text, self.start)
+        except ValueError:
+            data = loads(scan_object(self.text, self.start))
+        return data if isinstance(data, dict) else {}
+
+    @property
+    def data(self):
+        if self._data is None:
+            self._data = self.decode()
+        return self._data
+
+    @property
+    def newsstream(self):
+        """列表页的文章流"""
+        return self.data.get('newsstream') or []
+
+    @property
+    def slide_data(self):
+        """文章页的图集数据"""
+        return self.data.get('slideData') or []
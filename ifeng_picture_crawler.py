@@ -1,20 +1,64 @@
-import requests
 import os
-import pandas as pd
+import argparse
 import time
-import json
-import re
+import threading
 from urllib.parse import urlparse
-from bs4 import BeautifulSoup
+from html_parser import make_soup
+from http_client import get_session, fetch_text, download_to_tempfile
+from http_cache import HttpCache
+from ifeng_alldata import AllData
+from image_pipeline import ImageDownloadPipeline
+from seen_index import SeenIndex
+from journal import CrawlJournal
+from corpus_store import SegmentStore
+from manifest import ManifestWriter, manifest_csv_path, MANIFEST_COLUMNS
+from image_postprocess import (ImagePostProcessor, IMAGE_COLUMNS, TRANSCODE_FORMATS, image_extension,
+                              discard_files, rename_thumbnail)
+from metrics import Metrics
+from profiling import RunProfiler, profile_dir_for, profile_stage
 
 
 class PhoenixNewsImageCrawler:
-    def __init__(self, save_dir="test"):  # 改为test
+    def __init__(self, save_dir="test", max_workers=8, per_host_limit=4,
+                 min_image_size=0, max_image_size=20 * 1024 * 1024, seen_index=None,
+                 http_cache=None, journal=None, store=None, excel_file="test.xlsx",
+                 metrics=None, profiler=None, postprocessor=None):  # 改为test
         self.base_url = "https://mil.ifeng.com/shanklist/originalcard/14-35081-"
         self.save_dir = save_dir
-        self.excel_file = "test.xlsx"  # 改为test.xlsx
+        self.excel_file = excel_file  # 改为test.xlsx
+        # 图片后处理（image_postprocess.ImagePostProcessor），None 表示下载后直接保存
+        self.postprocessor = postprocessor
+        # 下载一张就追加一行的增量清单，结束时导出为Excel；后处理时增加真实格式和尺寸列
+        columns = MANIFEST_COLUMNS + IMAGE_COLUMNS if postprocessor is not None else MANIFEST_COLUMNS
+        self.manifest = ManifestWriter(manifest_csv_path(self.excel_file), columns=columns)
         self.image_data = []
         self.image_counter = 1  # 图片计数器
+        # 已提交后处理、尚未校验完的图片数，校验通过后才分配编号
+        self.pending_images = 0
+        self.max_image_number = None  # 本次爬取允许分配的最大编号
+
+        # 图片并发下载参数，编号分配需加锁保证 001、002… 连续
+        self.max_workers = max_workers
+        self.per_host_limit = per_host_limit
+        self.counter_lock = threading.Lock()
+        # 图片大小范围（字节），超出范围的在下载过程中尽早放弃
+        self.min_image_size = min_image_size
+        self.max_image_size = max_image_size
+        # 共享连接池的HTTP客户端
+        self.session = get_session()
+        # 跨运行的已处理URL索引（seen_index.SeenIndex），None 表示不启用
+        self.seen_index = seen_index
+        # 页面的条件请求缓存（http_cache.HttpCache），None 表示不启用
+        self.http_cache = http_cache
+        # 崩溃恢复日志（journal.CrawlJournal），None 表示不记录
+        self.journal = journal
+        # 分段存储（corpus_store.SegmentStore），None 表示每张图片一个文件
+        self.store = store
+        # 各阶段计数和耗时（metrics.Metrics），运行中更新保存目录下的 metrics.prom
+        self.metrics = metrics if metrics is not None else Metrics(
+            'ifeng_image', prometheus_path=os.path.join(save_dir, 'metrics.prom'))
+        # 性能分析（profiling.RunProfiler），None 表示不分析
+        self.profiler = profiler
 
         if not os.path.exists(save_dir):
             os.makedirs(save_dir)
@@ -27,13 +71,16 @@ class PhoenixNewsImageCrawler:
             'Accept-Language': 'zh-CN,zh;q=0.8,en-US;q=0.5,en;q=0.3',
         }
 
-        try:
-            response = requests.get(url, headers=headers, timeout=15)
-            response.encoding = 'utf-8'
-            return response.text
-        except Exception as e:
-            print(f"请求页面失败: {e}")
-            return None
+        with self.metrics.timer('fetch') as timer:
+            try:
+                status_code, text = fetch_text(self.session, url, cache=self.http_cache, headers=headers)
+            except Exception as e:
+                timer.error = True
+                print(f"请求页面失败: {e}")
+                return None
+            timer.error = status_code != 200
+            timer.size = len(text.encode('utf-8'))
+            return text
 
     def get_article_urls(self):
         """从列表页获取所有文章的URL"""
@@ -43,20 +90,11 @@ class PhoenixNewsImageCrawler:
             return []
 
         # 从JavaScript变量中提取文章URL
-        pattern = r'var allData = ({.*?});'
-        match = re.search(pattern, html_content, re.DOTALL)
-
         article_urls = []
-        if match:
-            try:
-                json_str = match.group(1)
-                json_str = re.sub(r',\s*}', '}', json_str)
-                json_str = re.sub(r',\s*]', ']', json_str)
-
-                all_data = json.loads(json_str)
-                newsstream = all_data.get('newsstream', [])
-
-                for item in newsstream:
+        try:
+            all_data = AllData.from_html(html_content)
+            if all_data is not None:
+                for item in all_data.newsstream:
                     if 'url' in item and item['url']:
                         article_urls.append({
                             'url': item['url'],
@@ -66,8 +104,8 @@ class PhoenixNewsImageCrawler:
 
                 print(f"找到 {len(article_urls)} 篇文章")
 
-            except json.JSONDecodeError as e:
-                print(f"JSON解析错误: {e}")
+        except ValueError as e:
+            print(f"JSON解析错误: {e}")
 
         return article_urls
 
@@ -76,38 +114,30 @@ class PhoenixNewsImageCrawler:
         images = []
 
         # 方法1: 从allData.slideData中提取（文章详情页的图片数据）
-        pattern = r'var allData = ({.*?});'
-        match = re.search(pattern, html_content, re.DOTALL)
-
-        if match:
-            try:
-                json_str = match.group(1)
-                json_str = re.sub(r',\s*}', '}', json_str)
-                json_str = re.sub(r',\s*]', ']', json_str)
-
-                all_data = json.loads(json_str)
-
+        try:
+            all_data = AllData.from_html(html_content)
+            if all_data is not None:
                 # 提取slideData中的图片
-                if 'slideData' in all_data:
-                    for i, slide in enumerate(all_data['slideData']):
-                        if slide.get('type') == 'pic' and slide.get('url'):
-                            images.append({
-                                'url': slide['url'],
-                                'description': slide.get('description', ''),
-                                'width': slide.get('width', ''),
-                                'height': slide.get('height', ''),
-                                'index': i + 1,
-                                'filename': os.path.basename(urlparse(slide['url']).path)
-                            })
+                for i, slide in enumerate(all_data.slide_data):
+                    if slide.get('type') == 'pic' and slide.get('url'):
+                        images.append({
+                            'url': slide['url'],
+                            'description': slide.get('description', ''),
+                            'width': slide.get('width', ''),
+                            'height': slide.get('height', ''),
+                            'index': i + 1,
+                            'filename': os.path.basename(urlparse(slide['url']).path)
+                        })
 
                 print(f"从slideData中找到 {len(images)} 张图片")
 
-            except json.JSONDecodeError as e:
-                print(f"文章JSON解析错误: {e}")
+        except ValueError as e:
+            print(f"文章JSON解析错误: {e}")
+            all_data = None
 
-        # 方法2: 从img标签中提取高清图片
-        if not images:
-            soup = BeautifulSoup(html_content, 'html.parser')
+        # 方法2: 页面没有allData时，从img标签中提取高清图片
+        if all_data is None:
+            soup = make_soup(html_content)
             img_tags = soup.find_all('img')
 
             for img in img_tags:
@@ -125,8 +155,8 @@ class PhoenixNewsImageCrawler:
 
         return images
 
-    def download_image(self, img_info, article_info):
-        """下载单张图片"""
+    def download_image(self, img_url, img_info, article_info):
+        """下载单张图片（可在多个线程中并发调用）"""
         try:
             headers = {
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
@@ -134,41 +164,59 @@ class PhoenixNewsImageCrawler:
                 'Accept': 'image/webp,image/apng,image/*,*/*;q=0.8',
             }
 
-            print(f"  下载第 {self.image_counter} 张图片")
+            if self.image_limit_reached():
+                return None
+
+            if self.seen_index is not None and self.seen_index.contains(img_url, 'image'):
+                print(f"  - 图片已下载过，跳过: {img_url}")
+                return None
 
-            response = requests.get(img_info['url'], headers=headers, timeout=15)
-            response.raise_for_status()
+            if self.journal is not None and self.journal.is_item_done(img_url):
+                return None
+
+            with self.metrics.timer('download') as timer:
+                downloaded = download_to_tempfile(self.session, img_url, self.save_dir,
+                                                  min_size=self.min_image_size,
+                                                  max_size=self.max_image_size,
+                                                  headers=headers)
+                # 大小不符合要求的不算下载成功
+                timer.items = 1 if downloaded else 0
+                timer.size = downloaded[1] if downloaded else 0
+            if not downloaded:
+                print(f"  ✗ 图片大小不符合要求，跳过: {img_url}")
+                return None
+            temp_path, file_size = downloaded
+
+            if self.postprocessor is not None:
+                return self.submit_postprocess(img_url, temp_path, img_info, article_info)
 
             # 按照数字命名：001.jpg, 002.jpg, 003.jpg...
             file_extension = os.path.splitext(img_info['filename'])[1]
             if not file_extension or len(file_extension) > 5:
                 file_extension = '.jpg'
 
-            # 关键修改：只使用数字命名，不使用文章标题
-            filename = f"{self.image_counter:03d}{file_extension}"
-            filepath = os.path.join(self.save_dir, filename)
+            with self.counter_lock:
+                if self.image_limit_reached():
+                    os.remove(temp_path)
+                    return None
 
-            # 保存图片
-            with open(filepath, 'wb') as f:
-                f.write(response.content)
-
-            file_info = {
-                'image_number': self.image_counter,
-                'article_title': article_info['title'],
-                'article_url': article_info['url'],
-                'news_time': article_info.get('news_time', ''),
-                'image_url': img_info['url'],
-                'local_path': os.path.abspath(filepath),
-                'filename': filename,
-                'description': img_info.get('description', ''),
-                'width': img_info.get('width', ''),
-                'height': img_info.get('height', ''),
-                'download_time': time.strftime('%Y-%m-%d %H:%M:%S'),
-                'file_size': os.path.getsize(filepath)
-            }
+                # 关键修改：只使用数字命名，不使用文章标题
+                image_number = self.image_counter
+                filename = f"{image_number:03d}{file_extension}"
+                local_path = self.store_image(temp_path, filename, file_size)
+
+                self.image_counter += 1  # 计数器增加
+                self.manifest.append(local_path)
+
+            if self.seen_index is not None:
+                self.seen_index.add(img_url, 'image')
+
+            file_info = self.make_file_info(image_number, img_info, article_info, local_path, filename, file_size)
+
+            if self.journal is not None:
+                self.journal.record_item(img_url, image_number, file_info)
 
             print(f"  ✓ 下载成功: {filename}")
-            self.image_counter += 1  # 计数器增加
 
             return file_info
 
@@ -176,33 +224,219 @@ class PhoenixNewsImageCrawler:
             print(f"  ✗ 下载失败: {e}")
             return None
 
+    @staticmethod
+    def make_file_info(image_number, img_info, article_info, local_path, filename, file_size):
+        return {
+            'image_number': image_number,
+            'article_title': article_info['title'],
+            'article_url': article_info['url'],
+            'news_time': article_info.get('news_time', ''),
+            'image_url': img_info['url'],
+            'local_path': local_path,
+            'filename': filename,
+            'description': img_info.get('description', ''),
+            'width': img_info.get('width', ''),
+            'height': img_info.get('height', ''),
+            'download_time': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'file_size': file_size,
+            # 以下两项只在启用后处理时填写
+            'format': None,
+            'thumbnail': None
+        }
+
+    def store_image(self, temp_path, filename, file_size):
+        """把临时文件保存为 filename，返回清单中记录的路径"""
+        started = time.perf_counter()
+        if self.store is not None:
+            # 追加到分段文件，清单中记录段文件位置
+            local_path = self.store.put_file(filename, temp_path)
+            os.remove(temp_path)
+        else:
+            # 下载完成后原子重命名，不会留下半个文件
+            filepath = os.path.join(self.save_dir, filename)
+            os.replace(temp_path, filepath)
+            local_path = os.path.abspath(filepath)
+        self.metrics.observe('write', time.perf_counter() - started, size=file_size)
+        return local_path
+
+    def submit_postprocess(self, img_url, temp_path, img_info, article_info):
+        """把临时文件交给后处理进程，校验通过后才编号保存
+
+        返回的 file_info 在处理完成时补全，无效或超出数量的图片 local_path 为None。
+        """
+        with self.counter_lock:
+            # 正在后处理的图片也占名额，避免校验完成前继续下载超出目标数量
+            if self.image_limit_reached():
+                os.remove(temp_path)
+                return None
+            self.pending_images += 1
+
+        file_info = self.make_file_info(None, img_info, article_info, None, None, None)
+        # 缩略图先按临时文件名生成，保存时再改成最终编号
+        name = os.path.splitext(os.path.basename(temp_path))[0]
+        self.postprocessor.submit(temp_path, name,
+                                  lambda result: self.save_processed_image(img_url, file_info, result))
+        print(f"  ✓ 下载成功: {img_url}，等待后处理")
+        return file_info
+
+    def save_processed_image(self, img_url, file_info, result):
+        """后处理完成：校验通过后分配编号、按真实格式命名保存，补全 file_info 并记录清单，无效的图片丢弃，不占编号"""
+        self.metrics.observe('postprocess', result['seconds'], size=result['file_size'], error=not result['valid'])
+        with self.counter_lock:
+            self.pending_images -= 1
+        if not result['valid']:
+            discard_files(result['path'], result['thumbnail'])
+            print(f"  ✗ 图片无效，已丢弃: {img_url} ({result['error']})")
+            return
+
+        with self.counter_lock:
+            # 提交时已预留名额，正常不会超出，编号前再确认一次
+            if self.image_limit_reached():
+                discard_files(result['path'], result['thumbnail'])
+                return
+
+            image_number = self.image_counter
+            filename = f"{image_number:03d}{image_extension(result['format'])}"
+            local_path = self.store_image(result['path'], filename, result['file_size'])
+            thumbnail = rename_thumbnail(result['thumbnail'], f"{image_number:03d}")
+            self.image_counter += 1
+
+            # 宽高以实际图片为准，不再用 slideData 中的值
+            file_info.update(image_number=image_number, local_path=local_path, filename=filename,
+                             format=result['format'], width=result['width'], height=result['height'],
+                             file_size=result['file_size'], thumbnail=thumbnail)
+            self.manifest.append(local_path, result['format'], result['width'], result['height'])
+            if self.journal is not None:
+                self.journal.record_item(img_url, image_number, file_info)
+
+        if self.seen_index is not None:
+            self.seen_index.add(img_url, 'image')
+        print(f"  ✓ 保存图片: {filename} ({result['format']} {result['width']}x{result['height']})")
+
+    def image_limit_reached(self):
+        """已保存和正在后处理的图片是否已达到本次爬取的目标数量"""
+        return (self.max_image_number is not None and
+                self.image_counter + self.pending_images > self.max_image_number)
+
     def crawl_articles_images(self, max_images=100):
         """爬取多篇文章的图片，直到达到指定数量"""
         print("开始爬取凤凰军事新闻图片...")
         print(f"目标网址: {self.base_url}")
         print(f"目标图片数量: {max_images} 张")
 
-        # 获取文章列表
-        articles = self.get_article_urls()
-        if not articles:
-            print("未找到文章列表")
-            return
+        try:
+            # 获取文章列表
+            with profile_stage(self.profiler, 'discovery'), self.metrics.timer('discovery') as timer:
+                articles = self.get_article_urls()
+                timer.items = len(articles or [])
+            if not articles:
+                print("未找到文章列表")
+                return
+
+            self.max_image_number = self.image_counter + max_images - 1
+            articles = self.restore_from_journal(articles)
+            if self.image_limit_reached():
+                print("日志中已完成目标数量")
+                self.save_to_excel()
+                return
+
+            with profile_stage(self.profiler, 'crawl'), \
+                    ImageDownloadPipeline(self.download_image, max_workers=self.max_workers,
+                                          per_host_limit=self.per_host_limit) as pipeline:
+                processed_articles, done_article_urls = self.submit_article_images(articles, max_images, pipeline)
+                print("\n等待图片下载完成...")
+                results = pipeline.results()
+            if self.postprocessor is not None:
+                print("等待图片后处理完成...")
+                self.postprocessor.wait()
+                self.postprocessor.print_summary()
+                results = [file_info for file_info in results if file_info['local_path'] is not None]
+
+            if self.seen_index is not None:
+                # 达到数量上限时文章里的图片可能没下完，这些文章下次仍需处理
+                if not self.image_limit_reached():
+                    for article_url in done_article_urls:
+                        self.seen_index.add(article_url, 'image_article')
+                self.seen_index.flush()
+
+            if self.journal is not None and not self.image_limit_reached():
+                for article_url in done_article_urls:
+                    self.journal.record_article_done(article_url)
+
+            # 按编号顺序记录
+            results.sort(key=lambda item: item['image_number'])
+            self.image_data.extend(results)
+            total_images = len(results)
+
+            # 保存到Excel
+            with profile_stage(self.profiler, 'excel'):
+                self.save_to_excel()
+        finally:
+            # 提前返回（日志中已完成、未找到文章）或出错时也写出指标
+            self.metrics.finish(os.path.join(self.save_dir, 'metrics.json'))
+
+        print(f"\n{'=' * 60}")
+        print(f"爬取完成！")
+        print(f"处理文章: {processed_articles}/{len(articles)} 篇")
+        print(f"下载图片: {total_images} 张")
+        print(f"图片保存到: {os.path.abspath(self.save_dir)}")
+        print(f"路径数据保存到: {self.excel_file}")
+        print(f"{'=' * 60}")
 
-        total_images = 0
+    def restore_from_journal(self, articles):
+        """记录本次发现的文章；恢复运行时重建清单、接着编号，并把上次没处理完的文章排在前面"""
+        if self.journal is None:
+            return articles
+
+        pending = []
+        if self.journal.resume:
+            self.image_data = self.journal.entries()
+            for file_info in self.image_data:
+                if self.postprocessor is not None:
+                    self.manifest.append(file_info['local_path'], file_info['format'] or '',
+                                         file_info['width'], file_info['height'])
+                else:
+                    self.manifest.append(file_info['local_path'])
+            self.image_counter = self.journal.next_number()
+            pending = self.journal.pending_articles()
+            print(f"从日志恢复: 已下载{len(self.image_data)}张图片, 待处理文章{len(pending)}篇")
+
+        new_articles = [article for article in articles if article['url'] not in self.journal.discovered]
+        for article in new_articles:
+            self.journal.record_discovered(article['url'], article)
+        return pending + new_articles
+
+    def submit_article_images(self, articles, max_images, pipeline):
+        """逐篇获取文章，把解析出的图片立即提交给下载流水线
+
+        返回(处理的文章数, 图片已全部提交的文章URL列表)
+        """
         processed_articles = 0
+        done_article_urls = []
 
         for i, article in enumerate(articles):
             # 如果已经达到目标图片数量，停止爬取
-            if total_images >= max_images:
-                print(f"\n已达到目标图片数量 {max_images} 张，停止爬取")
-                break
+            if self.image_limit_reached():
+                # 正在后处理的图片可能无效，等校验完再确认是否够数
+                if self.pending_images:
+                    self.postprocessor.wait()
+                if self.image_limit_reached():
+                    print(f"\n已达到目标图片数量 {max_images} 张，停止爬取")
+                    break
+
+            if self.seen_index is not None and self.seen_index.contains(article['url'], 'image_article'):
+                print(f"\n跳过已处理的文章: {article['title']}")
+                continue
+
+            if self.journal is not None and self.journal.is_article_done(article['url']):
+                continue
 
             processed_articles += 1
             print(f"\n{'=' * 60}")
             print(f"处理第 {i + 1}/{len(articles)} 篇文章")
             print(f"标题: {article['title']}")
             print(f"URL: {article['url']}")
-            print(f"当前已下载: {total_images}/{max_images} 张图片")
+            print(f"当前已下载: {self.image_counter - 1}/{self.max_image_number} 张图片")
             print(f"{'=' * 60}")
 
             # 获取文章内容
@@ -218,67 +452,35 @@ class PhoenixNewsImageCrawler:
                 'news_time': article.get('news_time', '')
             }
 
-            images = self.extract_images_from_article(html_content, article_info)
+            with self.metrics.timer('parse'):
+                images = self.extract_images_from_article(html_content, article_info)
 
             if not images:
                 print("本文未找到图片")
+                done_article_urls.append(article['url'])
                 continue
 
-            # 下载图片
-            article_image_count = 0
+            # 提交给下载流水线，不等待下载完成
             for img_info in images:
-                # 如果已经达到目标图片数量，停止下载
-                if total_images >= max_images:
-                    break
-
-                result = self.download_image(img_info, article_info)
-                if result:
-                    self.image_data.append(result)
-                    article_image_count += 1
-                    total_images += 1
-
-                # 图片间延迟
-                time.sleep(1)
-
-            print(f"本文下载完成: {article_image_count} 张图片")
+                pipeline.submit(img_info['url'], img_info, article_info)
+            done_article_urls.append(article['url'])
 
-            # 文章间延迟
-            if total_images < max_images and i < len(articles) - 1:
-                print("等待2秒后处理下一篇文章...")
-                time.sleep(2)
+            print(f"本文提交下载: {len(images)} 张图片")
 
-        # 保存到Excel
-        self.save_to_excel()
-
-        print(f"\n{'=' * 60}")
-        print(f"爬取完成！")
-        print(f"处理文章: {processed_articles}/{len(articles)} 篇")
-        print(f"下载图片: {total_images} 张")
-        print(f"图片保存到: {os.path.abspath(self.save_dir)}")
-        print(f"路径数据保存到: {self.excel_file}")
-        print(f"{'=' * 60}")
+        return processed_articles, done_article_urls
 
     def save_to_excel(self):
         """将图片路径保存到Excel - 只保存绝对路径"""
-        if self.image_data:
-            # 只提取绝对路径数据
-            path_data = []
-            for item in self.image_data:
-                path_data.append({
-                    'absolute_path': item['local_path']
-                })
-
-            # 创建DataFrame，只包含绝对路径
-            df = pd.DataFrame(path_data)
-
-            # 保存到Excel
-            df.to_excel(self.excel_file, index=False)
+        if self.manifest.count:
+            # 增量清单中只有绝对路径一列，流式导出
+            self.manifest.export_xlsx(self.excel_file)
+            self.manifest.close()
             print(f"图片绝对路径已保存到: {self.excel_file}")
 
             # 打印所有图片路径
             print("\n所有图片绝对路径:")
-            for item in path_data:
-                print(f"{item['absolute_path']}")
+            for row in self.manifest.iter_rows():
+                print(f"{row[0]}")
         else:
             print("没有数据可保存")
 
@@ -289,8 +491,40 @@ class PhoenixNewsImageCrawler:
 
 # 使用示例
 if __name__ == "__main__":
-    # 创建爬虫实例
-    crawler = PhoenixNewsImageCrawler("test")  # 文件夹名称改为test
-
-    # 爬取100张图片
-    crawler.crawl_articles_images(max_images=100)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="凤凰军事图片爬虫")
+    parser.add_argument('--resume', action='store_true', help="从日志恢复上次中断的爬取")
+    parser.add_argument('--seen-index', default="seen_index.db",
+                        help="已处理URL索引文件，默认与其他爬虫和调度器共用，可多个进程同时使用")
+    parser.add_argument('--store', help="把图片追加写入该目录下的分段文件，而不是每张一个文件")
+    parser.add_argument('--profile', action='store_true', help="记录CPU和内存分析，写到 test_profile 目录")
+    parser.add_argument('--postprocess', action='store_true', help="在后处理进程中校验图片并记录真实格式和尺寸")
+    parser.add_argument('--thumbnail', type=int, metavar='SIZE', help="生成最长边为 SIZE 像素的缩略图（需要 Pillow）")
+    parser.add_argument('--transcode', choices=TRANSCODE_FORMATS, help="转码为 WebP/AVIF，比原图小时替换原图（需要 Pillow）")
+    parser.add_argument('--quality', type=int, default=80, help="缩略图和转码的质量")
+    args = parser.parse_args()
+
+    store = SegmentStore(args.store) if args.store else None
+    postprocessor = None
+    if args.postprocess or args.thumbnail or args.transcode:
+        postprocessor = ImagePostProcessor(thumbnail_size=args.thumbnail, thumbnail_dir=os.path.join("test", "thumbnails"),
+                                           transcode=args.transcode, quality=args.quality)
+    profiler = RunProfiler(profile_dir_for("test"), 'ifeng_image').start() if args.profile else None
+    try:
+        # 跨运行的已处理URL索引，与其他爬虫共用
+        with SeenIndex(args.seen_index) as seen_index, \
+                CrawlJournal(os.path.join("test", "ifeng_image_journal.jsonl"), resume=args.resume) as journal:
+            # 创建爬虫实例
+            crawler = PhoenixNewsImageCrawler("test", seen_index=seen_index,
+                                              http_cache=HttpCache("http_cache"),
+                                              journal=journal, store=store, profiler=profiler,
+                                              postprocessor=postprocessor)  # 文件夹名称改为test
+
+            # 爬取100张图片
+            crawler.crawl_articles_images(max_images=100)
+    finally:
+        if postprocessor is not None:
+            postprocessor.close()
+        if store is not None:
+            store.close()
+        if profiler is not None:
+            profiler.stop()
\ No newline at end of file
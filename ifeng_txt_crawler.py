@@ -1,103 +1,261 @@
 import os
-import pandas as pd
+import argparse
 import time
 import json
 import re
 from urllib.parse import urljoin
-from bs4 import BeautifulSoup
-from playwright.sync_api import sync_playwright
+from html_parser import make_soup
+from http_client import get_session, fetch_text, DEFAULT_USER_AGENT
+from http_cache import HttpCache
+from fetch_pool import ordered_concurrent_map
+from parse_pool import ParsePool
+from discovery_stream import DiscoveryStream
+from seen_index import SeenIndex
+from journal import CrawlJournal
+from corpus_store import SegmentStore
+from manifest import ManifestWriter, manifest_csv_path
+from metrics import Metrics
+from profiling import RunProfiler, profile_dir_for, profile_stage
+from playwright_utils import (launch_browser, new_discovery_page, count_elements, wait_for_count_growth,
+                              collect_new_cards)
+
+# 页面内增量提取文章条目的规则，与 extract_articles_from_html 的解析逻辑一致
+NEWS_ITEM_SPEC = {
+    'cardSelectors': ['li.news_item'],
+    'linkSelector': 'a.news-stream-newsStream-image-link',
+    'titleSelectors': ['h2', 'a[title]'],
+    'timeSelectors': ['time'],
+    'markAttribute': 'data-crawler-seen',
+}
+
+
+def extract_article_text(html_content, article_info):
+    """从文章页面提取文本信息（模块级函数，可在解析进程池中执行）"""
+    try:
+        soup = make_soup(html_content)
+
+        title = soup.find('h1')
+        title_text = title.get_text().strip() if title else article_info['title']
+
+        time_elem = soup.find('span', class_='time') or soup.find('div', class_='time')
+        time_text = time_elem.get_text().strip() if time_elem else article_info.get('news_time', '')
+
+        content_selectors = [
+            '.article-content', '.article-body', '.content', '.main-content', '.text',
+            'div[class*="content"]', 'div[class*="text"]'
+        ]
+
+        content = None
+        for selector in content_selectors:
+            content = soup.select_one(selector)
+            if content:
+                break
+
+        if not content:
+            paragraphs = soup.find_all('p')
+            meaningful_paragraphs = []
+            for p in paragraphs:
+                text = p.get_text().strip()
+                if len(text) > 20:
+                    meaningful_paragraphs.append(text)
+
+            content_text = '\n\n'.join(meaningful_paragraphs) if meaningful_paragraphs else "无法提取正文内容"
+        else:
+            for element in content.find_all(['script', 'style']):
+                element.decompose()
+            content_text = content.get_text().strip()
+
+        content_text = re.sub(r'\s+', ' ', content_text).strip()
+
+        return {
+            'title': title_text,
+            'time': time_text,
+            'content': content_text,
+            'url': article_info['url']
+        }
+
+    except Exception as e:
+        print(f"提取文本失败: {e}")
+        return {
+            'title': article_info['title'],
+            'time': article_info.get('news_time', ''),
+            'content': f"提取失败: {str(e)}",
+            'url': article_info['url']
+        }
 
 
 class PhoenixTextCrawler:
-    def __init__(self, save_dir="test"):
+    def __init__(self, save_dir="test", seen_index=None, http_cache=None, lean_browser=True,
+                 max_workers=8, parse_workers=0, journal=None, store=None, excel_file="test.xlsx",
+                 metrics=None, profiler=None):
         self.base_url = "https://mil.ifeng.com/shanklist/14-35083-"
         self.save_dir = save_dir
-        self.excel_file = "test.xlsx"  # 改为test.xlsx
+        self.excel_file = excel_file  # 改为test.xlsx
+        # 保存一篇就追加一行的增量清单，结束时导出为Excel
+        self.manifest = ManifestWriter(manifest_csv_path(self.excel_file))
         self.text_data = []
         self.file_counter = 1
+        # 共享连接池的HTTP客户端
+        self.session = get_session()
+        # 跨运行的已处理URL索引（seen_index.SeenIndex），None 表示不启用
+        self.seen_index = seen_index
+        # 文章页的条件请求缓存（http_cache.HttpCache），None 表示不启用
+        self.http_cache = http_cache
+        # 精简浏览器模式：拦截图片、字体、样式和统计脚本
+        self.lean_browser = lean_browser
+        # 同时在途的文章请求数和解析进程数（0 表示在抓取线程内直接解析）
+        self.max_workers = max_workers
+        self.parse_workers = parse_workers
+        self.parse_pool = None
+        # 崩溃恢复日志（journal.CrawlJournal），None 表示不记录
+        self.journal = journal
+        # 分段存储（corpus_store.SegmentStore），None 表示每篇文章一个txt文件
+        self.store = store
+        # 各阶段计数和耗时（metrics.Metrics），运行中更新保存目录下的 metrics.prom
+        self.metrics = metrics if metrics is not None else Metrics(
+            'ifeng_text', prometheus_path=os.path.join(save_dir, 'metrics.prom'))
+        # 性能分析（profiling.RunProfiler），None 表示不分析
+        self.profiler = profiler
 
         if not os.path.exists(save_dir):
             os.makedirs(save_dir)
 
+    def iter_discovered_batches(self, target_count=100):
+        """逐批发现文章，供 DiscoveryStream 在后台线程中运行"""
+        batches = self.metrics.track_batches('discovery', self.iter_load_more_batches(target_count))
+        if self.journal is not None:
+            # 恢复运行时先处理上次发现但没保存的文章
+            return self.journal.replay_batches(batches, is_done=self.journal.is_item_done)
+        return batches
+
     def click_load_more_with_playwright(self):
         """使用Playwright模拟点击查看更多"""
+        all_articles = []
+        for batch in self.iter_load_more_batches():
+            all_articles.extend(batch)
+        return all_articles
+
+    def iter_load_more_batches(self, target_count=100):
+        """使用Playwright模拟点击查看更多，每次加载后产出新文章列表"""
         print("使用Playwright加载页面并点击查看更多...")
+        # 只在使用浏览器发现文章时才导入 Playwright
+        from playwright.sync_api import sync_playwright
 
         with sync_playwright() as p:
-            # 启动浏览器
-            browser = p.chromium.launch(headless=True)
-            page = browser.new_page()
-
-            # 设置用户代理
-            page.set_extra_http_headers({
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-            })
-
-            # 访问页面
-            print(f"访问页面: {self.base_url}")
-            page.goto(self.base_url)
-            time.sleep(3)
-
-            all_articles = []
-            seen_urls = set()
-
-            # 获取初始文章
-            initial_articles = self.extract_articles_from_playwright_page(page)
-            for article in initial_articles:
-                if article['url'] not in seen_urls:
-                    seen_urls.add(article['url'])
-                    all_articles.append(article)
-
-            print(f"初始页面获取到 {len(initial_articles)} 篇文章")
+            # 启动浏览器（设置用户代理）
+            browser = launch_browser(p, lean=self.lean_browser)
+            page, blocker = new_discovery_page(browser, DEFAULT_USER_AGENT, lean=self.lean_browser)
 
-            # 多次点击查看更多
-            click_count = 0
-            max_clicks = 10
-
-            while len(all_articles) < 100 and click_count < max_clicks:
-                click_count += 1
-                print(f"\n第 {click_count} 次点击查看更多...")
-
-                # 查找并点击查看更多按钮
+            try:
+                # 访问页面
+                print(f"访问页面: {self.base_url}")
+                page.goto(self.base_url)
                 try:
-                    # 等待按钮可点击
-                    page.wait_for_selector('.news-stream-basic-more', timeout=5000)
-
-                    # 点击查看更多按钮
-                    page.click('.news-stream-basic-more')
-                    print("点击查看更多成功")
-
-                    # 等待新内容加载
-                    time.sleep(3)
-
-                    # 获取新加载的文章
-                    new_articles = self.extract_articles_from_playwright_page(page)
+                    page.wait_for_selector('li.news_item', timeout=10000)
+                except Exception as e:
+                    print(f"等待文章列表超时: {e}")
+                item_count = count_elements(page, 'li.news_item')
+
+                found_count = 0
+                seen_urls = set()
+
+                # 获取初始文章
+                initial_articles = self.collect_new_articles(page)
+                batch = []
+                for article in initial_articles:
+                    if article['url'] not in seen_urls and found_count < target_count:
+                        seen_urls.add(article['url'])
+                        if not self.already_crawled(article['url']):
+                            batch.append(article)
+                            found_count += 1
+
+                print(f"初始页面获取到 {len(initial_articles)} 篇文章")
+                yield batch
+
+                # 多次点击查看更多
+                click_count = 0
+                max_clicks = 10
+
+                while found_count < target_count and click_count < max_clicks:
+                    click_count += 1
+                    print(f"\n第 {click_count} 次点击查看更多...")
+
+                    # 查找并点击查看更多按钮
+                    try:
+                        # 等待按钮可点击
+                        page.wait_for_selector('.news-stream-basic-more', timeout=5000)
+
+                        # 点击查看更多按钮
+                        page.click('.news-stream-basic-more')
+                        print("点击查看更多成功")
+
+                        # 等待新内容加载（新条目出现即返回）
+                        item_count = wait_for_count_growth(page, 'li.news_item', item_count, timeout=10000)
+
+                        # 获取新加载的文章
+                        new_articles = self.collect_new_articles(page)
+                    except Exception as e:
+                        print(f"点击查看更多失败: {e}")
+                        break
 
-                    # 添加新文章
-                    new_count = 0
+                    # 添加新文章（之前运行已保存过的文章不计入）
+                    batch = []
+                    loaded_count = 0
                     for article in new_articles:
-                        if article['url'] not in seen_urls and len(all_articles) < 100:
+                        if article['url'] not in seen_urls and found_count < target_count:
                             seen_urls.add(article['url'])
-                            all_articles.append(article)
-                            new_count += 1
+                            loaded_count += 1
+                            if self.already_crawled(article['url']):
+                                continue
+                            batch.append(article)
+                            found_count += 1
 
-                    print(f"新增 {new_count} 篇文章，累计 {len(all_articles)} 篇")
+                    print(f"新增 {len(batch)} 篇文章，累计 {found_count} 篇")
+                    yield batch
 
-                    # 如果没有新文章，停止尝试
-                    if new_count == 0:
+                    # 如果页面没有加载出新文章，停止尝试
+                    if loaded_count == 0:
                         print("没有新文章加载，停止点击")
                         break
 
-                except Exception as e:
-                    print(f"点击查看更多失败: {e}")
-                    break
+                print(f"通过 {click_count} 次点击查看更多，总共获取到 {found_count} 篇文章")
+            finally:
+                if blocker is not None:
+                    print(blocker.summary())
 
-            print(f"通过 {click_count} 次点击查看更多，总共获取到 {len(all_articles)} 篇文章")
+                # 关闭浏览器
+                browser.close()
+
+    def already_crawled(self, url):
+        """之前的运行是否已经保存过该文章"""
+        if self.journal is not None and self.journal.is_item_done(url):
+            return True
+        return self.seen_index is not None and self.seen_index.contains(url, 'text')
+
+    def collect_new_articles(self, page):
+        """只提取上一次之后新加载的文章条目，避免每轮重新解析整页"""
+        cards = collect_new_cards(page, NEWS_ITEM_SPEC)
+        if cards is None:
+            return self.extract_articles_from_playwright_page(page)
+
+        articles = []
+        for card in cards:
+            url = card['href']
+            if not url:
+                continue
+            if not url.startswith('http'):
+                url = urljoin('https://mil.ifeng.com', url)
 
-            # 关闭浏览器
-            browser.close()
+            title = next((text for text in card['titles'] if text is not None), "")
 
-            return all_articles
+            articles.append({
+                'url': url,
+                'title': title.strip(),
+                'news_time': card['time'],
+                'id': card['id'],
+                'source': 'playwright'
+            })
+        return articles
 
     def extract_articles_from_playwright_page(self, page):
         """从Playwright页面提取文章"""
@@ -108,7 +266,7 @@ class PhoenixTextCrawler:
     def extract_articles_from_html(self, html_content):
         """从HTML中提取文章"""
         articles = []
-        soup = BeautifulSoup(html_content, 'html.parser')
+        soup = make_soup(html_content)
 
         # 查找新闻列表
         news_items = soup.find_all('li', class_='news_item')
@@ -142,77 +300,26 @@ class PhoenixTextCrawler:
         return articles
 
     def get_page_content(self, url):
-        """使用requests获取文章内容"""
-        import requests
-        session = requests.Session()
-        session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-        })
-
-        try:
-            response = session.get(url, timeout=15)
-            response.encoding = 'utf-8'
-            return response.text
-        except Exception as e:
-            print(f"请求页面失败: {e}")
-            return None
+        """使用共享Session获取文章内容"""
+        with self.metrics.timer('fetch') as timer:
+            try:
+                status_code, text = fetch_text(self.session, url, cache=self.http_cache,
+                                               headers={'User-Agent': DEFAULT_USER_AGENT})
+            except Exception as e:
+                timer.error = True
+                print(f"请求页面失败: {e}")
+                return None
+            timer.error = status_code != 200
+            timer.size = len(text.encode('utf-8'))
+            return text
 
     def extract_text_from_article(self, html_content, article_info):
         """从文章页面提取文本信息"""
-        try:
-            soup = BeautifulSoup(html_content, 'html.parser')
-
-            title = soup.find('h1')
-            title_text = title.get_text().strip() if title else article_info['title']
-
-            time_elem = soup.find('span', class_='time') or soup.find('div', class_='time')
-            time_text = time_elem.get_text().strip() if time_elem else article_info.get('news_time', '')
-
-            content_selectors = [
-                '.article-content', '.article-body', '.content', '.main-content', '.text',
-                'div[class*="content"]', 'div[class*="text"]'
-            ]
-
-            content = None
-            for selector in content_selectors:
-                content = soup.select_one(selector)
-                if content:
-                    break
-
-            if not content:
-                paragraphs = soup.find_all('p')
-                meaningful_paragraphs = []
-                for p in paragraphs:
-                    text = p.get_text().strip()
-                    if len(text) > 20:
-                        meaningful_paragraphs.append(text)
-
-                content_text = '\n\n'.join(meaningful_paragraphs) if meaningful_paragraphs else "无法提取正文内容"
-            else:
-                for element in content.find_all(['script', 'style']):
-                    element.decompose()
-                content_text = content.get_text().strip()
-
-            content_text = re.sub(r'\s+', ' ', content_text).strip()
-
-            return {
-                'title': title_text,
-                'time': time_text,
-                'content': content_text,
-                'url': article_info['url']
-            }
-
-        except Exception as e:
-            print(f"提取文本失败: {e}")
-            return {
-                'title': article_info['title'],
-                'time': article_info.get('news_time', ''),
-                'content': f"提取失败: {str(e)}",
-                'url': article_info['url']
-            }
+        return extract_article_text(html_content, article_info)
 
     def save_text_to_file(self, text_info):
         """将文本保存到文件"""
+        started = time.perf_counter()
         try:
             filename = f"{self.file_counter:03d}.txt"
             filepath = os.path.join(self.save_dir, filename)
@@ -223,90 +330,185 @@ class PhoenixTextCrawler:
             file_content += "=" * 50 + "\n"
             file_content += text_info['content']
 
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(file_content)
+            if self.store is not None:
+                # 追加到分段文件，清单中记录段文件位置
+                file_path = self.store.put(filename, file_content.encode('utf-8'))
+            else:
+                with open(filepath, 'w', encoding='utf-8') as f:
+                    f.write(file_content)
+                file_path = os.path.abspath(filepath)
 
             file_info = {
                 'file_number': self.file_counter,
                 'title': text_info['title'],
                 'time': text_info['time'],
                 'url': text_info['url'],
-                'file_path': os.path.abspath(filepath),
+                'file_path': file_path,
                 'filename': filename,
                 'save_time': time.strftime('%Y-%m-%d %H:%M:%S'),
                 'content_length': len(text_info['content'])
             }
 
+            self.metrics.observe('write', time.perf_counter() - started, size=len(file_content.encode('utf-8')))
             print(f"  ✓ 文本保存成功: {filename} (长度: {len(text_info['content'])} 字符)")
             self.file_counter += 1
 
             return file_info
 
         except Exception as e:
+            self.metrics.observe('write', time.perf_counter() - started, error=True)
             print(f"  ✗ 保存文件失败: {e}")
             return None
 
-    def crawl_articles_text(self):
+    def crawl_articles_text(self, target_count=100):
         """爬取文章文本"""
         print("开始爬取凤凰军事新闻文本...")
         print(f"目标网址: {self.base_url}")
-        print("目标文章数量: 100 篇")
+        print(f"目标文章数量: {target_count} 篇")
         print("使用Playwright模拟浏览器点击查看更多...")
 
-        # 使用Playwright获取所有文章
-        articles = self.click_load_more_with_playwright()
-        if not articles:
-            print("未找到文章列表")
-            return
+        try:
+            self.restore_from_journal()
+            if len(self.text_data) >= target_count:
+                print("日志中已完成目标数量")
+                self.save_to_excel()
+                return
+
+            # 先启动解析进程，再在后台线程中用Playwright发现文章，发现到的文章立即进入抓取
+            with profile_stage(self.profiler, 'crawl'), ParsePool(self.parse_workers) as parse_pool, \
+                    DiscoveryStream(lambda: self.iter_discovered_batches(target_count)) as articles:
+                self.parse_pool = parse_pool
+                try:
+                    total_files = self.fetch_parse_and_save(articles, target_count)
+                finally:
+                    self.parse_pool = None
 
-        total_files = 0
+            # 恢复运行时发现的文章可能都已在日志中，日志恢复的文章仍要写索引和导出
+            if articles.found == 0 and not self.text_data:
+                print("未找到文章列表")
+                return
 
-        for i, article in enumerate(articles):
-            if total_files >= 100:
-                break
+            if self.seen_index is not None:
+                self.seen_index.flush()
 
-            print(f"\n处理第 {i + 1}/{len(articles)} 篇文章")
-            print(f"标题: {article['title']}")
+            with profile_stage(self.profiler, 'excel'):
+                self.save_to_excel()
+        finally:
+            # 提前返回（日志中已完成、未找到文章）或出错时也写出指标
+            self.metrics.finish(os.path.join(self.save_dir, 'metrics.json'))
 
-            html_content = self.get_page_content(article['url'])
-            if not html_content:
-                print("无法获取文章内容，跳过")
-                continue
+        print(f"\n爬取完成！")
+        print(f"处理文章: {articles.found} 篇")
+        print(f"保存文件: {total_files} 个")
+        print(f"文本文件保存在: {os.path.abspath(self.save_dir)} 文件夹")
+        print(f"路径列表保存在: {self.excel_file}")
+
+    def restore_from_journal(self):
+        """恢复运行时从日志重建清单并接着编号"""
+        if self.journal is None or not self.journal.resume:
+            return
+
+        self.text_data = self.journal.entries()
+        for file_info in self.text_data:
+            self.manifest.append(file_info['file_path'])
+        self.file_counter = self.journal.next_number()
+        print(f"从日志恢复: 已保存{len(self.text_data)}篇文章")
+
+    def fetch_parse_and_save(self, articles, target_count=100):
+        """并发抓取和解析文章，按原始顺序依次保存，返回保存的文件数（含恢复的文章）"""
+        total_files = len(self.text_data)
 
-            text_info = self.extract_text_from_article(html_content, article)
+        results = ordered_concurrent_map(self.fetch_and_extract, self.iter_pending_articles(articles),
+                                         max_workers=self.max_workers)
+
+        for (i, article), (text_info, error) in results:
+            print(f"\n处理第 {i + 1}/{target_count} 篇文章")
+            print(f"标题: {article['title']}")
 
-            if not text_info or not text_info.get('content') or text_info['content'] in ["无法提取正文内容",
-                                                                                         "提取失败"]:
-                print("本文未提取到有效文本，跳过")
+            if error:
+                print(error)
                 continue
 
             result = self.save_text_to_file(text_info)
             if result:
                 self.text_data.append(result)
+                self.manifest.append(result['file_path'])
                 total_files += 1
+                if self.journal is not None:
+                    self.journal.record_item(article['url'], result['file_number'], result)
+                if self.seen_index is not None:
+                    self.seen_index.add(article['url'], 'text')
+                # 够数立即停止，不再等待后续发现的文章
+                if total_files >= target_count:
+                    break
 
-            if i < len(articles) - 1:
-                time.sleep(1)
+        return total_files
 
-        self.save_to_excel()
+    def iter_pending_articles(self, articles):
+        """过滤重复和已保存的文章，按顺序产出(序号, 文章)"""
+        seen_urls = set()
+        for i, article in enumerate(articles):
+            if article['url'] in seen_urls or self.already_crawled(article['url']):
+                continue
+            seen_urls.add(article['url'])
+            if self.journal is not None:
+                self.journal.record_discovered(article['url'], article)
+            yield i, article
+
+    def fetch_and_extract(self, indexed_article):
+        """获取并解析单篇文章（在线程池中执行），返回(文本信息, 错误信息)"""
+        _, article = indexed_article
+
+        html_content = self.get_page_content(article['url'])
+        if not html_content:
+            return None, "无法获取文章内容，跳过"
+
+        with self.metrics.timer('parse'):
+            if self.parse_pool is not None and self.parse_pool.executor is not None:
+                # 解析交给进程池，当前线程等待结果期间其他线程继续抓取
+                text_info = self.parse_pool.submit(extract_article_text, html_content, article).result()
+            else:
+                text_info = self.extract_text_from_article(html_content, article)
 
-        print(f"\n爬取完成！")
-        print(f"处理文章: {len(articles)} 篇")
-        print(f"保存文件: {total_files} 个")
-        print(f"文本文件保存在: {os.path.abspath(self.save_dir)} 文件夹")
-        print(f"路径列表保存在: {self.excel_file}")
+        if not text_info or not text_info.get('content') or text_info['content'] in ["无法提取正文内容",
+                                                                                     "提取失败"]:
+            return None, "本文未提取到有效文本，跳过"
+
+        return text_info, None
 
     def save_to_excel(self):
         """将文件路径保存到Excel"""
-        if self.text_data:
-            path_data = [{'absolute_path': item['file_path']} for item in self.text_data]
-            df = pd.DataFrame(path_data)
-            df.to_excel(self.excel_file, index=False)
+        if self.manifest.count:
+            # 增量清单中只有绝对路径一列，流式导出
+            self.manifest.export_xlsx(self.excel_file)
+            self.manifest.close()
             print(f"文本文件绝对路径已保存到: {self.excel_file}")
         else:
             print("没有数据可保存")
 
 
 if __name__ == "__main__":
-    crawler = PhoenixTextCrawler("test")  # 文件夹名称改为test
-    crawler.crawl_articles_text()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="凤凰军事文本爬虫")
+    parser.add_argument('--resume', action='store_true', help="从日志恢复上次中断的爬取")
+    parser.add_argument('--seen-index', default="seen_index.db",
+                        help="已处理URL索引文件，默认与其他爬虫和调度器共用，可多个进程同时使用")
+    parser.add_argument('--store', help="把文本追加写入该目录下的分段文件，而不是每篇一个txt")
+    parser.add_argument('--profile', action='store_true', help="记录CPU和内存分析，写到 test_profile 目录")
+    args = parser.parse_args()
+
+    store = SegmentStore(args.store) if args.store else None
+    profiler = RunProfiler(profile_dir_for("test"), 'ifeng_text').start() if args.profile else None
+    try:
+        # 跨运行的已处理URL索引，与其他爬虫共用
+        with SeenIndex(args.seen_index) as seen_index, \
+                CrawlJournal(os.path.join("test", "ifeng_text_journal.jsonl"), resume=args.resume) as journal:
+            crawler = PhoenixTextCrawler("test", seen_index=seen_index,
+                                         http_cache=HttpCache("http_cache"),
+                                         parse_workers=os.cpu_count(), journal=journal,
+                                         store=store, profiler=profiler)  # 文件夹名称改为test
+            crawler.crawl_articles_text()
+    finally:
+        if store is not None:
+            store.close()
+        if profiler is not None:
+            profiler.stop()
\ No newline at end of file
@@ -0,0 +1,64 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+
+class ImageDownloadPipeline:
+    """图片并发下载流水线
+
+    文章解析出图片后立即 submit，由线程池并发下载；
+    每个图片主机(CDN)同时最多 per_host_limit 个请求。
+    编号和写文件由 download_func 自行加锁分配。
+    """
+
+    def __init__(self, download_func, max_workers=8, per_host_limit=4):
+        self.download_func = download_func
+        self.per_host_limit = per_host_limit
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.futures = []
+        self._host_semaphores = {}
+        self._lock = threading.Lock()
+
+    def _host_semaphore(self, url):
+        """获取图片所在主机的并发信号量"""
+        host = urlparse(url).netloc
+        with self._lock:
+            semaphore = self._host_semaphores.get(host)
+            if semaphore is None:
+                semaphore = threading.BoundedSemaphore(self.per_host_limit)
+                self._host_semaphores[host] = semaphore
+            return semaphore
+
+    def _run(self, url, args):
+        with self._host_semaphore(url):
+            return self.download_func(url, *args)
+
+    def submit(self, url, *args):
+        """提交一个下载任务，download_func(url, *args) 会在线程池中执行"""
+        future = self.executor.submit(self._run, url, args)
+        self.futures.append(future)
+        return future
+
+    def results(self):
+        """等待所有任务结束，按提交顺序返回成功的结果"""
+        results = []
+        for future in self.futures:
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"    图片下载任务出错: {e}")
+                continue
+            if result:
+                results.append(result)
+        return results
+
+    def close(self, cancel_pending=False):
+        """关闭线程池"""
+        self.executor.shutdown(wait=True, cancel_futures=cancel_pending)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close(cancel_pending=exc_type is not None)
+        return False
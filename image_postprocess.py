@@ -0,0 +1,335 @@
+import os
+import struct
+import threading
+import time
+from concurrent.futures import Future
+
+# 启用后处理时清单在绝对路径之后增加的列
+IMAGE_COLUMNS = ('format', 'width', 'height')
+
+# 识别格式和尺寸读取的文件头长度，JPEG 的 SOF 段可能排在较大的 EXIF 之后
+SNIFF_BYTES = 256 * 1024
+
+# 格式 -> 保存时的扩展名
+EXTENSIONS = {
+    'jpeg': '.jpg',
+    'png': '.png',
+    'gif': '.gif',
+    'webp': '.webp',
+    'bmp': '.bmp',
+    'avif': '.avif',
+}
+
+TRANSCODE_FORMATS = ('webp', 'avif')
+
+# JPEG 中带尺寸的帧头标记（SOF0-SOF15，不含 DHT、JPG、DAC）
+_JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+_pillow = None
+
+
+def _warm_up():
+    return True
+
+
+def load_pillow():
+    """导入 Pillow 并返回 PIL.Image，未安装时返回None；装有 pillow-avif-plugin 时一并注册AVIF"""
+    global _pillow
+    if _pillow is None:
+        try:
+            from PIL import Image
+        except ImportError:
+            _pillow = False
+        else:
+            try:
+                import pillow_avif  # noqa: F401
+            except ImportError:
+                pass
+            _pillow = Image
+    return _pillow or None
+
+
+def image_extension(image_format, default='.jpg'):
+    return EXTENSIONS.get(image_format, default)
+
+
+def discard_files(*paths):
+    """删除后处理留下的文件（无效或不再需要的图片、缩略图），None 和不存在的路径跳过"""
+    for path in paths:
+        if path and os.path.exists(path):
+            os.remove(path)
+
+
+def rename_thumbnail(thumbnail, name):
+    """缩略图处理时按临时文件名生成，保存时改为最终编号 name，返回新路径；没有缩略图时返回None"""
+    if thumbnail is None:
+        return None
+    renamed = os.path.join(os.path.dirname(thumbnail), name + os.path.splitext(thumbnail)[1])
+    os.replace(thumbnail, renamed)
+    return renamed
+
+
+def _jpeg_size(header):
+    i = 2
+    while i + 9 < len(header):
+        if header[i] != 0xFF:
+            i += 1
+            continue
+        marker = header[i + 1]
+        if marker == 0xFF or marker == 0x01 or 0xD0 <= marker <= 0xD8:
+            # 填充字节和不带长度的标记
+            i += 1 if marker == 0xFF else 2
+            continue
+        if marker in _JPEG_SOF_MARKERS:
+            height, width = struct.unpack('>HH', header[i + 5:i + 9])
+            return width, height
+        i += 2 + struct.unpack('>H', header[i + 2:i + 4])[0]
+    return None, None
+
+
+def _webp_size(header):
+    chunk = header[12:16]
+    if chunk == b'VP8 ' and len(header) >= 30:
+        width, height = struct.unpack('<HH', header[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b'VP8L' and len(header) >= 25:
+        bits = int.from_bytes(header[21:25], 'little')
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b'VP8X' and len(header) >= 30:
+        return int.from_bytes(header[24:27], 'little') + 1, int.from_bytes(header[27:30], 'little') + 1
+    return None, None
+
+
+def sniff_image(header):
+    """根据文件头识别图片，返回(格式, 宽, 高)，不是图片时返回None；尺寸读不到时为None"""
+    if header.startswith(b'\x89PNG\r\n\x1a\n'):
+        if len(header) >= 24 and header[12:16] == b'IHDR':
+            return ('png',) + struct.unpack('>II', header[16:24])
+        return 'png', None, None
+    if header[:2] == b'\xff\xd8':
+        return ('jpeg',) + _jpeg_size(header)
+    if header[:6] in (b'GIF87a', b'GIF89a') and len(header) >= 10:
+        return ('gif',) + struct.unpack('<HH', header[6:10])
+    if header[:4] == b'RIFF' and header[8:12] == b'WEBP':
+        return ('webp',) + _webp_size(header)
+    if header[:2] == b'BM' and len(header) >= 26:
+        width, height = struct.unpack('<ii', header[18:26])
+        return 'bmp', width, abs(height)
+    if header[4:8] == b'ftyp' and header[8:12] in (b'avif', b'avis'):
+        return 'avif', None, None
+    return None
+
+
+def _looks_truncated(path, image_format):
+    """没有 Pillow 时的粗略完整性检查：JPEG 末尾应有 EOI，PNG 末尾应有 IEND"""
+    if image_format not in ('jpeg', 'png'):
+        return False
+    with open(path, 'rb') as f:
+        f.seek(max(0, os.path.getsize(path) - 64))
+        tail = f.read()
+    return (b'\xff\xd9' if image_format == 'jpeg' else b'IEND') not in tail
+
+
+def _rgb_image(image):
+    if image.mode in ('RGB', 'RGBA'):
+        return image
+    has_alpha = 'A' in image.mode or 'transparency' in image.info
+    return image.convert('RGBA' if has_alpha else 'RGB')
+
+
+def _save_as(image, path, image_format, quality):
+    if image_format == 'jpeg':
+        image = image.convert('RGB')
+    else:
+        image = _rgb_image(image)
+    temp_path = path + '.part'
+    image.save(temp_path, format=image_format.upper(), quality=quality)
+    os.replace(temp_path, path)
+    return os.path.getsize(path)
+
+
+def process_image(path, name, options):
+    """校验一张图片并按 options 生成缩略图、转码，在后处理进程中执行
+
+    返回结果字典：path 为处理后要保存的文件（转码成功且更小时是新文件，原文件已删除），
+    format/width/height 为该文件的真实格式和尺寸，valid 为 False 时 error 说明原因。
+    """
+    started = time.perf_counter()
+    original_size = os.path.getsize(path)
+    result = {
+        'path': path,
+        'valid': False,
+        'format': None,
+        'width': None,
+        'height': None,
+        'original_size': original_size,
+        'file_size': original_size,
+        'transcoded': False,
+        'thumbnail': None,
+        'error': None,
+    }
+
+    try:
+        with open(path, 'rb') as f:
+            sniffed = sniff_image(f.read(SNIFF_BYTES))
+
+        Image = load_pillow()
+        if Image is None:
+            if sniffed is None:
+                result['error'] = "无法识别的图片格式"
+            elif _looks_truncated(path, sniffed[0]):
+                result['error'] = "图片数据不完整"
+            else:
+                result.update(valid=True, format=sniffed[0], width=sniffed[1], height=sniffed[2])
+            return result
+
+        # verify 之后图片对象不能再用，需要重新打开
+        with Image.open(path) as image:
+            image.verify()
+        with Image.open(path) as image:
+            image.load()
+            image_format = (image.format or '').lower() or (sniffed[0] if sniffed else None)
+            result.update(valid=True, format=image_format, width=image.width, height=image.height)
+
+            target = options.get('transcode')
+            stem = os.path.splitext(path)[0]
+            if options.get('thumbnail_size'):
+                thumbnail_format = target or 'jpeg'
+                thumbnail = image.copy()
+                thumbnail.thumbnail((options['thumbnail_size'], options['thumbnail_size']))
+                os.makedirs(options['thumbnail_dir'], exist_ok=True)
+                thumbnail_path = os.path.join(options['thumbnail_dir'], name + image_extension(thumbnail_format))
+                _save_as(thumbnail, thumbnail_path, thumbnail_format, options['quality'])
+                result['thumbnail'] = os.path.abspath(thumbnail_path)
+
+            # 动图转码会丢帧，保持原样
+            if target and target != image_format and not getattr(image, 'is_animated', False):
+                transcoded_path = stem + image_extension(target)
+                transcoded_size = _save_as(image, transcoded_path, target, options['quality'])
+                if transcoded_size < original_size:
+                    os.remove(path)
+                    result.update(path=transcoded_path, format=target, file_size=transcoded_size, transcoded=True)
+                else:
+                    # 转码后反而更大（原图已高度压缩），保留原图
+                    os.remove(transcoded_path)
+    except Exception as e:
+        result.update(valid=False, error=str(e) or type(e).__name__)
+    finally:
+        result['seconds'] = time.perf_counter() - started
+    return result
+
+
+class ImagePostProcessor:
+    """下载后的图片后处理：校验格式和尺寸、可选生成缩略图和转码为 WebP/AVIF
+
+    下载线程把临时文件交给 submit 后立即返回，处理在独立进程中执行，不占用下载线程；
+    处理完成后在后台线程中调用 callback(result)，由爬虫按真实格式命名保存并记录清单。
+    max_workers 为 0 时在调用线程内直接处理。未安装 Pillow 时只根据文件头识别格式和尺寸，
+    不能生成缩略图和转码。
+    """
+
+    def __init__(self, max_workers=None, thumbnail_size=None, thumbnail_dir="thumbnails",
+                 transcode=None, quality=80):
+        if transcode is not None and transcode not in TRANSCODE_FORMATS:
+            raise ValueError(f"不支持的转码格式: {transcode}，可选: {', '.join(TRANSCODE_FORMATS)}")
+        self.options = {
+            'thumbnail_size': thumbnail_size,
+            'thumbnail_dir': thumbnail_dir,
+            'transcode': transcode,
+            'quality': quality,
+        }
+        if (thumbnail_size or transcode) and load_pillow() is None:
+            print("未安装 Pillow，图片后处理只做格式和尺寸校验，不生成缩略图、不转码")
+            self.options.update(thumbnail_size=None, transcode=None)
+
+        self.max_workers = os.cpu_count() if max_workers is None else max_workers
+        self.executor = None
+        if self.max_workers > 0:
+            from concurrent.futures import ProcessPoolExecutor
+
+            self.executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            # 在下载线程启动前先把子进程创建好，避免在多线程进程中 fork
+            self.executor.submit(_warm_up).result()
+
+        self._condition = threading.Condition()
+        self._pending = 0
+        self.processed = 0
+        self.invalid = 0
+        self.transcoded = 0
+        self.thumbnails = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def submit(self, path, name, callback):
+        """提交一张图片，name 为不带扩展名的保存名（用于缩略图），返回 Future"""
+        with self._condition:
+            self._pending += 1
+
+        if self.executor is not None:
+            future = self.executor.submit(process_image, path, name, self.options)
+        else:
+            future = Future()
+            future.set_result(process_image(path, name, self.options))
+        future.add_done_callback(lambda f: self._done(f, path, callback))
+        return future
+
+    def _done(self, future, path, callback):
+        try:
+            if future.cancelled():
+                return
+            if future.exception() is not None:
+                result = {'path': path, 'valid': False, 'error': str(future.exception()), 'seconds': None,
+                          'original_size': 0, 'file_size': 0, 'transcoded': False, 'thumbnail': None}
+            else:
+                result = future.result()
+            with self._condition:
+                self.processed += 1
+                if result['valid']:
+                    self.bytes_in += result['original_size']
+                    self.bytes_out += result['file_size']
+                    self.transcoded += result['transcoded']
+                    self.thumbnails += result['thumbnail'] is not None
+                else:
+                    self.invalid += 1
+            callback(result)
+        except Exception as e:
+            print(f"    图片后处理出错: {e}")
+        finally:
+            with self._condition:
+                self._pending -= 1
+                self._condition.notify_all()
+
+    def wait(self):
+        """等待已提交的图片全部处理完（包括回调）"""
+        with self._condition:
+            self._condition.wait_for(lambda: self._pending == 0)
+
+    def summary(self):
+        with self._condition:
+            return {
+                'processed': self.processed,
+                'invalid': self.invalid,
+                'transcoded': self.transcoded,
+                'thumbnails': self.thumbnails,
+                'bytes_in': self.bytes_in,
+                'bytes_out': self.bytes_out,
+            }
+
+    def print_summary(self):
+        summary = self.summary()
+        print(f"图片后处理: {summary['processed']}张, 无效{summary['invalid']}张, "
+              f"转码{summary['transcoded']}张, 缩略图{summary['thumbnails']}张, "
+              f"体积 {summary['bytes_in'] / 1024 / 1024:.1f}MB -> {summary['bytes_out'] / 1024 / 1024:.1f}MB")
+
+    def close(self):
+        self.wait()
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
@@ -0,0 +1,133 @@
+import json
+import os
+import threading
+
+
+class CrawlJournal:
+    """爬取进度的预写日志，每行一条JSON记录，追加写入
+
+    记录三类事件：发现的文章(discovered)、完成的条目及其编号和清单信息(item)、
+    处理完的文章(article)。每条记录写入后立即 flush，进程崩溃时最多丢失正在写的一行；
+    每 fsync_every 条再 fsync 一次，应对断电。
+
+    resume=True 时先回放已有日志，爬虫据此接着编号、跳过已完成的工作并重建清单；
+    否则清空日志重新开始。可在多个线程中调用。
+    """
+
+    def __init__(self, path, resume=False, fsync_every=20):
+        self.path = path
+        self.resume = resume
+        self.fsync_every = fsync_every
+        self._lock = threading.Lock()
+        self._unsynced = 0
+
+        self.discovered = {}
+        self.items = {}
+        self.done_articles = set()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        if resume and os.path.exists(path):
+            self._replay()
+            self.file = open(path, 'a', encoding='utf-8')
+            if self.file.tell() > 0 and not self._ends_with_newline():
+                # 上次崩溃时最后一行没写完，另起一行
+                self.file.write('\n')
+        else:
+            self.file = open(path, 'w', encoding='utf-8')
+
+    def _ends_with_newline(self):
+        with open(self.path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b'\n'
+
+    def _replay(self):
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # 崩溃时写了一半的行
+                    continue
+                self._apply(record)
+
+    def _apply(self, record):
+        event = record.get('event')
+        if event == 'discovered':
+            self.discovered.setdefault(record['url'], record['article'])
+        elif event == 'item':
+            self.items[record['key']] = (record['number'], record['entry'])
+        elif event == 'article':
+            self.done_articles.add(record['url'])
+
+    def _write(self, record):
+        with self._lock:
+            self._apply(record)
+            self.file.write(json.dumps(record, ensure_ascii=False) + '\n')
+            self.file.flush()
+            self._unsynced += 1
+            if self._unsynced >= self.fsync_every:
+                os.fsync(self.file.fileno())
+                self._unsynced = 0
+
+    def record_discovered(self, url, article):
+        """记录发现的文章，重复的URL忽略"""
+        if url not in self.discovered:
+            self._write({'event': 'discovered', 'url': url, 'article': article})
+
+    def record_item(self, key, number, entry):
+        """记录完成的条目（文本文件或图片）及其编号和清单信息"""
+        self._write({'event': 'item', 'key': key, 'number': number, 'entry': entry})
+
+    def record_article_done(self, url):
+        """记录已全部处理完的文章"""
+        if url not in self.done_articles:
+            self._write({'event': 'article', 'url': url})
+
+    def is_item_done(self, key):
+        return key in self.items
+
+    def is_article_done(self, url):
+        return url in self.done_articles
+
+    def entries(self):
+        """按编号排列的已完成条目，用于重建清单"""
+        return [entry for _, entry in sorted(self.items.values(), key=lambda item: item[0])]
+
+    def next_number(self, default=1):
+        """下一个可用编号，接着上次的最大编号"""
+        if not self.items:
+            return default
+        return max(number for number, _ in self.items.values()) + 1
+
+    def pending_articles(self, is_done=None):
+        """已发现但尚未完成的文章，按发现顺序排列
+
+        is_done 判断文章是否已完成，默认看是否有 article 记录。
+        """
+        is_done = is_done or self.is_article_done
+        return [article for url, article in self.discovered.items() if not is_done(url)]
+
+    def replay_batches(self, batches, is_done=None):
+        """先产出上次已发现但未完成的文章，再继续 batches 中新的发现"""
+        pending = self.pending_articles(is_done)
+        if pending:
+            print(f"   从日志恢复待处理文章: {len(pending)}篇")
+            yield pending
+        yield from batches
+
+    def close(self):
+        with self._lock:
+            if not self.file.closed:
+                self.file.flush()
+                os.fsync(self.file.fileno())
+                self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
@@ -0,0 +1,80 @@
+import csv
+import os
+import threading
+
+# 清单列，与原来导出的Excel一致
+MANIFEST_COLUMNS = ('absolute_path',)
+
+
+def manifest_csv_path(excel_path):
+    """Excel清单对应的增量CSV清单路径：test.xlsx -> test.csv"""
+    return os.path.splitext(excel_path)[0] + '.csv'
+
+
+class ManifestWriter:
+    """增量清单：每保存一条就向CSV追加一行并立即flush，运行中断时清单仍然完整
+
+    第一次追加时清空旧清单并写表头；结束时 export_xlsx 逐行读取CSV，用 openpyxl 的
+    write_only 模式流式生成Excel，内存占用与条目数无关。可在多个线程中调用。
+    """
+
+    def __init__(self, csv_path, columns=MANIFEST_COLUMNS):
+        self.csv_path = csv_path
+        self.columns = tuple(columns)
+        self.count = 0
+        self._lock = threading.Lock()
+        self._file = None
+        self._writer = None
+
+    def _open(self):
+        directory = os.path.dirname(self.csv_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # 本次运行第一次写入时清空旧清单，关闭后再追加则接着写
+        self._file = open(self.csv_path, 'a' if self.count else 'w', encoding='utf-8', newline='')
+        self._writer = csv.writer(self._file)
+        if not self.count:
+            self._writer.writerow(self.columns)
+
+    def append(self, *values):
+        """追加一行，值的顺序与 columns 一致"""
+        with self._lock:
+            if self._file is None:
+                self._open()
+            self._writer.writerow(values)
+            self._file.flush()
+            self.count += 1
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+                self._writer = None
+
+    def iter_rows(self):
+        """逐行读取清单（不含表头）"""
+        with open(self.csv_path, encoding='utf-8', newline='') as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            yield from reader
+
+    def export_xlsx(self, excel_path):
+        """把CSV清单流式导出为Excel，返回Excel的绝对路径"""
+        from openpyxl import Workbook
+
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet('Sheet1')
+        sheet.append(self.columns)
+        for row in self.iter_rows():
+            sheet.append(row)
+
+        # 先写临时文件再替换，导出中断不会留下损坏的Excel
+        temp_path = excel_path + '.part'
+        workbook.save(temp_path)
+        os.replace(temp_path, excel_path)
+        return os.path.abspath(excel_path)
@@ -0,0 +1,217 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# 耗时直方图的桶上限（秒），与 Prometheus 默认桶相近
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class StageStats:
+    """一个阶段的计数：条目数、错误数、字节数和耗时分布
+
+    分位数由最近 max_samples 个耗时计算，直方图桶累计全部耗时。
+    """
+
+    def __init__(self, buckets, max_samples=10000):
+        self.buckets = buckets
+        self.items = 0
+        self.errors = 0
+        self.bytes = 0
+        self.seconds = 0.0
+        self.observed = 0
+        self.bucket_counts = [0] * len(buckets)
+        self.samples = deque(maxlen=max_samples)
+
+    def add(self, seconds, size, error, items):
+        self.items += items
+        self.bytes += size
+        if error:
+            self.errors += 1
+        if seconds is not None:
+            self.seconds += seconds
+            self.observed += 1
+            self.samples.append(seconds)
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    self.bucket_counts[i] += 1
+                    break
+
+    def percentile(self, q):
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def summary(self):
+        return {
+            'items': self.items,
+            'errors': self.errors,
+            'bytes': self.bytes,
+            'seconds': round(self.seconds, 3),
+            'observed': self.observed,
+            'p50': self.percentile(0.50),
+            'p95': self.percentile(0.95),
+            'p99': self.percentile(0.99),
+        }
+
+
+class StageTimer:
+    """timer() 中可以设置本次的字节数、条目数和是否出错"""
+
+    def __init__(self):
+        self.size = 0
+        self.items = 1
+        self.error = False
+
+
+class Metrics:
+    """爬虫各阶段（发现、抓取、解析、下载、写入）的计数和耗时直方图
+
+    prometheus_path 不为 None 时，运行中每隔 update_interval 秒把指标写成
+    Prometheus 文本格式（可由 node_exporter 的 textfile collector 采集）；
+    结束时 finish 写出JSON汇总。可在多个线程中调用。
+    """
+
+    def __init__(self, name, prometheus_path=None, update_interval=5.0, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.prometheus_path = prometheus_path
+        self.update_interval = update_interval
+        self.buckets = tuple(buckets)
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._stages = {}
+        self._last_write = 0.0
+        self._writing = False
+
+    def _stage(self, stage):
+        stats = self._stages.get(stage)
+        if stats is None:
+            stats = self._stages[stage] = StageStats(self.buckets)
+        return stats
+
+    def observe(self, stage, seconds=None, size=0, error=False, items=1):
+        """记录一次操作：耗时（秒）、字节数、是否出错、产出的条目数"""
+        with self._lock:
+            self._stage(stage).add(seconds, size, error, 0 if error else items)
+            due = (self.prometheus_path is not None and not self._writing
+                   and time.monotonic() - self._last_write >= self.update_interval)
+            if due:
+                self._writing = True
+        if due:
+            try:
+                self.write_prometheus()
+            finally:
+                with self._lock:
+                    self._writing = False
+                    self._last_write = time.monotonic()
+
+    @contextmanager
+    def timer(self, stage):
+        """计时一次操作，抛出异常时记为错误"""
+        timer = StageTimer()
+        start = time.perf_counter()
+        try:
+            yield timer
+        except BaseException:
+            self.observe(stage, time.perf_counter() - start, timer.size, True)
+            raise
+        self.observe(stage, time.perf_counter() - start, timer.size, timer.error, timer.items)
+
+    def track_batches(self, stage, batches):
+        """逐批产出 batches，记录每批的等待时间和文章数"""
+        iterator = iter(batches)
+        while True:
+            start = time.perf_counter()
+            try:
+                batch = next(iterator)
+            except StopIteration:
+                return
+            self.observe(stage, time.perf_counter() - start, items=len(batch))
+            yield batch
+
+    def summary(self):
+        """各阶段的汇总，分位数单位为秒"""
+        with self._lock:
+            stages = {stage: stats.summary() for stage, stats in self._stages.items()}
+        elapsed = time.time() - self.started
+        for stats in stages.values():
+            stats['items_per_second'] = round(stats['items'] / elapsed, 3) if elapsed > 0 else None
+        return {'crawler': self.name, 'elapsed_seconds': round(elapsed, 3), 'stages': stages}
+
+    def render_prometheus(self):
+        """Prometheus 文本格式"""
+        label = self.name.replace('\\', '\\\\').replace('"', '\\"')
+        lines = []
+        with self._lock:
+            stages = sorted(self._stages.items())
+            for metric, help_text, field in (
+                    ('crawler_stage_items_total', '各阶段完成的条目数', 'items'),
+                    ('crawler_stage_errors_total', '各阶段的错误数', 'errors'),
+                    ('crawler_stage_bytes_total', '各阶段处理的字节数', 'bytes')):
+                lines.append(f"# HELP {metric} {help_text}")
+                lines.append(f"# TYPE {metric} counter")
+                for stage, stats in stages:
+                    lines.append(f'{metric}{{crawler="{label}",stage="{stage}"}} {getattr(stats, field)}')
+
+            lines.append("# HELP crawler_stage_seconds 各阶段单次操作耗时")
+            lines.append("# TYPE crawler_stage_seconds histogram")
+            for stage, stats in stages:
+                labels = f'crawler="{label}",stage="{stage}"'
+                cumulative = 0
+                for bound, count in zip(self.buckets, stats.bucket_counts):
+                    cumulative += count
+                    lines.append(f'crawler_stage_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'crawler_stage_seconds_bucket{{{labels},le="+Inf"}} {stats.observed}')
+                lines.append(f'crawler_stage_seconds_sum{{{labels}}} {stats.seconds:.6f}')
+                lines.append(f'crawler_stage_seconds_count{{{labels}}} {stats.observed}')
+
+        lines.append("# HELP crawler_elapsed_seconds 本次运行已用时间")
+        lines.append("# TYPE crawler_elapsed_seconds gauge")
+        lines.append(f'crawler_elapsed_seconds{{crawler="{label}"}} {time.time() - self.started:.3f}')
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _write_atomic(path, text):
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(suffix='.tmp', dir=directory)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(text)
+            os.replace(temp_path, path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def write_prometheus(self, path=None):
+        path = path or self.prometheus_path
+        try:
+            self._write_atomic(path, self.render_prometheus())
+        except OSError as e:
+            print(f"写入指标文件失败: {e}")
+
+    def write_json(self, path):
+        summary = self.summary()
+        self._write_atomic(path, json.dumps(summary, ensure_ascii=False, indent=2))
+        return summary
+
+    def finish(self, json_path=None):
+        """运行结束：写出最终的 Prometheus 文件和JSON汇总，打印各阶段耗时"""
+        if self.prometheus_path is not None:
+            self.write_prometheus()
+        summary = self.write_json(json_path) if json_path else self.summary()
+
+        print(f"\n各阶段指标 ({self.name}):")
+        for stage, stats in summary['stages'].items():
+            p50, p95, p99 = (f"{stats[q] * 1000:.0f}ms" if stats[q] is not None else "-"
+                             for q in ('p50', 'p95', 'p99'))
+            print(f"   {stage:<10} 数量: {stats['items']:<6} 错误: {stats['errors']:<4} "
+                  f"字节: {stats['bytes']:<10} p50/p95/p99: {p50}/{p95}/{p99}")
+        if json_path:
+            print(f"   指标汇总: {os.path.abspath(json_path)}")
+        return summary
@@ -0,0 +1,53 @@
+from concurrent.futures import Future
+
+import html_parser
+
+
+def _warm_up():
+    return True
+
+
+class ParsePool:
+    """HTML解析进程池
+
+    抓取线程把页面文本交给 submit，解析在独立进程中执行，CPU解析与网络请求互相重叠。
+    max_workers 为 0 或 None 时在调用线程内直接解析（不启动进程）。
+    解析函数必须是模块级函数，参数和返回值需可序列化。
+    """
+
+    def __init__(self, max_workers=0):
+        self.max_workers = max_workers or 0
+        self.executor = None
+        if self.max_workers > 0:
+            from concurrent.futures import ProcessPoolExecutor
+
+            # 子进程沿用当前选择的解析后端
+            self.executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                initializer=html_parser.set_parser_backend,
+                                                initargs=(html_parser.get_parser_backend(),))
+            # 在抓取线程启动前先把子进程创建好
+            self.executor.submit(_warm_up).result()
+
+    def submit(self, func, *args):
+        """提交解析任务，返回 Future"""
+        if self.executor is not None:
+            return self.executor.submit(func, *args)
+
+        future = Future()
+        try:
+            future.set_result(func(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
@@ -0,0 +1,255 @@
+import socket
+import threading
+from urllib.parse import urlparse
+
+# 精简模式下拦截的资源类型，发现文章链接只需要 HTML 和脚本
+BLOCKED_RESOURCE_TYPES = {'image', 'media', 'font', 'stylesheet'}
+
+# 第三方统计/广告脚本的主机关键字
+TRACKER_KEYWORDS = (
+    'doubleclick', 'googlesyndication', 'google-analytics', 'googletagmanager',
+    'hm.baidu.com', 'cnzz.com', 'umeng.com', 'irs01', 'miaozhen',
+    'beacon.sina.com.cn', 'sax.sina.com.cn', 'log.sina.cn', 'd1.sina.com.cn',
+    'stadig.ifeng.com', 'dol.deliver.ifeng.com',
+)
+
+LEAN_VIEWPORT = {'width': 1280, 'height': 800}
+FULL_VIEWPORT = {'width': 1920, 'height': 1080}
+
+# 共享浏览器的CDP地址，由 SharedBrowser 设置；None 表示每次发现各自启动浏览器
+_shared_endpoint = None
+
+
+class ResourceBlocker:
+    """通过 route 拦截图片、媒体、字体、样式表和第三方统计脚本，并统计拦截情况"""
+
+    def __init__(self, blocked_types=None, tracker_keywords=TRACKER_KEYWORDS):
+        self.blocked_types = set(BLOCKED_RESOURCE_TYPES if blocked_types is None else blocked_types)
+        self.tracker_keywords = tracker_keywords
+        self.blocked_requests = 0
+        self.blocked_by_type = {}
+        self.allowed_requests = 0
+        self.loaded_bytes = 0
+
+    def install(self, context):
+        """在浏览器上下文上注册拦截规则"""
+        context.route("**/*", self.handle_route)
+        context.on("response", self.on_response)
+
+    def is_tracker(self, url):
+        host_and_path = urlparse(url).netloc + urlparse(url).path
+        return any(keyword in host_and_path for keyword in self.tracker_keywords)
+
+    def handle_route(self, route):
+        request = route.request
+        resource_type = request.resource_type
+        if resource_type in self.blocked_types or self.is_tracker(request.url):
+            kind = resource_type if resource_type in self.blocked_types else 'tracker'
+            self.blocked_requests += 1
+            self.blocked_by_type[kind] = self.blocked_by_type.get(kind, 0) + 1
+            route.abort()
+        else:
+            self.allowed_requests += 1
+            route.continue_()
+
+    def on_response(self, response):
+        try:
+            content_length = response.headers.get('content-length')
+            if content_length and content_length.isdigit():
+                self.loaded_bytes += int(content_length)
+        except Exception:
+            pass
+
+    def summary(self):
+        """拦截统计的文字说明"""
+        detail = ", ".join(f"{kind}:{count}" for kind, count in sorted(self.blocked_by_type.items()))
+        return (f"拦截请求 {self.blocked_requests} 个 ({detail or '无'}), "
+                f"放行 {self.allowed_requests} 个, 加载 {self.loaded_bytes / 1024:.0f}KB")
+
+
+def launch_browser(playwright, lean=True):
+    """启动Chromium，精简模式下无头运行（无需显示器）
+
+    进程内启动了 SharedBrowser 时改为连接到共享的浏览器，关闭时只断开连接。
+    """
+    if _shared_endpoint is not None:
+        return playwright.chromium.connect_over_cdp(_shared_endpoint)
+    return playwright.chromium.launch(headless=lean)
+
+
+class SharedBrowser:
+    """在单独的线程中启动一个Chromium，同一进程内的多个爬虫通过CDP连接共用
+
+    Playwright 同步接口的对象不能跨线程使用，因此每个发现线程仍有自己的 Playwright 实例，
+    只是不再各自启动浏览器进程。启动失败时各爬虫退回到自己启动浏览器。
+    """
+
+    def __init__(self, lean=True):
+        self.lean = lean
+        self.endpoint = None
+        self.error = None
+        self.ready = threading.Event()
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="shared-browser", daemon=True)
+
+    @staticmethod
+    def _free_port():
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            return sock.getsockname()[1]
+
+    def _run(self):
+        try:
+            from playwright.sync_api import sync_playwright
+
+            with sync_playwright() as p:
+                port = self._free_port()
+                browser = p.chromium.launch(headless=self.lean,
+                                            args=[f'--remote-debugging-port={port}'])
+                try:
+                    self.endpoint = f'http://127.0.0.1:{port}'
+                    self.ready.set()
+                    self.stop_event.wait()
+                finally:
+                    browser.close()
+        except Exception as e:
+            self.error = e
+        finally:
+            self.ready.set()
+
+    def start(self):
+        """启动浏览器，成功后 launch_browser 改为连接它；返回是否启动成功"""
+        global _shared_endpoint
+        self.thread.start()
+        self.ready.wait()
+        if self.endpoint is None:
+            print(f"共享浏览器启动失败，各爬虫将自行启动浏览器: {self.error}")
+            return False
+        _shared_endpoint = self.endpoint
+        return True
+
+    def close(self):
+        global _shared_endpoint
+        if _shared_endpoint == self.endpoint:
+            _shared_endpoint = None
+        self.stop_event.set()
+        if self.thread.is_alive():
+            self.thread.join()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+
+def new_discovery_page(browser, user_agent, lean=True):
+    """创建用于发现文章的页面，返回(page, blocker)；非精简模式下 blocker 为 None"""
+    context = browser.new_context(
+        viewport=LEAN_VIEWPORT if lean else FULL_VIEWPORT,
+        user_agent=user_agent
+    )
+
+    blocker = None
+    if lean:
+        blocker = ResourceBlocker()
+        blocker.install(context)
+
+    return context.new_page(), blocker
+
+
+def count_elements(page, selector):
+    """统计页面中匹配selector的节点数"""
+    return page.evaluate("(selector) => document.querySelectorAll(selector).length", selector)
+
+
+def scroll_to_bottom(page):
+    page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+
+
+def wait_for_count_growth(page, selector, previous_count, timeout=10000, idle_timeout=2000):
+    """等待匹配selector的节点数超过previous_count，返回最新数量
+
+    新内容一出现就立即返回；超时后再最多等待一次网络空闲，替代固定的 sleep。
+    """
+    try:
+        page.wait_for_function(
+            "([selector, count]) => document.querySelectorAll(selector).length > count",
+            arg=[selector, previous_count],
+            timeout=timeout
+        )
+    except Exception:
+        try:
+            page.wait_for_load_state('networkidle', timeout=idle_timeout)
+        except Exception:
+            pass
+    return count_elements(page, selector)
+
+
+def rounds_for_target(target_count, items_per_round=10, min_rounds=3):
+    """按目标数量估算最多需要的滚动/点击轮数"""
+    return max(min_rounds, -(-target_count // items_per_round))
+
+
+# 在页面内提取尚未处理过的卡片：处理过的节点打上标记属性，下一轮只返回新节点
+COLLECT_NEW_CARDS_JS = """
+(spec) => {
+    let cardSelector = null;
+    for (const selector of spec.cardSelectors) {
+        if (document.querySelector(selector)) {
+            cardSelector = selector;
+            break;
+        }
+    }
+    if (!cardSelector) {
+        return null;
+    }
+
+    const text = (el) => el ? (el.textContent || '').trim() : null;
+    const first = (card, selectors) => {
+        for (const selector of selectors) {
+            const el = card.querySelector(selector);
+            if (el) {
+                return el;
+            }
+        }
+        return null;
+    };
+
+    const cards = document.querySelectorAll(cardSelector + ':not([' + spec.markAttribute + '])');
+    const result = [];
+    for (const card of cards) {
+        const link = card.querySelector(spec.linkSelector);
+        const href = link ? link.getAttribute('href') : null;
+        if (!href) {
+            // 链接可能稍后才填入，不做标记，下一轮再取
+            continue;
+        }
+        card.setAttribute(spec.markAttribute, '1');
+        result.push({
+            href: href,
+            link_text: text(link),
+            titles: spec.titleSelectors.map((selector) => text(card.querySelector(selector))),
+            time: text(first(card, spec.timeSelectors)) || '',
+            id: card.getAttribute('data-id') || ''
+        });
+    }
+    return result;
+}
+"""
+
+
+def collect_new_cards(page, spec):
+    """返回上一次调用之后新出现的卡片（紧凑的字典列表）
+
+    spec 包含 cardSelectors（按顺序取第一个有匹配的）、linkSelector、titleSelectors、
+    timeSelectors 和 markAttribute。页面上没有匹配的卡片或执行出错时返回 None，
+    调用方可退回到解析整页 HTML。
+    """
+    try:
+        return page.evaluate(COLLECT_NEW_CARDS_JS, spec)
+    except Exception as e:
+        print(f"   页面内提取出错: {e}")
+        return None
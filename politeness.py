@@ -0,0 +1,163 @@
+import threading
+import time
+from urllib.parse import urlparse
+
+# 表示服务器过载或拒绝访问、需要降速的状态码
+THROTTLE_STATUS = (403, 429, 503)
+
+
+def is_success(status):
+    """只有成功的响应（2xx 和条件请求的304）才说明可以提速"""
+    return status is not None and (200 <= status < 300 or status == 304)
+
+
+def parse_retry_after(value, now=None):
+    """解析 Retry-After 头，返回需要等待的秒数；支持秒数和HTTP日期两种格式，无法解析返回None"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    # HTTP日期格式很少见，用到时才导入 email.utils
+    from email.utils import parsedate_to_datetime
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at is None:
+        return None
+    now = time.time() if now is None else now
+    return max(0.0, retry_at.timestamp() - now)
+
+
+class HostBucket:
+    """单个主机的令牌桶：rate 为每秒请求数，burst 为允许的突发请求数"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.last_decrease = 0.0
+        self.latency = None
+        self.requests = 0
+        self.throttled = 0
+        self.errors = 0
+
+    def refill(self, now):
+        # 暂停期间 updated 在未来，不积累令牌
+        if now > self.updated:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+
+class PolitenessScheduler:
+    """按主机限速的请求调度，代替代码中固定的 sleep
+
+    每个主机一个令牌桶，acquire 在令牌不足或服务器要求等待时阻塞到可以发请求为止。
+    速率按 AIMD 调整：响应成功（2xx/304）且延迟低于 latency_target 时每次加 increase，
+    遇到 403/429/503、5xx、连接错误或延迟过高时乘以 decrease（每个主机每 cooldown 秒最多降一次），
+    404 等其他状态码不调整。403/429/503 带 Retry-After 时该主机暂停到指定时间。
+    默认从每秒1次开始、最高每秒4次，与原来固定 sleep 的节奏相近。可在多个线程中调用。
+    """
+
+    def __init__(self, rate=1.0, burst=2, min_rate=0.2, max_rate=4.0, increase=0.5, decrease=0.5,
+                 latency_target=3.0, cooldown=2.0, max_retry_after=300.0, host_rates=None):
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        # 指定的初始速率高于上限时以初始速率为上限
+        self.max_rate = max(max_rate, rate)
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_target = latency_target
+        self.cooldown = cooldown
+        self.max_retry_after = max_retry_after
+        # 个别主机的初始速率，如 {'n.sinaimg.cn': 20}
+        self.host_rates = dict(host_rates or {})
+        self._lock = threading.Lock()
+        self._buckets = {}
+
+    @staticmethod
+    def host_of(url):
+        return urlparse(url).netloc.lower()
+
+    def _bucket(self, host):
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            rate = min(self.max_rate, max(self.min_rate, self.host_rates.get(host, self.rate)))
+            bucket = self._buckets[host] = HostBucket(rate, self.burst)
+        return bucket
+
+    def acquire(self, url):
+        """为一次请求取得令牌，必要时等待；返回等待的秒数"""
+        host = self.host_of(url)
+        with self._lock:
+            bucket = self._bucket(host)
+            now = time.monotonic()
+            bucket.refill(now)
+            # 令牌可以预支成负数，后来的请求依次排在后面
+            bucket.tokens -= 1
+            bucket.requests += 1
+            wait = max(bucket.blocked_until - now, 0.0) + max(-bucket.tokens / bucket.rate, 0.0)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def _decrease(self, bucket, now, factor):
+        if now - bucket.last_decrease < self.cooldown:
+            return
+        bucket.rate = max(self.min_rate, bucket.rate * factor)
+        bucket.tokens = min(bucket.tokens, 0.0)
+        bucket.last_decrease = now
+
+    def record(self, url, status=None, latency=None, retry_after=None):
+        """记录一次响应的状态码、延迟（秒）和 Retry-After 头，据此调整该主机的速率"""
+        host = self.host_of(url)
+        with self._lock:
+            bucket = self._bucket(host)
+            now = time.monotonic()
+
+            if latency is not None:
+                bucket.latency = latency if bucket.latency is None else 0.8 * bucket.latency + 0.2 * latency
+
+            if status in THROTTLE_STATUS:
+                bucket.throttled += 1
+                delay = parse_retry_after(retry_after)
+                if delay is not None:
+                    bucket.blocked_until = max(bucket.blocked_until, now + min(delay, self.max_retry_after))
+                    bucket.tokens = min(bucket.tokens, 0.0)
+                    bucket.updated = max(bucket.updated, bucket.blocked_until)
+                self._decrease(bucket, now, self.decrease)
+            elif status is not None and status >= 500:
+                bucket.errors += 1
+                self._decrease(bucket, now, self.decrease)
+            elif bucket.latency is not None and bucket.latency > self.latency_target:
+                # 延迟升高说明服务器开始吃力，温和降速
+                self._decrease(bucket, now, (1 + self.decrease) / 2)
+            elif is_success(status):
+                bucket.rate = min(self.max_rate, bucket.rate + self.increase)
+
+    def record_error(self, url):
+        """记录连接失败、超时等没有响应的错误"""
+        host = self.host_of(url)
+        with self._lock:
+            bucket = self._bucket(host)
+            bucket.errors += 1
+            self._decrease(bucket, time.monotonic(), self.decrease)
+
+    def stats(self):
+        """各主机当前速率和计数"""
+        with self._lock:
+            return {
+                host: {
+                    'rate': round(bucket.rate, 2),
+                    'latency': None if bucket.latency is None else round(bucket.latency, 3),
+                    'requests': bucket.requests,
+                    'throttled': bucket.throttled,
+                    'errors': bucket.errors,
+                }
+                for host, bucket in self._buckets.items()
+            }
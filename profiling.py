@@ -0,0 +1,175 @@
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+
+def profile_dir_for(output_dir):
+    """性能分析结果放在输出目录旁边：test -> test_profile"""
+    return os.path.normpath(os.path.abspath(output_dir)) + '_profile'
+
+
+class RunProfiler:
+    """一次运行的CPU和内存分析
+
+    CPU：cProfile 分析主线程以及开始分析后新建的线程（抓取、下载、发现线程），
+    结束时合并写成 <name>.prof，可用 python -m pstats、snakeviz 等工具打开。
+    内存：tracemalloc 记录每个阶段的峰值和阶段结束时的内存快照（<name>-<阶段>.snapshot，
+    可用 tracemalloc.Snapshot.load 读取），占用最多的分配位置写入 profile_summary.json。
+    tracemalloc 会明显拖慢运行，只在需要分析时启用。
+    """
+
+    def __init__(self, output_dir, name, top=25, frames=5):
+        self.output_dir = output_dir
+        self.name = name
+        self.top = top
+        self.frames = frames
+        self.stages = []
+        self._lock = threading.Lock()
+        self._profiles = []
+        self._started = None
+
+    def _profile_new_thread(self, *args):
+        # threading.setprofile 的钩子在新线程的第一个事件时调用，换成该线程自己的 cProfile
+        import cProfile
+
+        sys.setprofile(None)
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Python 3.12 起 cProfile 基于 sys.monitoring，主线程的分析已覆盖所有线程
+            return
+        with self._lock:
+            self._profiles.append(profile)
+
+    def start(self):
+        # 分析用的模块只在启用分析时导入，不拖慢爬虫模块的导入
+        import cProfile
+        import tracemalloc
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        tracemalloc.start(self.frames)
+        threading.setprofile(self._profile_new_thread)
+        profile = cProfile.Profile()
+        self._profiles.append(profile)
+        self._started = time.perf_counter()
+        profile.enable()
+        return self
+
+    @contextmanager
+    def stage(self, stage_name):
+        """分析一个阶段：墙钟时间、进程CPU时间、内存峰值和阶段结束时的分配快照"""
+        import tracemalloc
+
+        tracemalloc.reset_peak()
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+            current, peak = tracemalloc.get_traced_memory()
+            # 取快照和统计本身开销较大，暂停本线程的CPU分析，免得混进结果
+            self._profiles[0].disable()
+            try:
+                top_allocations, snapshot_path = self._snapshot(stage_name)
+            finally:
+                self._profiles[0].enable()
+            self.stages.append({
+                'stage': stage_name,
+                'wall_seconds': round(wall, 3),
+                'cpu_seconds': round(cpu, 3),
+                'current_mb': round(current / 1024 / 1024, 2),
+                'peak_mb': round(peak / 1024 / 1024, 2),
+                'snapshot': snapshot_path,
+                'top_allocations': top_allocations,
+            })
+
+    def _snapshot(self, stage_name):
+        import tracemalloc
+
+        # 不用 filter_traces 过滤 tracemalloc 自身的分配，分配多时过滤比取快照还慢，统计时跳过即可
+        snapshot = tracemalloc.take_snapshot()
+        snapshot_path = os.path.join(self.output_dir, f"{self.name}-{stage_name}.snapshot")
+        snapshot.dump(snapshot_path)
+
+        top_allocations = []
+        for stat in snapshot.statistics('lineno'):
+            if len(top_allocations) >= self.top:
+                break
+            frame = stat.traceback[0]
+            if frame.filename == tracemalloc.__file__:
+                continue
+            top_allocations.append({
+                'location': f"{frame.filename}:{frame.lineno}",
+                'size_kb': round(stat.size / 1024, 1),
+                'count': stat.count,
+            })
+        return top_allocations, snapshot_path
+
+    def stop(self):
+        """停止分析并写出结果，返回汇总"""
+        import pstats
+        import tracemalloc
+
+        threading.setprofile(None)
+        with self._lock:
+            profiles = list(self._profiles)
+        profiles[0].disable()
+        elapsed = time.perf_counter() - self._started
+
+        stats = None
+        for profile in profiles:
+            try:
+                profile.create_stats()
+            except Exception:
+                continue
+            if not profile.stats:
+                continue
+            if stats is None:
+                stats = pstats.Stats(profile)
+            else:
+                stats.add(profile)
+
+        prof_path = os.path.join(self.output_dir, f"{self.name}.prof")
+        if stats is not None:
+            stats.dump_stats(prof_path)
+        tracemalloc.stop()
+
+        summary = {
+            'name': self.name,
+            'elapsed_seconds': round(elapsed, 3),
+            'profiled_threads': len(profiles),
+            'cpu_profile': prof_path if stats is not None else None,
+            'stages': self.stages,
+        }
+        with open(os.path.join(self.output_dir, 'profile_summary.json'), 'w', encoding='utf-8') as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+
+        print(f"\n性能分析结果 ({self.name}):")
+        for stage in self.stages:
+            print(f"   {stage['stage']:<10} 耗时: {stage['wall_seconds']:.1f}秒  CPU: {stage['cpu_seconds']:.1f}秒  "
+                  f"内存峰值: {stage['peak_mb']:.1f}MB")
+        if stats is not None:
+            print(f"   CPU分析: {prof_path} (python -m pstats 或 snakeviz 打开)")
+            stats.sort_stats('cumulative').print_stats(15)
+        print(f"   内存快照和汇总: {self.output_dir}")
+        return summary
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+        return False
+
+
+def profile_stage(profiler, stage_name):
+    """profiler 为 None 时不做任何事，方便在爬虫中无条件标记阶段"""
+    if profiler is None:
+        return nullcontext()
+    return profiler.stage(stage_name)
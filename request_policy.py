@@ -0,0 +1,180 @@
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import urlparse
+
+# 可以重试的状态码（服务器暂时过载或网关错误）
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+
+class LatencyTracker:
+    """按主机记录最近 window 次成功请求的耗时，用于估计 p95"""
+
+    def __init__(self, window=200, min_samples=20):
+        self.window = window
+        self.min_samples = min_samples
+        self._lock = threading.Lock()
+        self._samples = {}
+
+    def record(self, host, seconds):
+        with self._lock:
+            samples = self._samples.get(host)
+            if samples is None:
+                samples = self._samples[host] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def percentile(self, host, q=0.95):
+        """样本不足 min_samples 时返回None"""
+        with self._lock:
+            samples = self._samples.get(host)
+            if not samples or len(samples) < self.min_samples:
+                return None
+            ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class RequestPolicy:
+    """幂等GET的请求策略：连接/读取分开超时、带抖动的指数退避重试、可选的对冲请求（默认关闭）
+
+    重试：连接失败、超时、分块传输中断以及 RETRY_STATUS 中的状态码，最多再试 retries 次，
+    第n次重试前等待 backoff * 2**n 秒以内的随机时间（不超过 max_backoff）。
+    对冲：第一次请求超过该主机 p95 耗时（至少 hedge_min_delay 秒）仍未完成时再发一个相同请求，
+    取先成功的结果，另一个的结果由 discard 清理。样本不足时用 hedge_default_delay。
+    可在多个线程中调用。
+    """
+
+    def __init__(self, connect_timeout=5, read_timeout=15, download_deadline=120, retries=3,
+                 backoff=0.5, max_backoff=8.0, hedge=False, hedge_downloads=False, hedge_min_delay=0.2, hedge_default_delay=3.0,
+                 hedge_workers=64, retry_status=RETRY_STATUS):
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        # 单次下载的总时限，防止服务器一直慢慢吐数据而读取超时永远不触发
+        self.download_deadline = download_deadline
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        # 对冲会向站点多发重复请求，需要显式开启
+        self.hedge = hedge
+        self.hedge_downloads = hedge_downloads
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_default_delay = hedge_default_delay
+        self.hedge_workers = hedge_workers
+        self.retry_status = tuple(retry_status)
+        self.latency = LatencyTracker()
+
+        self._lock = threading.Lock()
+        self._executor = None
+        self.retried = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    @property
+    def timeout(self):
+        """传给 requests 的 (连接超时, 读取超时)"""
+        return self.connect_timeout, self.read_timeout
+
+    @staticmethod
+    def host_of(url):
+        return urlparse(url).netloc.lower()
+
+    def backoff_delay(self, attempt):
+        """第 attempt 次重试前的等待秒数（full jitter）"""
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def hedge_delay(self, url):
+        p95 = self.latency.percentile(self.host_of(url))
+        if p95 is None:
+            return self.hedge_default_delay
+        return max(self.hedge_min_delay, p95)
+
+    def is_retryable(self, error):
+        """连接错误、超时和可重试状态码的HTTP错误可以重试"""
+        from requests import ConnectionError, HTTPError, Timeout
+        from requests.exceptions import ChunkedEncodingError
+
+        if isinstance(error, HTTPError):
+            return error.response is not None and error.response.status_code in self.retry_status
+        return isinstance(error, (ConnectionError, Timeout, ChunkedEncodingError))
+
+    def _timed(self, url, attempt):
+        start = time.monotonic()
+        result = attempt()
+        self.latency.record(self.host_of(url), time.monotonic() - start)
+        return result
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.hedge_workers,
+                                                    thread_name_prefix='hedge')
+            return self._executor
+
+    def _hedged(self, url, attempt, discard=None):
+        executor = self._get_executor()
+        first = executor.submit(self._timed, url, attempt)
+        futures = [first]
+        done, _ = wait(futures, timeout=self.hedge_delay(url))
+        if not done:
+            with self._lock:
+                self.hedged += 1
+            futures.append(executor.submit(self._timed, url, attempt))
+
+        winner = None
+        error = None
+        pending = set(futures)
+        while pending and winner is None:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    error = future.exception()
+                elif winner is None:
+                    winner = future
+        if winner is None:
+            raise error
+
+        if winner is not first:
+            with self._lock:
+                self.hedge_wins += 1
+        # 另一个请求无法中途取消，完成后丢弃它的结果
+        for future in futures:
+            if future is not winner:
+                future.add_done_callback(lambda f: self._discard(f, discard))
+        return winner.result()
+
+    @staticmethod
+    def _discard(future, discard):
+        if discard is not None and not future.cancelled() and future.exception() is None:
+            discard(future.result())
+
+    def run(self, url, attempt, status_of=None, hedge=False, discard=None):
+        """执行 attempt()，按策略重试和对冲，返回最后一次的结果
+
+        status_of 从结果中取状态码判断是否需要重试；discard 清理被放弃的结果（如临时文件）。
+        """
+        for n in range(self.retries + 1):
+            last = n == self.retries
+            try:
+                result = self._hedged(url, attempt, discard) if hedge else self._timed(url, attempt)
+            except Exception as e:
+                if last or not self.is_retryable(e):
+                    raise
+            else:
+                if last or status_of is None or status_of(result) not in self.retry_status:
+                    return result
+                if discard is not None:
+                    discard(result)
+            with self._lock:
+                self.retried += 1
+            time.sleep(self.backoff_delay(n))
+
+    def stats(self):
+        with self._lock:
+            return {'retried': self.retried, 'hedged': self.hedged, 'hedge_wins': self.hedge_wins}
+
+    def close(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
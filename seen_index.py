@@ -0,0 +1,197 @@
+import hashlib
+import math
+import os
+import sqlite3
+import struct
+import threading
+
+# 过滤器快照文件头：标识、位数、哈希个数、快照对应的数据库代号
+_SNAPSHOT_HEADER = struct.Struct('<4sQQQ')
+_SNAPSHOT_MAGIC = b'SIB2'
+
+
+class BloomFilter:
+    """位数组布隆过滤器，输入为64位整数键"""
+
+    def __init__(self, capacity, error_rate=0.001):
+        capacity = max(1, int(capacity))
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key):
+        # 双重哈希：用键的高低32位组合出 hash_count 个位置
+        h1 = key & 0xFFFFFFFF
+        h2 = (key >> 32) & 0xFFFFFFFF | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, key):
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key):
+        for pos in self._positions(key):
+            if not self.bits[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
+
+
+class SeenIndex:
+    """跨运行持久化的已处理URL索引
+
+    每个URL只存一个64位哈希键（SQLite整数主键），内存中用布隆过滤器挡掉绝大多数
+    未见过的URL，只有疑似命中时才查询SQLite。多个爬虫可共用同一个索引文件，
+    kind 用来区分文章、图片等不同类型的记录。
+
+    每次提交新记录时在同一事务中把数据库代号(generation)加一，过滤器快照记录保存时的代号，
+    打开时代号一致才使用快照。多个进程同时使用同一个索引时，关闭前发现有其他进程写入过，
+    先把数据库中的全部键并入过滤器再保存，快照不会缺少其他进程的记录。
+    """
+
+    def __init__(self, path="seen_index.db", expected_items=1000000, error_rate=0.001,
+                 batch_size=200):
+        self.path = path
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._pending = set()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS seen (key INTEGER PRIMARY KEY)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER)")
+        self.conn.execute("INSERT OR IGNORE INTO meta VALUES ('generation', 0)")
+        self.conn.commit()
+
+        # 过滤器已包含的数据库代号，None 表示有其他进程写入后过滤器可能不完整
+        self._generation = self._read_generation()
+        self.bloom = self._load_bloom(self._generation)
+        if self.bloom is None:
+            # 没有可用的过滤器快照（首次运行、上次异常退出或其他进程写入过），从SQLite重建
+            count = self.conn.execute("SELECT COUNT(*) FROM seen").fetchone()[0]
+            self.bloom = BloomFilter(max(expected_items, count * 2), error_rate)
+            self._merge_from_db()
+
+    @property
+    def bloom_path(self):
+        return self.path + ".bloom"
+
+    def _read_generation(self):
+        return self.conn.execute("SELECT value FROM meta WHERE name = 'generation'").fetchone()[0]
+
+    def _merge_from_db(self):
+        """把数据库中的全部键加入过滤器，代号与读到的键在同一个读事务中取得"""
+        self.conn.execute("BEGIN")
+        try:
+            generation = self._read_generation()
+            for (key,) in self.conn.execute("SELECT key FROM seen"):
+                self.bloom.add(key & 0xFFFFFFFFFFFFFFFF)
+        finally:
+            self.conn.commit()
+        self._generation = generation
+
+    def _load_bloom(self, generation):
+        """读取close时保存的过滤器快照，快照的代号与数据库一致才使用"""
+        try:
+            with open(self.bloom_path, 'rb') as f:
+                magic, size, hash_count, saved_generation = _SNAPSHOT_HEADER.unpack(
+                    f.read(_SNAPSHOT_HEADER.size))
+                bits = bytearray(f.read())
+        except (OSError, struct.error):
+            return None
+
+        if magic != _SNAPSHOT_MAGIC or saved_generation != generation or len(bits) != (size + 7) // 8:
+            return None
+
+        bloom = BloomFilter.__new__(BloomFilter)
+        bloom.size = size
+        bloom.hash_count = hash_count
+        bloom.bits = bits
+        return bloom
+
+    def _save_bloom(self):
+        if self._generation is None or self._generation != self._read_generation():
+            # 其他进程写入过，先并入它们的记录
+            self._merge_from_db()
+        temp_path = self.bloom_path + ".tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(_SNAPSHOT_HEADER.pack(_SNAPSHOT_MAGIC, self.bloom.size, self.bloom.hash_count,
+                                          self._generation))
+            f.write(self.bloom.bits)
+        os.replace(temp_path, self.bloom_path)
+
+    @staticmethod
+    def make_key(url, kind):
+        """URL + 类型 -> 64位哈希键"""
+        digest = hashlib.blake2b(f"{kind}:{url}".encode('utf-8'), digest_size=8).digest()
+        return int.from_bytes(digest, 'big')
+
+    @staticmethod
+    def _to_sql(key):
+        # SQLite 整数为有符号64位
+        return key - (1 << 64) if key >= (1 << 63) else key
+
+    def contains(self, url, kind="article"):
+        """URL是否已经处理过"""
+        key = self.make_key(url, kind)
+        with self._lock:
+            if key not in self.bloom:
+                return False
+            if key in self._pending:
+                return True
+            row = self.conn.execute("SELECT 1 FROM seen WHERE key = ?", (self._to_sql(key),)).fetchone()
+            return row is not None
+
+    def add(self, url, kind="article"):
+        """记录URL已处理，按批提交到磁盘"""
+        key = self.make_key(url, kind)
+        with self._lock:
+            self.bloom.add(key)
+            self._pending.add(key)
+            if len(self._pending) >= self.batch_size:
+                self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._pending:
+            return
+        self.conn.executemany("INSERT OR IGNORE INTO seen (key) VALUES (?)",
+                              [(self._to_sql(key),) for key in self._pending])
+        self.conn.execute("UPDATE meta SET value = value + 1 WHERE name = 'generation'")
+        generation = self._read_generation()
+        self.conn.commit()
+        self._pending.clear()
+        # 代号只比上次多一说明期间没有其他进程写入，过滤器仍与数据库一致
+        if self._generation is not None and generation == self._generation + 1:
+            self._generation = generation
+        else:
+            self._generation = None
+
+    def flush(self):
+        """把未提交的记录写入磁盘"""
+        with self._lock:
+            self._flush_locked()
+
+    def close(self):
+        with self._lock:
+            self._flush_locked()
+            self._save_bloom()
+            self.conn.close()
+
+    def __contains__(self, url):
+        return self.contains(url)
+
+    def __len__(self):
+        self.flush()
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM seen").fetchone()[0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
@@ -0,0 +1,133 @@
+import json
+import re
+import time
+
+from http_client import get_request_policy, get_session, polite_request
+
+# 新浪军事首页卡片列表(.ty-cardlist-w)翻页时请求的滚动新闻接口，页面改版时需同步参数
+DEFAULT_FEED_URL = "https://feed.mix.sina.com.cn/api/roll/get"
+DEFAULT_FEED_PARAMS = {
+    'pageid': '2',
+    'lid': '2514',
+    'versionNumber': '1.2.4',
+}
+
+
+class SinaFeedDiscovery:
+    """不启动浏览器，直接分页请求卡片列表背后的JSON接口发现文章
+
+    返回与 Playwright 方式相同的 {'title', 'link', 'time'} 字典。
+    给出 seen_index 时跳过索引中 seen_kind 类型已处理过的文章，不计入目标数量。
+    """
+
+    def __init__(self, session=None, feed_url=DEFAULT_FEED_URL, params=None, page_size=50,
+                 headers=None, timeout=None, verify=False, seen_index=None, seen_kind='article'):
+        self.session = session or get_session()
+        self.feed_url = feed_url
+        self.params = dict(DEFAULT_FEED_PARAMS if params is None else params)
+        self.page_size = page_size
+        self.headers = headers or {'Referer': 'https://mil.news.sina.com.cn/'}
+        # None 表示使用请求策略的连接/读取超时
+        self.timeout = timeout
+        self.verify = verify
+        self.seen_index = seen_index
+        self.seen_kind = seen_kind
+
+    def fetch_page(self, page):
+        """请求第page页，返回接口原始条目列表"""
+        params = dict(self.params, num=self.page_size, page=page)
+        policy = get_request_policy()
+
+        def attempt():
+            with polite_request(self.feed_url):
+                response = self.session.get(self.feed_url, params=params, headers=self.headers,
+                                            timeout=self.timeout or policy.timeout, verify=self.verify)
+                response.raise_for_status()
+                return response.text
+
+        return self.parse_feed(policy.run(self.feed_url, attempt))
+
+    @staticmethod
+    def parse_feed(text):
+        """解析接口返回，兼容 JSONP 包装以及 result.data / data 两种结构"""
+        text = text.strip()
+        match = re.match(r'^[\w.$]+\((.*)\)\s*;?$', text, re.DOTALL)
+        if match:
+            text = match.group(1)
+
+        data = json.loads(text)
+        if isinstance(data, dict) and isinstance(data.get('result'), dict):
+            data = data['result']
+        items = data.get('data', []) if isinstance(data, dict) else data
+        return items if isinstance(items, list) else []
+
+    @staticmethod
+    def to_article(item):
+        """接口条目 -> {'title', 'link', 'time'}，无效条目返回None"""
+        if not isinstance(item, dict):
+            return None
+
+        url = item.get('url') or item.get('wapurl') or ''
+        if url.startswith('//'):
+            url = 'https:' + url
+        if not any(domain in url for domain in ['.sina.com.cn', '.sina.cn']):
+            return None
+
+        title = re.sub(r'<[^>]+>', '', item.get('title') or '').strip()
+        if not title or len(title) < 5:
+            return None
+
+        news_time = ""
+        timestamp = item.get('ctime') or item.get('intime') or item.get('mtime')
+        if timestamp and str(timestamp).isdigit():
+            news_time = time.strftime('%Y-%m-%d %H:%M', time.localtime(int(timestamp)))
+
+        return {
+            'title': title,
+            'link': url,
+            'time': news_time
+        }
+
+    def iter_batches(self, target_count=100, max_pages=50):
+        """每请求一页就产出该页的新文章列表，直到达到目标数量或接口没有更多数据"""
+        seen_urls = set()
+        count = 0
+
+        for page in range(1, max_pages + 1):
+            items = self.fetch_page(page)
+            if not items:
+                break
+
+            batch = []
+            for item in items:
+                article = self.to_article(item)
+                if not article or article['link'] in seen_urls:
+                    continue
+                seen_urls.add(article['link'])
+                if self.seen_index is not None and self.seen_index.contains(article['link'], self.seen_kind):
+                    continue
+                batch.append(article)
+                count += 1
+                if count >= target_count:
+                    break
+
+            yield batch
+            if count >= target_count:
+                return
+
+    def iter_articles(self, target_count=100, max_pages=50):
+        """逐篇产出新文章"""
+        for batch in self.iter_batches(target_count, max_pages):
+            yield from batch
+
+    def discover(self, target_count=100, max_pages=50):
+        """获取文章列表"""
+        print(" 使用Feed接口获取文章...")
+        articles = []
+        try:
+            for article in self.iter_articles(target_count, max_pages):
+                articles.append(article)
+        except Exception as e:
+            print(f"   Feed接口请求出错: {e}")
+        print(f"   最终获取: {len(articles)}篇文章")
+        return articles
@@ -1,22 +1,57 @@
 # sina_image_crawler.py
-import requests
 import os
-import pandas as pd
+import argparse
 import time
-import urllib3
-from bs4 import BeautifulSoup
+from html_parser import make_soup
 import re
-from playwright.sync_api import sync_playwright
 from urllib.parse import urljoin
 import hashlib
-
-# 禁用SSL警告
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+import threading
+from http_client import get_session, fetch_text, disable_insecure_warnings, download_to_tempfile
+from http_cache import HttpCache
+from sina_feed import SinaFeedDiscovery
+from discovery_stream import DiscoveryStream
+from playwright_utils import (launch_browser, new_discovery_page, count_elements, scroll_to_bottom,
+                              wait_for_count_growth, rounds_for_target, collect_new_cards)
+from image_pipeline import ImageDownloadPipeline
+from seen_index import SeenIndex
+from journal import CrawlJournal
+from corpus_store import SegmentStore
+from manifest import ManifestWriter, manifest_csv_path, MANIFEST_COLUMNS
+from image_postprocess import (ImagePostProcessor, IMAGE_COLUMNS, TRANSCODE_FORMATS, image_extension,
+                              discard_files, rename_thumbnail)
+from metrics import Metrics
+from profiling import RunProfiler, profile_dir_for, profile_stage
+
+# 卡片列表中的文章链接，用于判断"加载更多"是否已经出现新内容
+CARD_LINK_SELECTOR = '.ty-cardlist-w a[href]'
+# 等待新内容的超时时间（毫秒），内容出现后会立即返回
+SCROLL_WAIT_TIMEOUT = 2000
+CLICK_WAIT_TIMEOUT = 10000
+
+# 页面内增量提取卡片的规则，与 extract_articles_from_playwright_page 的解析逻辑一致
+CARD_SPEC = {
+    'cardSelectors': [
+        '.ty-cardlist-w .ty-card',
+        '.ty-card',
+        '.news-item',
+        '.news-list li',
+        '.feed-card-item',
+        '[data-sudaclick*="news"]'
+    ],
+    'linkSelector': 'a[href]',
+    'titleSelectors': ['h1', 'h2', 'h3', 'h4'],
+    'timeSelectors': ['time', '[class*="time"], [class*="date"]'],
+    'markAttribute': 'data-crawler-seen',
+}
 
 
 class SinaMilitaryImageCrawler:
-    def __init__(self):
-        self.images_folder = "test"
+    def __init__(self, max_workers=8, per_host_limit=4, max_image_size=20 * 1024 * 1024,
+                 seen_index=None, http_cache=None, discovery='playwright',
+                 lean_browser=True, journal=None, store=None, images_folder="test",
+                 excel_file="test.xlsx", metrics=None, profiler=None, postprocessor=None):
+        self.images_folder = images_folder
         os.makedirs(self.images_folder, exist_ok=True)
 
         self.headers = {
@@ -25,59 +60,123 @@ class SinaMilitaryImageCrawler:
             'Referer': 'https://mil.news.sina.com.cn/',
         }
 
+        # 禁用SSL警告（请求使用 verify=False）
+        disable_insecure_warnings()
+        # 共享连接池的HTTP客户端
+        self.session = get_session()
+
         self.processed_articles = set()
         self.processed_images = set()
         self.image_data = []  # 存储图片路径的列表
         self.image_count = 0
+        # 已提交后处理、尚未校验完的图片数，校验通过后才计入 image_count
+        self.pending_images = 0
         self.max_images = 100
+        # 图片大小范围（字节），过小的通常是图标，下载时会尽早放弃
+        self.min_image_size = 5000
+        self.max_image_size = max_image_size
+
+        # 图片并发下载参数，编号分配需加锁保证 001、002… 连续
+        self.max_workers = max_workers
+        self.per_host_limit = per_host_limit
+        self.counter_lock = threading.Lock()
+
+        # 跨运行的已处理URL索引（seen_index.SeenIndex），None 表示不启用
+        self.seen_index = seen_index
+        # 文章页的条件请求缓存（http_cache.HttpCache），None 表示不启用
+        self.http_cache = http_cache
+        # 文章发现方式：'playwright' 浏览器点击加载，'feed' 直接请求JSON接口
+        self.discovery = discovery
+        # 精简浏览器模式：无头运行并拦截图片、字体、样式和统计脚本
+        self.lean_browser = lean_browser
+        # 崩溃恢复日志（journal.CrawlJournal），None 表示不记录
+        self.journal = journal
+        # 分段存储（corpus_store.SegmentStore），None 表示每张图片一个文件
+        self.store = store
+        # 图片后处理（image_postprocess.ImagePostProcessor），None 表示下载后直接保存
+        self.postprocessor = postprocessor
+        # 下载一张就追加一行的增量清单，结束时导出为Excel；后处理时增加真实格式和尺寸列
+        self.excel_path = os.path.abspath(excel_file)
+        columns = MANIFEST_COLUMNS + IMAGE_COLUMNS if postprocessor is not None else MANIFEST_COLUMNS
+        self.manifest = ManifestWriter(manifest_csv_path(self.excel_path), columns=columns)
+        # 各阶段计数和耗时（metrics.Metrics），运行中更新图片目录下的 metrics.prom
+        self.metrics = metrics if metrics is not None else Metrics(
+            'sina_image', prometheus_path=os.path.join(self.images_folder, 'metrics.prom'))
+        # 性能分析（profiling.RunProfiler），None 表示不分析
+        self.profiler = profiler
+
+    def iter_discovered_batches(self):
+        """按配置的方式逐批发现文章，供 DiscoveryStream 在后台线程中运行"""
+        if self.discovery == 'feed':
+            print(" 使用Feed接口获取文章...")
+            feed_headers = dict(self.headers, Accept='application/json, text/plain, */*')
+            feed = SinaFeedDiscovery(session=self.session, headers=feed_headers,
+                                     seen_index=self.seen_index, seen_kind='image_article')
+            # 以图片目标数量作为文章数量上限
+            batches = feed.iter_batches(target_count=self.max_images)
+        else:
+            batches = self.iter_load_more_batches()
+        batches = self.metrics.track_batches('discovery', batches)
+
+        if self.journal is not None:
+            # 恢复运行时先处理上次发现但没处理完的文章
+            return self.journal.replay_batches(batches)
+        return batches
 
     def click_load_more_with_playwright(self):
         """使用Playwright获取文章"""
+        all_articles = []
+        for batch in self.iter_load_more_batches():
+            all_articles.extend(batch)
+        return all_articles
+
+    def iter_load_more_batches(self):
+        """使用Playwright滚动并点击加载更多，每轮产出新发现的文章列表"""
         print(" 使用Playwright获取文章...")
+        # 只在使用浏览器发现文章时才导入 Playwright
+        from playwright.sync_api import sync_playwright
 
         all_articles = []
+        seen_urls = set()
 
         with sync_playwright() as p:
-            browser = p.chromium.launch(headless=False)
-            context = browser.new_context(
-                viewport={'width': 1920, 'height': 1080},
-                user_agent=self.headers['User-Agent']
-            )
-            page = context.new_page()
+            browser = launch_browser(p, lean=self.lean_browser)
+            page, blocker = new_discovery_page(browser, self.headers['User-Agent'], lean=self.lean_browser)
 
             try:
                 page.goto("https://mil.news.sina.com.cn/", timeout=60000)
-                time.sleep(5)
 
                 page.wait_for_selector('.ty-cardlist-w', timeout=10000)
+                card_count = count_elements(page, CARD_LINK_SELECTOR)
                 print("   页面加载完成")
 
                 click_count = 0
                 consecutive_failures = 0
                 max_consecutive_failures = 5
-                max_clicks = 10
+                # 按目标数量决定最多点击次数，够数即停
+                max_clicks = rounds_for_target(self.max_images, min_rounds=10)
 
                 while (click_count < max_clicks and
                        consecutive_failures < max_consecutive_failures and
-                       self.image_count < self.max_images):
+                       len(all_articles) < self.max_images and
+                       not self.target_reached()):
 
-                    page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                    time.sleep(2)
+                    scroll_to_bottom(page)
+                    card_count = wait_for_count_growth(page, CARD_LINK_SELECTOR, card_count,
+                                                       timeout=SCROLL_WAIT_TIMEOUT)
 
-                    current_articles = self.extract_articles_from_playwright_page(page)
-
-                    seen_urls = {article['link'] for article in all_articles}
-                    new_articles = [article for article in current_articles if article['link'] not in seen_urls]
+                    new_articles = self.collect_new_articles(page, seen_urls)
 
                     if new_articles:
                         all_articles.extend(new_articles)
                         print(f"   滚动获取: {len(new_articles)}篇新文章 (总计: {len(all_articles)}篇)")
+                        yield new_articles
                         consecutive_failures = 0
                     else:
                         consecutive_failures += 1
                         print(f"   滚动未发现新文章，连续失败: {consecutive_failures}次")
 
-                    if self.image_count >= self.max_images:
+                    if self.target_reached():
                         break
 
                     clicked = False
@@ -128,23 +227,24 @@ class SinaMilitaryImageCrawler:
                             print(f"   点击成功 (第{click_count}次)")
 
                             print(f"   等待新内容加载...")
-                            time.sleep(5)
+                            card_count = wait_for_count_growth(page, CARD_LINK_SELECTOR, card_count,
+                                                               timeout=CLICK_WAIT_TIMEOUT)
 
                             for i in range(3):
-                                page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                                time.sleep(2)
+                                scroll_to_bottom(page)
+                                new_count = wait_for_count_growth(page, CARD_LINK_SELECTOR, card_count,
+                                                                  timeout=SCROLL_WAIT_TIMEOUT)
                                 print(f"   滚动加载第{i + 1}次")
+                                if new_count <= card_count:
+                                    break
+                                card_count = new_count
 
-                            time.sleep(3)
-
-                            post_click_articles = self.extract_articles_from_playwright_page(page)
-                            post_seen_urls = {article['link'] for article in all_articles}
-                            post_new_articles = [article for article in post_click_articles if
-                                                 article['link'] not in post_seen_urls]
+                            post_new_articles = self.collect_new_articles(page, seen_urls)
 
                             if post_new_articles:
                                 all_articles.extend(post_new_articles)
                                 print(f"   点击后获取: {len(post_new_articles)}篇新文章 (总计: {len(all_articles)}篇)")
+                                yield post_new_articles
 
                             consecutive_failures = 0
 
@@ -155,7 +255,6 @@ class SinaMilitaryImageCrawler:
                         consecutive_failures += 1
                         print(f"   未找到可点击按钮，连续失败: {consecutive_failures}次")
 
-                    time.sleep(2)
                     print(
                         f"   当前进度: 文章{len(all_articles)}篇, 图片{self.image_count}/{self.max_images}张, 点击次数: {click_count}/{max_clicks}")
 
@@ -165,15 +264,63 @@ class SinaMilitaryImageCrawler:
             except Exception as e:
                 print(f"   Playwright执行出错: {e}")
             finally:
+                if blocker is not None:
+                    print(f"   {blocker.summary()}")
                 browser.close()
 
-        return all_articles
+    def collect_new_articles(self, page, seen_urls):
+        """只提取上一轮之后新出现的卡片，并用 seen_urls 增量去重"""
+        cards = collect_new_cards(page, CARD_SPEC)
+        if cards is None:
+            # 页面上没有已知的卡片结构，退回解析整页
+            articles = self.extract_articles_from_playwright_page(page)
+        else:
+            articles = [article for article in map(self.article_from_card, cards) if article]
+
+        new_articles = []
+        for article in articles:
+            if article['link'] in seen_urls:
+                continue
+            seen_urls.add(article['link'])
+            new_articles.append(article)
+        return new_articles
+
+    def article_from_card(self, card):
+        """页面内提取的卡片 -> 文章信息，无效卡片返回None"""
+        url = card['href']
+        if not url:
+            return None
+
+        if not url.startswith('http'):
+            url = urljoin('https://mil.news.sina.com.cn/', url)
+
+        if not any(domain in url for domain in ['.sina.com.cn', '.sina.cn']):
+            return None
+
+        title = ""
+        for title_text in card['titles']:
+            if title_text and len(title_text.strip()) > 5:
+                title = title_text.strip()
+                break
+
+        if not title:
+            title_text = (card['link_text'] or '').strip()
+            if title_text and len(title_text) > 5:
+                title = title_text
+
+        if not title or len(title) < 5:
+            return None
+
+        return {
+            'title': title,
+            'link': url,
+        }
 
     def extract_articles_from_playwright_page(self, page):
         """从Playwright页面提取文章信息"""
         try:
             html_content = page.content()
-            soup = BeautifulSoup(html_content, 'html.parser')
+            soup = make_soup(html_content)
 
             articles = []
 
@@ -244,61 +391,167 @@ class SinaMilitaryImageCrawler:
 
     def get_article_content(self, article_url):
         """获取文章详情页内容"""
-        try:
-            response = requests.get(article_url, headers=self.headers, timeout=10, verify=False)
-            response.encoding = 'utf-8'
-            return response.text if response.status_code == 200 else None
-        except Exception:
-            return None
+        with self.metrics.timer('fetch') as timer:
+            try:
+                status_code, text = fetch_text(self.session, article_url, cache=self.http_cache,
+                                               headers=self.headers, verify=False)
+            except Exception:
+                timer.error = True
+                return None
+            if status_code != 200:
+                timer.error = True
+                return None
+            timer.size = len(text.encode('utf-8'))
+            return text
 
     def download_image(self, img_url):
-        """下载图片"""
-        if self.image_count >= self.max_images:
+        """下载图片（可在多个线程中并发调用）"""
+        if self.target_reached():
             return None
 
-        try:
-            img_hash = hashlib.md5(img_url.encode()).hexdigest()
+        img_hash = hashlib.md5(img_url.encode()).hexdigest()
+        with self.counter_lock:
             if img_hash in self.processed_images:
                 return None
+            # 先占位，避免多个线程重复下载同一张图片
+            self.processed_images.add(img_hash)
+
+        if self.seen_index is not None and self.seen_index.contains(img_url, 'image'):
+            return None
 
+        try:
             img_headers = self.headers.copy()
             img_headers['Accept'] = 'image/webp,image/apng,image/*,*/*;q=0.8'
 
-            response = requests.get(img_url, headers=img_headers, timeout=10, verify=False)
-            if response.status_code == 200:
-                if len(response.content) < 5000:
-                    return None
+            with self.metrics.timer('download') as timer:
+                downloaded = download_to_tempfile(self.session, img_url, self.images_folder,
+                                                  min_size=self.min_image_size,
+                                                  max_size=self.max_image_size,
+                                                  headers=img_headers, verify=False)
+                # 大小不符合要求的不算下载成功
+                timer.items = 1 if downloaded else 0
+                timer.size = downloaded[1] if downloaded else 0
+            if downloaded:
+                temp_path, size = downloaded
+
+                if self.postprocessor is not None:
+                    return self.submit_postprocess(img_url, temp_path)
 
                 file_extension = os.path.splitext(img_url.split('?')[0])[1]
                 if not file_extension or len(file_extension) > 5:
                     file_extension = '.jpg'
 
-                filename = f"{self.image_count + 1:03d}{file_extension}"
-                filepath = os.path.join(self.images_folder, filename)
+                with self.counter_lock:
+                    if self.image_count >= self.max_images:
+                        os.remove(temp_path)
+                        return None
 
-                with open(filepath, 'wb') as f:
-                    f.write(response.content)
+                    filename = f"{self.image_count + 1:03d}{file_extension}"
+                    absolute_path = self.store_image(temp_path, filename, size)
 
-                self.processed_images.add(img_hash)
-                self.image_count += 1
+                    self.image_count += 1
+                    self.image_data.append(absolute_path)
+                    self.manifest.append(absolute_path)
+                    if self.journal is not None:
+                        self.journal.record_item(img_url, self.image_count, self.journal_entry(absolute_path))
 
-                # 直接存储绝对路径字符串
-                absolute_path = os.path.abspath(filepath)
+                if self.seen_index is not None:
+                    self.seen_index.add(img_url, 'image')
+
+                print(f"    📷 下载图片: {filename}")
                 return absolute_path
 
+            # 大小不符合要求，不再重试
+            return None
+
         except Exception as e:
             print(f"    图片下载失败: {e}")
 
+        with self.counter_lock:
+            self.processed_images.discard(img_hash)
+
         return None
 
+    def submit_postprocess(self, img_url, temp_path):
+        """把临时文件交给后处理进程，校验通过后才编号保存，清单在处理完成时记录"""
+        with self.counter_lock:
+            # 正在后处理的图片也占名额，避免校验完成前继续下载超出目标数量
+            if self.target_reached():
+                os.remove(temp_path)
+                return None
+            self.pending_images += 1
+
+        # 缩略图先按临时文件名生成，保存时再改成最终编号
+        name = os.path.splitext(os.path.basename(temp_path))[0]
+        self.postprocessor.submit(temp_path, name, lambda result: self.save_processed_image(img_url, result))
+        print(f"    📷 下载图片: {img_url}，等待后处理")
+        return temp_path
+
+    @staticmethod
+    def journal_entry(absolute_path, image_format=None, width=None, height=None):
+        """日志中记录的图片信息，未启用后处理时格式和尺寸为None"""
+        return {'absolute_path': absolute_path, 'format': image_format, 'width': width, 'height': height}
+
+    def target_reached(self):
+        """已保存和正在后处理的图片是否已达到目标数量"""
+        return self.image_count + self.pending_images >= self.max_images
+
+    def store_image(self, temp_path, filename, size):
+        """把临时文件保存为 filename，返回清单中记录的路径"""
+        started = time.perf_counter()
+        if self.store is not None:
+            # 追加到分段文件，清单中记录段文件位置
+            absolute_path = self.store.put_file(filename, temp_path)
+            os.remove(temp_path)
+        else:
+            # 下载完成后原子重命名，不会留下半个文件
+            filepath = os.path.join(self.images_folder, filename)
+            os.replace(temp_path, filepath)
+            # 直接存储绝对路径字符串
+            absolute_path = os.path.abspath(filepath)
+        self.metrics.observe('write', time.perf_counter() - started, size=size)
+        return absolute_path
+
+    def save_processed_image(self, img_url, result):
+        """后处理完成：校验通过后分配编号、按真实格式命名保存并记录清单，无效的图片丢弃，不占编号"""
+        self.metrics.observe('postprocess', result['seconds'], size=result['file_size'], error=not result['valid'])
+        with self.counter_lock:
+            self.pending_images -= 1
+        if not result['valid']:
+            discard_files(result['path'], result['thumbnail'])
+            print(f"    ✗ 图片无效，已丢弃: {img_url} ({result['error']})")
+            return
+
+        with self.counter_lock:
+            # 提交时已预留名额，正常不会超出，编号前再确认一次
+            if self.image_count >= self.max_images:
+                discard_files(result['path'], result['thumbnail'])
+                return
+
+            filename = f"{self.image_count + 1:03d}{image_extension(result['format'])}"
+            absolute_path = self.store_image(result['path'], filename, result['file_size'])
+            rename_thumbnail(result['thumbnail'], f"{self.image_count + 1:03d}")
+
+            self.image_count += 1
+            self.image_data.append(absolute_path)
+            self.manifest.append(absolute_path, result['format'], result['width'], result['height'])
+            if self.journal is not None:
+                self.journal.record_item(img_url, self.image_count,
+                                         self.journal_entry(absolute_path, result['format'],
+                                                            result['width'], result['height']))
+
+        if self.seen_index is not None:
+            self.seen_index.add(img_url, 'image')
+        print(f"    📷 保存图片: {filename} ({result['format']} {result['width']}x{result['height']})")
+
     def extract_images_from_article(self, html_content, article_title):
-        """从文章页面提取图片"""
-        if self.image_count >= self.max_images:
+        """从文章页面提取待下载的图片URL"""
+        if self.target_reached():
             return []
 
         try:
-            soup = BeautifulSoup(html_content, 'html.parser')
-            image_paths = []
+            soup = make_soup(html_content)
+            image_urls = []
 
             img_selectors = [
                 'div.article-content img',
@@ -312,7 +565,7 @@ class SinaMilitaryImageCrawler:
             for selector in img_selectors:
                 img_tags = soup.select(selector)
                 for img_tag in img_tags:
-                    if self.image_count >= self.max_images:
+                    if self.target_reached():
                         break
 
                     img_src = img_tag.get('src') or img_tag.get('data-src') or img_tag.get('data-original')
@@ -328,12 +581,10 @@ class SinaMilitaryImageCrawler:
                     if 'sina.com.cn/images' in img_src:
                         continue
 
-                    image_path = self.download_image(img_src)
-                    if image_path:
-                        image_paths.append(image_path)
-                        print(f"    📷 下载图片: {self.image_count:03d}.jpg")
+                    if img_src not in image_urls:
+                        image_urls.append(img_src)
 
-            return image_paths
+            return image_urls
 
         except Exception as e:
             print(f"    提取图片失败: {e}")
@@ -342,22 +593,72 @@ class SinaMilitaryImageCrawler:
     def crawl_images(self):
         """爬取图片"""
         print(f"目标: {self.max_images}张图片")
-        print("获取文章中...")
-
-        articles = self.click_load_more_with_playwright()
-
-        if not articles:
+        processed_urls = set()
+        processed_titles = set()
+        self.restore_from_journal(processed_urls)
+        if self.image_count >= self.max_images:
+            print("日志中已完成目标数量")
+            return self.image_count
+
+        print("获取文章中，边获取边处理文章中的图片...")
+
+        # 发现线程找到的文章立即进入抓取，图片随即提交下载
+        with ImageDownloadPipeline(self.download_image, max_workers=self.max_workers,
+                                   per_host_limit=self.per_host_limit) as pipeline:
+            with DiscoveryStream(self.iter_discovered_batches) as articles:
+                self.submit_article_images(articles, processed_urls, processed_titles, pipeline)
+            print("等待图片下载完成...")
+            pipeline.results()
+        if self.postprocessor is not None:
+            print("等待图片后处理完成...")
+            self.postprocessor.wait()
+            self.postprocessor.print_summary()
+
+        if articles.found == 0:
             print("抱歉，没有获取到文章")
-            return 0
 
-        print(f"开始处理 {len(articles)} 篇文章中的图片...")
+        if self.seen_index is not None:
+            # 达到数量上限时文章里的图片可能没下完，这些文章下次仍需处理
+            if self.image_count < self.max_images:
+                for article_url in processed_urls:
+                    self.seen_index.add(article_url, 'image_article')
+            self.seen_index.flush()
 
-        processed_urls = set()
-        processed_titles = set()
+        if self.journal is not None and self.image_count < self.max_images:
+            for article_url in processed_urls:
+                self.journal.record_article_done(article_url)
 
+        return self.image_count
+
+    def restore_from_journal(self, processed_urls):
+        """恢复运行时从日志重建清单并接着编号，已下载的图片和处理完的文章不再重复"""
+        if self.journal is None or not self.journal.resume:
+            return
+
+        self.image_data = []
+        for entry in self.journal.entries():
+            self.image_data.append(entry['absolute_path'])
+            if self.postprocessor is not None:
+                # 上次未启用后处理时格式和尺寸为空
+                self.manifest.append(entry['absolute_path'],
+                                     *(entry[column] if entry[column] is not None else '' for column in IMAGE_COLUMNS))
+            else:
+                self.manifest.append(entry['absolute_path'])
+        self.image_count = self.journal.next_number() - 1
+        self.processed_images.update(hashlib.md5(img_url.encode()).hexdigest()
+                                     for img_url in self.journal.items)
+        processed_urls.update(self.journal.done_articles)
+        print(f"从日志恢复: 已下载{len(self.image_data)}张图片, 处理完{len(processed_urls)}篇文章")
+
+    def submit_article_images(self, articles, processed_urls, processed_titles, pipeline):
+        """逐篇获取文章，把解析出的图片立即提交给下载流水线"""
         for i, article in enumerate(articles):
-            if self.image_count >= self.max_images:
-                break
+            if self.target_reached():
+                # 正在后处理的图片可能无效，等校验完再确认是否够数
+                if self.pending_images:
+                    self.postprocessor.wait()
+                if self.target_reached():
+                    break
 
             title = article.get('title', '').strip()
             article_url = article.get('link', '')
@@ -375,60 +676,64 @@ class SinaMilitaryImageCrawler:
             if title_key in processed_titles:
                 continue
 
+            if self.seen_index is not None and self.seen_index.contains(article_url, 'image_article'):
+                continue
+
             processed_urls.add(article_url)
             processed_titles.add(title_key)
+            if self.journal is not None:
+                self.journal.record_discovered(article_url, dict(article, title=title, link=article_url))
 
-            print(f"  [{i + 1:2d}/{len(articles)}] 处理文章: {title[:30]}...")
+            print(f"  [{i + 1:2d}] 处理文章: {title[:30]}...")
 
             html_content = self.get_article_content(article_url)
             if not html_content:
                 print(f"    获取内容失败")
                 continue
 
-            image_paths = self.extract_images_from_article(html_content, title)
+            with self.metrics.timer('parse'):
+                image_urls = self.extract_images_from_article(html_content, title)
 
-            if image_paths:
-                # 直接扩展路径列表
-                self.image_data.extend(image_paths)
-                print(f"    从此文章获取 {len(image_paths)} 张图片")
+            for img_url in image_urls:
+                pipeline.submit(img_url)
 
-            print(f"    进度: {self.image_count}/{self.max_images} 张图片")
-            time.sleep(0.5)
+            if image_urls:
+                print(f"    从此文章提交 {len(image_urls)} 张图片下载")
 
-        return self.image_count
+            print(f"    进度: {self.image_count}/{self.max_images} 张图片")
 
     def save_to_excel(self):
         """将图片信息保存到Excel"""
-        if not self.image_data:
+        if not self.manifest.count:
             print("   警告: 没有图片数据可保存到Excel")
             return None
 
         try:
-            # 创建DataFrame，只包含绝对路径
-            df = pd.DataFrame({
-                'absolute_path': self.image_data
-            })
-
-            excel_filename = "test.xlsx"
-            excel_path = os.path.join(os.getcwd(), excel_filename)
-
-            # 保存Excel文件
-            df.to_excel(excel_path, index=False)
+            # 增量清单中只有绝对路径一列，流式导出
+            excel_path = self.manifest.export_xlsx(self.excel_path)
             print(f"   Excel文件已保存: {excel_path}")
-            return os.path.abspath(excel_path)
+            return excel_path
 
         except Exception as e:
             print(f"   保存Excel失败: {e}")
             return None
+        finally:
+            self.manifest.close()
 
     def run(self):
         """运行爬虫"""
         print("=== 新浪军事图片爬虫 ===")
         start_time = time.time()
 
-        image_count = self.crawl_images()
-        print(f"爬取完成，开始保存Excel...")
-        excel_path = self.save_to_excel()
+        try:
+            with profile_stage(self.profiler, 'crawl'):
+                image_count = self.crawl_images()
+            print(f"爬取完成，开始保存Excel...")
+            with profile_stage(self.profiler, 'excel'):
+                excel_path = self.save_to_excel()
+        finally:
+            # 爬取或导出出错时也写出指标
+            self.metrics.finish(os.path.join(self.images_folder, 'metrics.json'))
 
         end_time = time.time()
         elapsed_time = end_time - start_time
@@ -453,8 +758,41 @@ class SinaMilitaryImageCrawler:
 
 def main():
     """主函数"""
-    crawler = SinaMilitaryImageCrawler()
-    result = crawler.run()
+    parser = argparse.ArgumentParser(description="新浪军事图片爬虫")
+    parser.add_argument('--resume', action='store_true', help="从日志恢复上次中断的爬取")
+    parser.add_argument('--discovery', choices=('playwright', 'feed'), default='playwright',
+                        help="文章发现方式：playwright 浏览器点击加载，feed 直接请求JSON接口（不需要浏览器）")
+    parser.add_argument('--seen-index', default="seen_index.db",
+                        help="已处理URL索引文件，默认与其他爬虫和调度器共用，可多个进程同时使用")
+    parser.add_argument('--store', help="把图片追加写入该目录下的分段文件，而不是每张一个文件")
+    parser.add_argument('--profile', action='store_true', help="记录CPU和内存分析，写到 test_profile 目录")
+    parser.add_argument('--postprocess', action='store_true', help="在后处理进程中校验图片并记录真实格式和尺寸")
+    parser.add_argument('--thumbnail', type=int, metavar='SIZE', help="生成最长边为 SIZE 像素的缩略图（需要 Pillow）")
+    parser.add_argument('--transcode', choices=TRANSCODE_FORMATS, help="转码为 WebP/AVIF，比原图小时替换原图（需要 Pillow）")
+    parser.add_argument('--quality', type=int, default=80, help="缩略图和转码的质量")
+    args = parser.parse_args()
+
+    store = SegmentStore(args.store) if args.store else None
+    postprocessor = None
+    if args.postprocess or args.thumbnail or args.transcode:
+        postprocessor = ImagePostProcessor(thumbnail_size=args.thumbnail, thumbnail_dir=os.path.join("test", "thumbnails"),
+                                           transcode=args.transcode, quality=args.quality)
+    profiler = RunProfiler(profile_dir_for("test"), 'sina_image').start() if args.profile else None
+    try:
+        with SeenIndex(args.seen_index) as seen_index, \
+                CrawlJournal(os.path.join("test", "sina_image_journal.jsonl"), resume=args.resume) as journal:
+            crawler = SinaMilitaryImageCrawler(seen_index=seen_index, http_cache=HttpCache("http_cache"),
+                                               discovery=args.discovery,
+                                               journal=journal, store=store, profiler=profiler,
+                                               postprocessor=postprocessor)
+            result = crawler.run()
+    finally:
+        if postprocessor is not None:
+            postprocessor.close()
+        if store is not None:
+            store.close()
+        if profiler is not None:
+            profiler.stop()
 
     if result['success']:
         print(f"\n成功下载 {result['image_count']} 张图片")
@@ -1,22 +1,118 @@
-import requests
 import os
-import pandas as pd
+import argparse
 import time
-import urllib3
-from bs4 import BeautifulSoup
+from html_parser import make_soup
 import re
-from playwright.sync_api import sync_playwright
 from urllib.parse import urljoin
 from datetime import datetime
+from fetch_pool import ordered_concurrent_map
+from parse_pool import ParsePool
+from http_client import get_session, fetch_text, disable_insecure_warnings
+from http_cache import HttpCache
+from sina_feed import SinaFeedDiscovery
+from discovery_stream import DiscoveryStream
+from playwright_utils import (launch_browser, new_discovery_page, count_elements, scroll_to_bottom,
+                              wait_for_count_growth, rounds_for_target, collect_new_cards)
+from seen_index import SeenIndex
+from journal import CrawlJournal
+from corpus_store import SegmentStore
+from manifest import ManifestWriter, manifest_csv_path
+from metrics import Metrics
+from profiling import RunProfiler, profile_dir_for, profile_stage
+
+# 卡片列表中的文章链接，用于判断"加载更多"是否已经出现新内容
+CARD_LINK_SELECTOR = '.ty-cardlist-w a[href]'
+# 等待新内容的超时时间（毫秒），内容出现后会立即返回
+SCROLL_WAIT_TIMEOUT = 2000
+CLICK_WAIT_TIMEOUT = 10000
+
+# 页面内增量提取卡片的规则，与 extract_articles_from_playwright_page 的解析逻辑一致
+CARD_SPEC = {
+    'cardSelectors': [
+        '.ty-cardlist-w .ty-card',
+        '.ty-card',
+        '.news-item',
+        '.news-list li',
+        '.feed-card-item',
+        '[data-sudaclick*="news"]'
+    ],
+    'linkSelector': 'a[href]',
+    'titleSelectors': ['h1', 'h2', 'h3', 'h4'],
+    'timeSelectors': ['time', '[class*="time"], [class*="date"]'],
+    'markAttribute': 'data-crawler-seen',
+}
+
+
+def extract_article_text(html_content, article_info):
+    """从文章页面提取文本信息（模块级函数，可在解析进程池中执行）"""
+    try:
+        soup = make_soup(html_content)
+
+        title_elem = soup.find('h1')
+        title = title_elem.get_text().strip() if title_elem else article_info['title']
+
+        time_elem = soup.find('span', class_='time') or soup.find(class_=re.compile(r'time|date'))
+        publish_time = time_elem.get_text().strip() if time_elem else article_info.get('time', '')
+
+        source_elem = soup.find(class_=re.compile(r'source|来源'))
+        source = source_elem.get_text().strip() if source_elem else "新浪军事"
+
+        content_selectors = [
+            'div.article-content',
+            'div.article-body',
+            'div#artibody',
+            'div.content',
+            'div.main-content',
+            'div.article'
+        ]
+
+        content_text = ""
+        for selector in content_selectors:
+            content_elem = soup.select_one(selector)
+            if content_elem:
+                for element in content_elem.find_all(['script', 'style']):
+                    element.decompose()
+
+                paragraphs = content_elem.find_all('p')
+                if paragraphs:
+                    content_text = '\n\n'.join([p.get_text().strip() for p in paragraphs if p.get_text().strip()])
+                    break
+
+        if not content_text:
+            paragraphs = soup.find_all('p')
+            meaningful_paragraphs = []
+            for p in paragraphs:
+                text = p.get_text().strip()
+                if len(text) > 20:
+                    meaningful_paragraphs.append(text)
+            content_text = '\n\n'.join(meaningful_paragraphs)
+
+        content_text = re.sub(r'\s+', ' ', content_text).strip()
+
+        return {
+            'title': title,
+            'publish_time': publish_time,
+            'source': source,
+            'content': content_text,
+            'url': article_info['link']
+        }
 
-# 禁用SSL警告
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+    except Exception as e:
+        return {
+            'title': article_info['title'],
+            'publish_time': article_info.get('time', ''),
+            'source': '新浪军事',
+            'content': f"提取失败: {str(e)}",
+            'url': article_info['link']
+        }
 
 
 class SinaMilitaryTextCrawler:
-    def __init__(self):
-        # 使用固定的test文件夹
-        self.save_folder = "test"
+    def __init__(self, max_workers=8, seen_index=None, http_cache=None, discovery='playwright',
+                 lean_browser=True, parse_workers=0, journal=None, store=None,
+                 save_folder="test", excel_file="test.xlsx", metrics=None, profiler=None):
+        # 默认使用test文件夹，多个爬虫同时运行时各自指定
+        self.save_folder = save_folder
         os.makedirs(self.save_folder, exist_ok=True)
 
         self.headers = {
@@ -25,49 +121,102 @@ class SinaMilitaryTextCrawler:
             'Referer': 'https://mil.news.sina.com.cn/',
         }
 
+        # 禁用SSL警告（请求使用 verify=False）
+        disable_insecure_warnings()
+        # 共享连接池的HTTP客户端
+        self.session = get_session()
+
         self.processed_articles = set()
         self.text_data = []
+        # 同时在途的文章请求数，1 表示串行抓取
+        self.max_workers = max_workers
+        # 跨运行的已处理URL索引（seen_index.SeenIndex），None 表示不启用
+        self.seen_index = seen_index
+        # 文章页的条件请求缓存（http_cache.HttpCache），None 表示不启用
+        self.http_cache = http_cache
+        # 文章发现方式：'playwright' 浏览器点击加载，'feed' 直接请求JSON接口
+        self.discovery = discovery
+        # 精简浏览器模式：无头运行并拦截图片、字体、样式和统计脚本
+        self.lean_browser = lean_browser
+        # 解析进程数，0 表示在抓取线程内直接解析
+        self.parse_workers = parse_workers
+        self.parse_pool = None
+        # 崩溃恢复日志（journal.CrawlJournal），None 表示不记录
+        self.journal = journal
+        # 分段存储（corpus_store.SegmentStore），None 表示每篇文章一个txt文件
+        self.store = store
+        # 保存一篇就追加一行的增量清单，结束时导出为Excel
+        self.excel_path = os.path.abspath(excel_file)
+        self.manifest = ManifestWriter(manifest_csv_path(self.excel_path))
+        # 各阶段计数和耗时（metrics.Metrics），运行中更新保存目录下的 metrics.prom
+        self.metrics = metrics if metrics is not None else Metrics(
+            'sina_text', prometheus_path=os.path.join(self.save_folder, 'metrics.prom'))
+        # 性能分析（profiling.RunProfiler），None 表示不分析
+        self.profiler = profiler
+
+    def iter_discovered_batches(self, target_count=100):
+        """按配置的方式逐批发现文章，供 DiscoveryStream 在后台线程中运行"""
+        if self.discovery == 'feed':
+            print(" 使用Feed接口获取文章...")
+            feed = SinaFeedDiscovery(session=self.session, headers=self.headers,
+                                     seen_index=self.seen_index, seen_kind='text')
+            batches = feed.iter_batches(target_count=target_count)
+        else:
+            batches = self.iter_load_more_batches(target_count=target_count)
+        batches = self.metrics.track_batches('discovery', batches)
+
+        if self.journal is not None:
+            # 恢复运行时先处理上次发现但没保存的文章
+            return self.journal.replay_batches(batches, is_done=self.journal.is_item_done)
+        return batches
 
     def click_load_more_with_playwright(self, target_count=100):
         """使用Playwright获取文章"""
+        all_articles = []
+        for batch in self.iter_load_more_batches(target_count):
+            all_articles.extend(batch)
+        return all_articles
+
+    def iter_load_more_batches(self, target_count=100):
+        """使用Playwright滚动并点击加载更多，每轮产出新发现的文章列表"""
         print(" 使用Playwright获取文章...")
+        # 只在使用浏览器发现文章时才导入 Playwright
+        from playwright.sync_api import sync_playwright
 
         all_articles = []
+        seen_urls = set()
 
         with sync_playwright() as p:
-            browser = p.chromium.launch(headless=False)
-            context = browser.new_context(
-                viewport={'width': 1920, 'height': 1080},
-                user_agent=self.headers['User-Agent']
-            )
-            page = context.new_page()
+            browser = launch_browser(p, lean=self.lean_browser)
+            page, blocker = new_discovery_page(browser, self.headers['User-Agent'], lean=self.lean_browser)
 
             try:
                 page.goto("https://mil.news.sina.com.cn/", timeout=60000)
-                time.sleep(5)
 
                 page.wait_for_selector('.ty-cardlist-w', timeout=10000)
+                card_count = count_elements(page, CARD_LINK_SELECTOR)
                 print("   页面加载完成")
 
                 click_count = 0
                 consecutive_failures = 0
                 max_consecutive_failures = 5
-                max_clicks = 3
+                # 按目标数量决定最多点击次数，够数即停
+                max_clicks = rounds_for_target(target_count)
 
                 while (click_count < max_clicks and
-                       consecutive_failures < max_consecutive_failures):
-
-                    page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                    time.sleep(2)
+                       consecutive_failures < max_consecutive_failures and
+                       len(all_articles) < target_count):
 
-                    current_articles = self.extract_articles_from_playwright_page(page)
+                    scroll_to_bottom(page)
+                    card_count = wait_for_count_growth(page, CARD_LINK_SELECTOR, card_count,
+                                                       timeout=SCROLL_WAIT_TIMEOUT)
 
-                    seen_urls = {article['link'] for article in all_articles}
-                    new_articles = [article for article in current_articles if article['link'] not in seen_urls]
+                    new_articles = self.collect_new_articles(page, seen_urls)[:target_count - len(all_articles)]
 
                     if new_articles:
                         all_articles.extend(new_articles)
                         print(f"   滚动获取: {len(new_articles)}篇新文章 (总计: {len(all_articles)}篇)")
+                        yield new_articles
                         consecutive_failures = 0
                     else:
                         consecutive_failures += 1
@@ -121,23 +270,25 @@ class SinaMilitaryTextCrawler:
                             print(f"   点击成功 (第{click_count}次)")
 
                             print(f"   等待新内容加载...")
-                            time.sleep(5)
+                            card_count = wait_for_count_growth(page, CARD_LINK_SELECTOR, card_count,
+                                                               timeout=CLICK_WAIT_TIMEOUT)
 
                             for i in range(3):
-                                page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                                time.sleep(2)
+                                scroll_to_bottom(page)
+                                new_count = wait_for_count_growth(page, CARD_LINK_SELECTOR, card_count,
+                                                                  timeout=SCROLL_WAIT_TIMEOUT)
                                 print(f"   滚动加载第{i + 1}次")
+                                if new_count <= card_count:
+                                    break
+                                card_count = new_count
 
-                            time.sleep(3)
-
-                            post_click_articles = self.extract_articles_from_playwright_page(page)
-                            post_seen_urls = {article['link'] for article in all_articles}
-                            post_new_articles = [article for article in post_click_articles if
-                                                 article['link'] not in post_seen_urls]
+                            post_new_articles = self.collect_new_articles(
+                                page, seen_urls)[:target_count - len(all_articles)]
 
                             if post_new_articles:
                                 all_articles.extend(post_new_articles)
                                 print(f"   点击后获取: {len(post_new_articles)}篇新文章 (总计: {len(all_articles)}篇)")
+                                yield post_new_articles
 
                             consecutive_failures = 0
 
@@ -148,7 +299,6 @@ class SinaMilitaryTextCrawler:
                         consecutive_failures += 1
                         print(f"   未找到可点击按钮，连续失败: {consecutive_failures}次")
 
-                    time.sleep(2)
                     print(f"   当前进度: {len(all_articles)}篇 / 目标: {target_count}篇, 点击次数: {click_count}/{max_clicks}")
 
                 print(f"   最终获取: {len(all_articles)}篇文章")
@@ -157,15 +307,64 @@ class SinaMilitaryTextCrawler:
             except Exception as e:
                 print(f"   Playwright执行出错: {e}")
             finally:
+                if blocker is not None:
+                    print(f"   {blocker.summary()}")
                 browser.close()
 
-        return all_articles[:target_count]
+    def collect_new_articles(self, page, seen_urls):
+        """只提取上一轮之后新出现的卡片，并用 seen_urls 增量去重"""
+        cards = collect_new_cards(page, CARD_SPEC)
+        if cards is None:
+            # 页面上没有已知的卡片结构，退回解析整页
+            articles = self.extract_articles_from_playwright_page(page)
+        else:
+            articles = [article for article in map(self.article_from_card, cards) if article]
+
+        new_articles = []
+        for article in articles:
+            if article['link'] in seen_urls:
+                continue
+            seen_urls.add(article['link'])
+            new_articles.append(article)
+        return new_articles
+
+    def article_from_card(self, card):
+        """页面内提取的卡片 -> 文章信息，无效卡片返回None"""
+        url = card['href']
+        if not url:
+            return None
+
+        if not url.startswith('http'):
+            url = urljoin('https://mil.news.sina.com.cn/', url)
+
+        if not any(domain in url for domain in ['.sina.com.cn', '.sina.cn']):
+            return None
+
+        title = ""
+        for title_text in card['titles']:
+            if title_text and len(title_text.strip()) > 5:
+                title = title_text.strip()
+                break
+
+        if not title:
+            title_text = (card['link_text'] or '').strip()
+            if title_text and len(title_text) > 5:
+                title = title_text
+
+        if not title or len(title) < 5:
+            return None
+
+        return {
+            'title': title,
+            'link': url,
+            'time': card['time']
+        }
 
     def extract_articles_from_playwright_page(self, page):
         """从Playwright页面提取文章信息"""
         try:
             html_content = page.content()
-            soup = BeautifulSoup(html_content, 'html.parser')
+            soup = make_soup(html_content)
 
             articles = []
 
@@ -240,78 +439,26 @@ class SinaMilitaryTextCrawler:
 
     def get_article_content(self, article_url):
         """获取文章详情页内容"""
-        try:
-            response = requests.get(article_url, headers=self.headers, timeout=10, verify=False)
-            response.encoding = 'utf-8'
-            return response.text if response.status_code == 200 else None
-        except Exception:
-            return None
+        with self.metrics.timer('fetch') as timer:
+            try:
+                status_code, text = fetch_text(self.session, article_url, cache=self.http_cache,
+                                               headers=self.headers, verify=False)
+            except Exception:
+                timer.error = True
+                return None
+            if status_code != 200:
+                timer.error = True
+                return None
+            timer.size = len(text.encode('utf-8'))
+            return text
 
     def extract_text_from_article(self, html_content, article_info):
         """从文章页面提取文本信息"""
-        try:
-            soup = BeautifulSoup(html_content, 'html.parser')
-
-            title_elem = soup.find('h1')
-            title = title_elem.get_text().strip() if title_elem else article_info['title']
-
-            time_elem = soup.find('span', class_='time') or soup.find(class_=re.compile(r'time|date'))
-            publish_time = time_elem.get_text().strip() if time_elem else article_info.get('time', '')
-
-            source_elem = soup.find(class_=re.compile(r'source|来源'))
-            source = source_elem.get_text().strip() if source_elem else "新浪军事"
-
-            content_selectors = [
-                'div.article-content',
-                'div.article-body',
-                'div#artibody',
-                'div.content',
-                'div.main-content',
-                'div.article'
-            ]
-
-            content_text = ""
-            for selector in content_selectors:
-                content_elem = soup.select_one(selector)
-                if content_elem:
-                    for element in content_elem.find_all(['script', 'style']):
-                        element.decompose()
-
-                    paragraphs = content_elem.find_all('p')
-                    if paragraphs:
-                        content_text = '\n\n'.join([p.get_text().strip() for p in paragraphs if p.get_text().strip()])
-                        break
-
-            if not content_text:
-                paragraphs = soup.find_all('p')
-                meaningful_paragraphs = []
-                for p in paragraphs:
-                    text = p.get_text().strip()
-                    if len(text) > 20:
-                        meaningful_paragraphs.append(text)
-                content_text = '\n\n'.join(meaningful_paragraphs)
-
-            content_text = re.sub(r'\s+', ' ', content_text).strip()
-
-            return {
-                'title': title,
-                'publish_time': publish_time,
-                'source': source,
-                'content': content_text,
-                'url': article_info['link']
-            }
-
-        except Exception as e:
-            return {
-                'title': article_info['title'],
-                'publish_time': article_info.get('time', ''),
-                'source': '新浪军事',
-                'content': f"提取失败: {str(e)}",
-                'url': article_info['link']
-            }
+        return extract_article_text(html_content, article_info)
 
     def save_text_to_file(self, text_info, file_number):
         """将文本保存到文件"""
+        started = time.perf_counter()
         try:
             # 添加时间戳避免文件名冲突
             timestamp = datetime.now().strftime("%H%M%S")
@@ -325,8 +472,13 @@ class SinaMilitaryTextCrawler:
             file_content += "=" * 50 + "\n\n"
             file_content += text_info['content']
 
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(file_content)
+            if self.store is not None:
+                # 追加到分段文件，清单中记录段文件位置
+                file_path = self.store.put(filename, file_content.encode('utf-8'))
+            else:
+                with open(filepath, 'w', encoding='utf-8') as f:
+                    f.write(file_content)
+                file_path = os.path.abspath(filepath)
 
             file_info = {
                 'file_number': file_number,
@@ -334,36 +486,99 @@ class SinaMilitaryTextCrawler:
                 'publish_time': text_info['publish_time'],
                 'source': text_info['source'],
                 'url': text_info['url'],
-                'file_path': os.path.abspath(filepath),
+                'file_path': file_path,
                 'filename': filename,
                 'content_length': len(text_info['content'])
             }
 
+            self.metrics.observe('write', time.perf_counter() - started, size=len(file_content.encode('utf-8')))
             return file_info
 
         except Exception:
+            self.metrics.observe('write', time.perf_counter() - started, error=True)
             return None
 
     def crawl_articles_text(self, target_count=100):
         """爬取文章文本"""
         print(f"目标: {target_count}篇文章")
-        print("获取文章中...")
+        self.restore_from_journal()
+        if len(self.text_data) >= target_count:
+            print("日志中已完成目标数量")
+            return len(self.text_data)
 
-        articles = self.click_load_more_with_playwright(target_count=target_count)
+        print(f"获取文章中，边获取边处理 (并发数: {self.max_workers}, 解析进程: {self.parse_workers})...")
+
+        # 先启动解析进程，再启动发现线程；发现到的文章立即进入抓取
+        with ParsePool(self.parse_workers) as parse_pool, \
+                DiscoveryStream(lambda: self.iter_discovered_batches(target_count)) as articles:
+            self.parse_pool = parse_pool
+            try:
+                success_count = self.fetch_parse_and_save(articles, target_count)
+            finally:
+                self.parse_pool = None
 
-        if not articles:
+        if articles.found == 0:
             print("抱歉，没有获取到文章")
-            return 0
 
-        print(f"开始处理 {len(articles)} 篇文章...")
+        if self.seen_index is not None:
+            self.seen_index.flush()
 
-        file_counter = 1
-        success_count = 0
+        return success_count
 
-        for i, article in enumerate(articles):
+    def restore_from_journal(self):
+        """恢复运行时从日志重建清单，已保存的文章不再抓取"""
+        if self.journal is None or not self.journal.resume:
+            return
+
+        self.text_data = self.journal.entries()
+        for file_info in self.text_data:
+            self.manifest.append(file_info['file_path'])
+        self.processed_articles.update(self.journal.items)
+        print(f"从日志恢复: 已保存{len(self.text_data)}篇文章")
+
+    def fetch_parse_and_save(self, articles, target_count):
+        """并发抓取和解析，按原始顺序编号保存，返回成功数量（含恢复的文章）"""
+        # 恢复运行时接着上次的编号
+        file_counter = self.journal.next_number() if self.journal is not None else 1
+        success_count = len(self.text_data)
+
+        results = ordered_concurrent_map(self.fetch_and_extract,
+                                         self.iter_pending_articles(articles),
+                                         max_workers=self.max_workers)
+
+        for (_, article), (text_info, error) in results:
+            # 按已保存数量显示进度，跳过和失败的文章不计入
+            print(f"  [{success_count + 1:2d}/{target_count}] 处理: {article['title'][:30]}...")
+
+            if error:
+                print(f"    {error}")
+                continue
+
+            # 按原始顺序依次编号保存，保证文件编号稳定
+            file_info = self.save_text_to_file(text_info, file_counter)
+            if file_info:
+                self.text_data.append(file_info)
+                self.manifest.append(file_info['file_path'])
+                if self.journal is not None:
+                    self.journal.record_item(text_info['url'], file_counter, file_info)
+                if self.seen_index is not None:
+                    self.seen_index.add(text_info['url'], 'text')
+                success_count += 1
+                file_counter += 1
+                print(f"    保存成功: {file_info['filename']} (长度: {file_info['content_length']}字符)")
+            else:
+                print("    保存失败")
+
+            print(f"    进度: {success_count}/{target_count}")
+            # 够数立即停止，不再等待后续发现的文章
             if success_count >= target_count:
                 break
 
+        return success_count
+
+    def iter_pending_articles(self, articles):
+        """过滤无效和重复的文章，按顺序产出(序号, 文章)"""
+        for i, article in enumerate(articles):
             title = article.get('title', '').strip()
             article_url = article.get('link', '')
 
@@ -377,60 +592,61 @@ class SinaMilitaryTextCrawler:
                 continue
 
             self.processed_articles.add(article_url)
+            if self.journal is not None:
+                self.journal.record_discovered(article_url, dict(article, title=title, link=article_url))
 
-            print(f"  [{i + 1:2d}/{len(articles)}] 处理: {title[:30]}...")
-
-            html_content = self.get_article_content(article_url)
-            if not html_content:
-                print(f"    获取内容失败")
+            # 之前运行已经保存过的文章不再抓取
+            if self.seen_index is not None and self.seen_index.contains(article_url, 'text'):
                 continue
 
-            text_info = self.extract_text_from_article(html_content, article)
+            yield i, dict(article, title=title, link=article_url)
 
-            if not text_info.get('content') or len(text_info['content']) < 50:
-                print(f"    内容过短或无效")
-                continue
+    def fetch_and_extract(self, indexed_article):
+        """获取并解析单篇文章（在线程池中执行），返回(文本信息, 错误信息)"""
+        _, article = indexed_article
 
-            file_info = self.save_text_to_file(text_info, file_counter)
-            if file_info:
-                self.text_data.append(file_info)
-                success_count += 1
-                file_counter += 1
-                print(f"    保存成功: {file_info['filename']} (长度: {file_info['content_length']}字符)")
+        html_content = self.get_article_content(article['link'])
+        if not html_content:
+            return None, "获取内容失败"
+
+        with self.metrics.timer('parse'):
+            if self.parse_pool is not None and self.parse_pool.executor is not None:
+                # 解析交给进程池，当前线程等待结果期间其他线程继续抓取
+                text_info = self.parse_pool.submit(extract_article_text, html_content, article).result()
             else:
-                print("    保存失败")
+                text_info = self.extract_text_from_article(html_content, article)
 
-            print(f"    进度: {success_count}/{target_count}")
-            time.sleep(1)
+        if not text_info.get('content') or len(text_info['content']) < 50:
+            return None, "内容过短或无效"
 
-        return success_count
+        return text_info, None
 
     def save_to_excel(self):
         """将文件路径保存到Excel - 只保存绝对地址"""
-        if not self.text_data:
+        if not self.manifest.count:
             return None
 
-        # 只保存绝对路径
-        df = pd.DataFrame({
-            'absolute_path': [item['file_path'] for item in self.text_data]
-        })
-
-        excel_filename = f"test.xlsx"
-        excel_path = os.path.join(os.getcwd(), excel_filename)
-
+        # 增量清单中只有绝对路径一列，流式导出
         try:
-            df.to_excel(excel_path, index=False)
-            return os.path.abspath(excel_path)
+            return self.manifest.export_xlsx(self.excel_path)
         except Exception:
             return None
+        finally:
+            self.manifest.close()
 
     def run(self, target_count=100):
         """运行爬虫"""
         print("=== 新浪军事文本爬虫 ===")
         start_time = time.time()
 
-        success_count = self.crawl_articles_text(target_count)
-        excel_path = self.save_to_excel()
+        try:
+            with profile_stage(self.profiler, 'crawl'):
+                success_count = self.crawl_articles_text(target_count)
+            with profile_stage(self.profiler, 'excel'):
+                excel_path = self.save_to_excel()
+        finally:
+            # 爬取或导出出错时也写出指标
+            self.metrics.finish(os.path.join(self.save_folder, 'metrics.json'))
 
         end_time = time.time()
         elapsed_time = end_time - start_time
@@ -450,8 +666,31 @@ class SinaMilitaryTextCrawler:
 
 def main():
     """主函数"""
-    crawler = SinaMilitaryTextCrawler()
-    result = crawler.run(target_count=100)
+    parser = argparse.ArgumentParser(description="新浪军事文本爬虫")
+    parser.add_argument('--resume', action='store_true', help="从日志恢复上次中断的爬取")
+    parser.add_argument('--discovery', choices=('playwright', 'feed'), default='playwright',
+                        help="文章发现方式：playwright 浏览器点击加载，feed 直接请求JSON接口（不需要浏览器）")
+    parser.add_argument('--seen-index', default="seen_index.db",
+                        help="已处理URL索引文件，默认与其他爬虫和调度器共用，可多个进程同时使用")
+    parser.add_argument('--store', help="把文本追加写入该目录下的分段文件，而不是每篇一个txt")
+    parser.add_argument('--profile', action='store_true', help="记录CPU和内存分析，写到 test_profile 目录")
+    args = parser.parse_args()
+
+    store = SegmentStore(args.store) if args.store else None
+    profiler = RunProfiler(profile_dir_for("test"), 'sina_text').start() if args.profile else None
+    try:
+        with SeenIndex(args.seen_index) as seen_index, \
+                CrawlJournal(os.path.join("test", "sina_text_journal.jsonl"), resume=args.resume) as journal:
+            crawler = SinaMilitaryTextCrawler(seen_index=seen_index, http_cache=HttpCache("http_cache"),
+                                              discovery=args.discovery,
+                                              parse_workers=os.cpu_count(), journal=journal, store=store,
+                                              profiler=profiler)
+            result = crawler.run(target_count=100)
+    finally:
+        if store is not None:
+            store.close()
+        if profiler is not None:
+            profiler.stop()
 
     if result['success']:
         print(f"\n成功获取 {result['article_count']} 篇文章")
@@ -0,0 +1,44 @@
+import pytest
+
+from corpus_store import SegmentStore
+
+
+def test_runs_with_same_names_do_not_overwrite(tmp_path):
+    root = str(tmp_path / "corpus")
+    with SegmentStore(root, run_id='run1') as store:
+        store.put('001.txt', b'first run')
+    with SegmentStore(root, run_id='run2') as store:
+        store.put('001.txt', b'second run')
+
+    with SegmentStore(root) as store:
+        assert store.names() == ['run1/001.txt', 'run2/001.txt']
+        assert store.get('run1/001.txt') == b'first run'
+        assert store.get('run2/001.txt') == b'second run'
+        assert len(store) == 2
+
+
+def test_duplicate_name_in_one_run_raises(tmp_path):
+    with SegmentStore(str(tmp_path / "corpus")) as store:
+        store.put('001.jpg', b'a')
+        with pytest.raises(ValueError):
+            store.put('001.jpg', b'b')
+        assert store.get(store.key_for('001.jpg')) == b'a'
+
+
+def test_put_file_and_locator(tmp_path):
+    source = tmp_path / "image.part"
+    source.write_bytes(b'\xff\xd8data\xff\xd9')
+    with SegmentStore(str(tmp_path / "corpus"), run_id='r') as store:
+        locator = store.put_file('001.jpg', str(source))
+        store.flush()
+        segment, position = locator.rsplit('@', 1)
+        offset, length = map(int, position.split(':'))
+        with open(segment, 'rb') as f:
+            f.seek(offset)
+            assert f.read(length) == b'\xff\xd8data\xff\xd9'
+        assert store.get('r/001.jpg') == b'\xff\xd8data\xff\xd9'
+
+
+def test_default_run_ids_differ(tmp_path):
+    with SegmentStore(str(tmp_path / "a")) as first, SegmentStore(str(tmp_path / "b")) as second:
+        assert first.run_id != second.run_id
@@ -0,0 +1,78 @@
+import threading
+import time
+
+import pytest
+
+from fetch_pool import ordered_concurrent_map
+
+
+def test_results_follow_input_order():
+    # 越靠前的任务越慢，结果仍按输入顺序产出
+    def slow_first(n):
+        time.sleep((5 - n) * 0.01)
+        return n * n
+
+    results = list(ordered_concurrent_map(slow_first, range(6), max_workers=4))
+
+    assert results == [(n, n * n) for n in range(6)]
+
+
+def test_early_stop_cancels_pending_tasks():
+    started = []
+    lock = threading.Lock()
+
+    def work(n):
+        with lock:
+            started.append(n)
+        time.sleep(0.01)
+        return n
+
+    results = ordered_concurrent_map(work, range(1000), max_workers=2, max_in_flight=4)
+    for item, _ in results:
+        if item == 2:
+            break
+    results.close()
+
+    # 在途任务数有上限，提前停止后不会继续跑完全部输入
+    assert len(started) < 20
+
+
+def test_task_error_propagates_in_order():
+    def work(n):
+        if n == 3:
+            raise ValueError("bad item")
+        return n
+
+    seen = []
+    with pytest.raises(ValueError, match="bad item"):
+        for item, _ in ordered_concurrent_map(work, range(6), max_workers=3):
+            seen.append(item)
+    assert seen == [0, 1, 2]
+
+
+def test_input_error_propagates_after_earlier_results():
+    def items():
+        yield 1
+        yield 2
+        raise RuntimeError("discovery failed")
+
+    seen = []
+    with pytest.raises(RuntimeError, match="discovery failed"):
+        for item, result in ordered_concurrent_map(lambda n: n, items()):
+            seen.append(result)
+    assert seen == [1, 2]
+
+
+def test_streaming_input_yields_before_input_ends():
+    more = threading.Event()
+
+    def items():
+        yield 1
+        # 第一个结果产出之前不会再有新输入
+        more.wait(5)
+        yield 2
+
+    results = ordered_concurrent_map(lambda n: n, items())
+    assert next(results) == (1, 1)
+    more.set()
+    assert list(results) == [(2, 2)]
@@ -0,0 +1,75 @@
+from http_cache import HttpCache
+
+
+class FakeResponse:
+    def __init__(self, status_code, body=b'', headers=None):
+        self.status_code = status_code
+        self.content = body
+        self.headers = headers or {}
+        self.encoding = None
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding or 'utf-8')
+
+
+class FakeSession:
+    """按顺序返回预设响应，并记录每次请求的请求头"""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.sent_headers = []
+
+    def get(self, url, headers=None, **kwargs):
+        self.sent_headers.append(headers or {})
+        return self.responses.pop(0)
+
+
+def test_not_modified_returns_cached_body(tmp_path):
+    cache = HttpCache(str(tmp_path))
+    session = FakeSession(
+        FakeResponse(200, "正文".encode('utf-8'), {'ETag': '"v1"', 'Last-Modified': 'Wed, 01 May 2024 00:00:00 GMT'}),
+        FakeResponse(304),
+    )
+
+    assert cache.fetch_text(session, 'http://a/1') == (200, "正文")
+    assert cache.fetch_text(session, 'http://a/1') == (200, "正文")
+
+    assert session.sent_headers[0] == {}
+    assert session.sent_headers[1] == {'If-None-Match': '"v1"',
+                                       'If-Modified-Since': 'Wed, 01 May 2024 00:00:00 GMT'}
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_changed_page_replaces_cached_body(tmp_path):
+    cache = HttpCache(str(tmp_path))
+    session = FakeSession(
+        FakeResponse(200, b'old', {'ETag': '"v1"'}),
+        FakeResponse(200, b'new', {'ETag': '"v2"'}),
+        FakeResponse(304),
+    )
+
+    cache.fetch_text(session, 'http://a/1')
+    assert cache.fetch_text(session, 'http://a/1') == (200, 'new')
+    assert cache.fetch_text(session, 'http://a/1') == (200, 'new')
+    assert session.sent_headers[2] == {'If-None-Match': '"v2"'}
+
+
+def test_page_without_validators_is_not_cached(tmp_path):
+    cache = HttpCache(str(tmp_path))
+    session = FakeSession(FakeResponse(200, b'body'), FakeResponse(200, b'body'))
+
+    cache.fetch_text(session, 'http://a/1')
+    cache.fetch_text(session, 'http://a/1')
+
+    assert session.sent_headers == [{}, {}]
+    assert cache.hits == 0
+
+
+def test_errors_are_returned_and_not_cached(tmp_path):
+    cache = HttpCache(str(tmp_path))
+    session = FakeSession(FakeResponse(404, b'missing', {'ETag': '"x"'}), FakeResponse(200, b'ok'))
+
+    assert cache.fetch_text(session, 'http://a/1') == (404, 'missing')
+    cache.fetch_text(session, 'http://a/1')
+    assert session.sent_headers[1] == {}
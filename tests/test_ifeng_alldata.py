@@ -0,0 +1,48 @@
+import json
+
+import pytest
+
+import ifeng_alldata
+from ifeng_alldata import AllData, scan_object
+
+
+def test_brace_semicolon_inside_string_does_not_end_object():
+    text = 'var allData = {"title": "a};b", "list": [{"x": "}"}]}; var other = {};'
+    start = text.index('{')
+
+    assert json.loads(scan_object(text, start)) == {"title": "a};b", "list": [{"x": "}"}]}
+
+
+def test_trailing_commas_are_removed():
+    text = '{"a": [1, 2, ], "b": {"c": 1, },\n}'
+
+    assert json.loads(scan_object(text, 0)) == {"a": [1, 2], "b": {"c": 1}}
+
+
+def test_escaped_quotes_and_commas_in_strings_are_kept():
+    text = r'{"a": "say \"hi\", }", "b": "x\\", "c": ",]",}'
+
+    assert json.loads(scan_object(text, 0)) == {"a": 'say "hi", }', "b": "x\\", "c": ",]"}
+
+
+def test_incomplete_object_raises():
+    with pytest.raises(ValueError):
+        scan_object('{"a": {"b": 1}', 0)
+
+
+@pytest.mark.parametrize('use_orjson', [True, False])
+def test_all_data_from_html(monkeypatch, use_orjson):
+    if not use_orjson:
+        monkeypatch.setattr(ifeng_alldata, 'orjson', None)
+    html = ('<script>var allData = ({"newsstream": [{"title": "标题};", "url": "u",},],'
+            ' "slideData": []});</script>')
+
+    all_data = AllData.from_html(html)
+
+    assert all_data.newsstream == [{"title": "标题};", "url": "u"}]
+    assert all_data.slide_data == []
+
+
+def test_from_html_without_all_data():
+    assert AllData.from_html('<html></html>') is None
+    assert AllData.from_html('') is None
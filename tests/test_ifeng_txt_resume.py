@@ -0,0 +1,41 @@
+import os
+
+from openpyxl import load_workbook
+
+from ifeng_txt_crawler import PhoenixTextCrawler
+from journal import CrawlJournal
+
+
+def make_crawler(tmp_path, journal):
+    crawler = PhoenixTextCrawler(save_dir=str(tmp_path / "text"), journal=journal,
+                                 excel_file=str(tmp_path / "text.xlsx"))
+    # 发现阶段没有新文章（都已在日志或索引中），不启动浏览器
+    crawler.iter_load_more_batches = lambda target_count=100: iter([])
+    return crawler
+
+
+def test_resume_without_new_articles_exports_restored_rows(tmp_path):
+    journal_path = str(tmp_path / "journal.jsonl")
+    with CrawlJournal(journal_path) as journal:
+        for n in (1, 2):
+            url = f"https://news.ifeng.com/c/{n}"
+            journal.record_discovered(url, {'title': f"文章{n}", 'url': url})
+            journal.record_item(url, n, {'file_number': n, 'url': url,
+                                         'file_path': str(tmp_path / "text" / f"{n:03d}.txt")})
+
+    with CrawlJournal(journal_path, resume=True) as journal:
+        crawler = make_crawler(tmp_path, journal)
+        crawler.crawl_articles_text(target_count=5)
+
+    rows = list(load_workbook(tmp_path / "text.xlsx").active.iter_rows(values_only=True))
+    assert [row[0] for row in rows[1:]] == [str(tmp_path / "text" / "001.txt"), str(tmp_path / "text" / "002.txt")]
+    assert os.path.exists(tmp_path / "text" / "metrics.json")
+
+
+def test_nothing_found_and_nothing_restored_skips_export(tmp_path):
+    with CrawlJournal(str(tmp_path / "journal.jsonl"), resume=True) as journal:
+        crawler = make_crawler(tmp_path, journal)
+        crawler.crawl_articles_text(target_count=5)
+
+    assert not os.path.exists(tmp_path / "text.xlsx")
+    assert os.path.exists(tmp_path / "text" / "metrics.json")
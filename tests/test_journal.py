@@ -0,0 +1,63 @@
+import json
+
+from journal import CrawlJournal
+
+
+def write_lines(path, records, torn=None):
+    with open(path, 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        if torn is not None:
+            f.write(torn)
+
+
+def test_torn_last_line_is_skipped_and_appends_on_new_line(tmp_path):
+    path = str(tmp_path / "journal.jsonl")
+    write_lines(path, [
+        {'event': 'discovered', 'url': 'u1', 'article': {'url': 'u1'}},
+        {'event': 'item', 'key': 'u1', 'number': 1, 'entry': {'n': 1}},
+    ], torn='{"event": "item", "key": "u2", "num')
+
+    with CrawlJournal(path, resume=True) as journal:
+        assert journal.is_item_done('u1')
+        assert not journal.is_item_done('u2')
+        journal.record_item('u3', 2, {'n': 2})
+
+    with CrawlJournal(path, resume=True) as journal:
+        assert journal.entries() == [{'n': 1}, {'n': 2}]
+
+
+def test_next_number_follows_highest_number(tmp_path):
+    path = str(tmp_path / "journal.jsonl")
+    with CrawlJournal(path) as journal:
+        assert journal.next_number() == 1
+        journal.record_item('b', 5, 'five')
+        journal.record_item('a', 2, 'two')
+        assert journal.next_number() == 6
+
+    with CrawlJournal(path, resume=True) as journal:
+        assert journal.next_number() == 6
+        assert journal.entries() == ['two', 'five']
+
+
+def test_without_resume_journal_starts_over(tmp_path):
+    path = str(tmp_path / "journal.jsonl")
+    with CrawlJournal(path) as journal:
+        journal.record_item('a', 1, 'one')
+
+    with CrawlJournal(path) as journal:
+        assert journal.next_number() == 1
+        assert journal.entries() == []
+
+
+def test_pending_articles_keep_discovery_order(tmp_path):
+    path = str(tmp_path / "journal.jsonl")
+    with CrawlJournal(path) as journal:
+        for url in ('u1', 'u2', 'u3'):
+            journal.record_discovered(url, {'url': url})
+        journal.record_article_done('u2')
+
+    with CrawlJournal(path, resume=True) as journal:
+        assert [article['url'] for article in journal.pending_articles()] == ['u1', 'u3']
+        batches = list(journal.replay_batches(iter([[{'url': 'u4'}]])))
+        assert batches == [[{'url': 'u1'}, {'url': 'u3'}], [{'url': 'u4'}]]
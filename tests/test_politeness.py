@@ -0,0 +1,65 @@
+import pytest
+
+from politeness import PolitenessScheduler, parse_retry_after
+
+URL = 'http://news.example.com/a'
+
+
+def rate_of(scheduler):
+    return scheduler.stats()['news.example.com']['rate']
+
+
+def test_defaults_are_conservative():
+    scheduler = PolitenessScheduler()
+    for _ in range(100):
+        scheduler.record(URL, 200, latency=0.1)
+    assert scheduler.rate == 1.0
+    assert rate_of(scheduler) == 4.0
+
+
+@pytest.mark.parametrize('status', [200, 204, 304])
+def test_success_increases_rate(status):
+    scheduler = PolitenessScheduler(rate=1.0, increase=0.5)
+    scheduler.record(URL, status, latency=0.1)
+    assert rate_of(scheduler) == 1.5
+
+
+@pytest.mark.parametrize('status', [404, 410, 301, None])
+def test_other_status_does_not_increase_rate(status):
+    scheduler = PolitenessScheduler(rate=1.0)
+    for _ in range(10):
+        scheduler.record(URL, status, latency=0.1)
+    assert rate_of(scheduler) == 1.0
+
+
+@pytest.mark.parametrize('status', [403, 429, 503])
+def test_throttle_status_decreases_rate_and_honours_retry_after(status):
+    scheduler = PolitenessScheduler(rate=2.0, decrease=0.5)
+    scheduler.record(URL, status, retry_after='30')
+    stats = scheduler.stats()['news.example.com']
+    assert stats['rate'] == 1.0
+    assert stats['throttled'] == 1
+    assert scheduler._buckets['news.example.com'].blocked_until > 0
+
+
+def test_high_latency_decreases_rate_gently():
+    scheduler = PolitenessScheduler(rate=2.0, decrease=0.5, latency_target=1.0)
+    scheduler.record(URL, 200, latency=5.0)
+    assert rate_of(scheduler) == 1.5
+
+
+def test_rate_and_ceiling_are_configurable():
+    scheduler = PolitenessScheduler(rate=2.0, max_rate=3.0, host_rates={'img.example.com': 10})
+    for _ in range(10):
+        scheduler.record(URL, 200, latency=0.1)
+    assert rate_of(scheduler) == 3.0
+    # 单独指定的主机速率也不超过上限
+    scheduler.record('http://img.example.com/1.jpg', 404)
+    assert scheduler.stats()['img.example.com']['rate'] == 3.0
+
+
+def test_parse_retry_after():
+    assert parse_retry_after('120') == 120.0
+    assert parse_retry_after('Wed, 01 May 2024 00:01:00 GMT', now=1714521600) == 60.0
+    assert parse_retry_after('soon') is None
+    assert parse_retry_after(None) is None
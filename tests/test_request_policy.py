@@ -0,0 +1,154 @@
+import threading
+import time
+
+import pytest
+from requests import ConnectionError, HTTPError, Response
+
+from request_policy import LatencyTracker, RequestPolicy
+
+
+def make_policy(**kwargs):
+    # 不等待退避，测试只看重试次数
+    kwargs.setdefault('backoff', 0)
+    return RequestPolicy(**kwargs)
+
+
+def http_error(status):
+    response = Response()
+    response.status_code = status
+    return HTTPError(response=response)
+
+
+class Attempts:
+    """按顺序返回结果或抛出异常的 attempt"""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def __call__(self):
+        outcome = self.outcomes[min(self.calls, len(self.outcomes) - 1)]
+        self.calls += 1
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+def test_hedge_is_off_by_default():
+    assert RequestPolicy().hedge is False
+
+
+def test_retries_retryable_status_and_discards_result():
+    policy = make_policy()
+    attempt = Attempts((503, 'busy'), (200, 'ok'))
+    discarded = []
+
+    result = policy.run('http://a/1', attempt, status_of=lambda r: r[0], discard=discarded.append)
+
+    assert result == (200, 'ok')
+    assert attempt.calls == 2
+    assert discarded == [(503, 'busy')]
+    assert policy.stats()['retried'] == 1
+
+
+def test_returns_last_result_after_retries():
+    policy = make_policy(retries=2)
+    attempt = Attempts((503, 'busy'))
+
+    assert policy.run('http://a/1', attempt, status_of=lambda r: r[0]) == (503, 'busy')
+    assert attempt.calls == 3
+
+
+def test_retries_connection_errors_then_raises():
+    policy = make_policy(retries=2)
+    attempt = Attempts(ConnectionError("reset"))
+
+    with pytest.raises(ConnectionError):
+        policy.run('http://a/1', attempt)
+    assert attempt.calls == 3
+
+
+@pytest.mark.parametrize('error', [http_error(404), ValueError("bad")])
+def test_does_not_retry_other_errors(error):
+    policy = make_policy()
+    attempt = Attempts(error)
+
+    with pytest.raises(type(error)):
+        policy.run('http://a/1', attempt)
+    assert attempt.calls == 1
+
+
+def test_retryable_http_error_is_retried():
+    policy = make_policy()
+    attempt = Attempts(http_error(502), 'ok')
+
+    assert policy.run('http://a/1', attempt) == 'ok'
+    assert attempt.calls == 2
+
+
+def test_backoff_delay_is_capped():
+    policy = RequestPolicy(backoff=0.5, max_backoff=2.0)
+    for attempt in range(10):
+        assert 0 <= policy.backoff_delay(attempt) <= min(2.0, 0.5 * 2 ** attempt)
+
+
+def test_hedge_delay_uses_host_p95():
+    policy = RequestPolicy(hedge_min_delay=0.2, hedge_default_delay=3.0)
+    assert policy.hedge_delay('http://a/1') == 3.0
+
+    for n in range(100):
+        policy.latency.record('a', (n + 1) / 100)
+    assert policy.hedge_delay('http://A/2') == pytest.approx(0.96)
+
+    for n in range(100):
+        policy.latency.record('b', 0.01)
+    assert policy.hedge_delay('http://b/1') == 0.2
+
+
+def test_latency_tracker_needs_min_samples():
+    tracker = LatencyTracker(window=5, min_samples=3)
+    tracker.record('a', 1.0)
+    tracker.record('a', 2.0)
+    assert tracker.percentile('a') is None
+    for _ in range(5):
+        tracker.record('a', 0.5)
+    # 只保留最近 window 个样本
+    assert tracker.percentile('a') == 0.5
+
+
+def test_hedged_request_wins_and_slow_result_is_discarded():
+    policy = make_policy(hedge_default_delay=0.05)
+    release = threading.Event()
+    calls = []
+    discarded = []
+
+    def attempt():
+        calls.append(None)
+        if len(calls) == 1:
+            # 第一次请求一直卡住，直到对冲请求完成
+            release.wait(5)
+            return 'slow'
+        return 'fast'
+
+    try:
+        result = policy.run('http://a/1', attempt, hedge=True, discard=discarded.append)
+        assert result == 'fast'
+        release.set()
+        deadline = time.monotonic() + 5
+        while not discarded and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        release.set()
+        policy.close()
+
+    assert discarded == ['slow']
+    assert policy.stats() == {'retried': 0, 'hedged': 1, 'hedge_wins': 1}
+
+
+def test_fast_request_is_not_hedged():
+    policy = make_policy(hedge_default_delay=1.0)
+    try:
+        assert policy.run('http://a/1', Attempts('ok'), hedge=True) == 'ok'
+    finally:
+        policy.close()
+    assert policy.stats()['hedged'] == 0
@@ -0,0 +1,41 @@
+from seen_index import SeenIndex
+
+
+def test_snapshot_round_trip(tmp_path):
+    path = str(tmp_path / "seen.db")
+    with SeenIndex(path, expected_items=1000) as index:
+        index.add('http://a/1', 'text')
+
+    with SeenIndex(path, expected_items=1000) as index:
+        assert index.contains('http://a/1', 'text')
+        assert not index.contains('http://a/1', 'image')
+        assert not index.contains('http://a/2', 'text')
+
+
+def test_concurrent_writer_does_not_hide_keys(tmp_path):
+    # 两个实例同时打开同一个索引，后关闭的实例保存的快照不能缺少另一个实例的记录
+    path = str(tmp_path / "seen.db")
+    first = SeenIndex(path, expected_items=1000)
+    second = SeenIndex(path, expected_items=1000)
+    first.add('http://a/1', 'text')
+    second.add('http://b/1', 'text')
+    first.close()
+    second.close()
+
+    with SeenIndex(path, expected_items=1000) as index:
+        assert index.contains('http://a/1', 'text')
+        assert index.contains('http://b/1', 'text')
+
+
+def test_stale_snapshot_is_rebuilt(tmp_path):
+    path = str(tmp_path / "seen.db")
+    with SeenIndex(path, expected_items=1000) as index:
+        index.add('http://a/1', 'text')
+    # 另一个进程在快照之后写入，且没有正常关闭（没有保存快照）
+    other = SeenIndex(path, expected_items=1000)
+    other.add('http://a/2', 'text')
+    other.flush()
+
+    with SeenIndex(path, expected_items=1000) as index:
+        assert index.contains('http://a/2', 'text')
+    other.conn.close()
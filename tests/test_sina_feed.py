@@ -0,0 +1,144 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from seen_index import SeenIndex
+from sina_feed import SinaFeedDiscovery
+
+
+def feed_item(n, **overrides):
+    item = {
+        'title': f"海军某驱逐舰支队远海训练第{n}期",
+        'url': f"https://mil.news.sina.com.cn/china/2024-05-01/doc-{n:04d}.shtml",
+        'ctime': '1714521600',
+    }
+    item.update(overrides)
+    return item
+
+
+class FeedServer:
+    """本地替身接口：pages[i] 为第 i+1 页的条目，超出范围返回空页；jsonp 为 True 时按JSONP返回"""
+
+    def __init__(self, pages, jsonp=True):
+        self.pages = pages
+        self.jsonp = jsonp
+        self.requested = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                query = parse_qs(urlparse(self.path).query)
+                page = int(query['page'][0])
+                server.requested.append(page)
+                items = server.pages[page - 1] if page <= len(server.pages) else []
+                body = json.dumps({'result': {'status': {'code': 0}, 'data': items}}, ensure_ascii=False)
+                if server.jsonp:
+                    body = f"feedCardJsonpCallback({body});"
+                data = body.encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/javascript; charset=utf-8')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/api/roll/get"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def feed_server():
+    servers = []
+
+    def start(pages, jsonp=True):
+        server = FeedServer(pages, jsonp)
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.close()
+
+
+def test_parse_feed_jsonp_and_plain_json():
+    items = [feed_item(1)]
+    payload = json.dumps({'result': {'data': items}})
+    assert SinaFeedDiscovery.parse_feed(f"jsonp_123({payload});") == items
+    assert SinaFeedDiscovery.parse_feed(payload) == items
+    assert SinaFeedDiscovery.parse_feed(json.dumps({'data': items})) == items
+    assert SinaFeedDiscovery.parse_feed(json.dumps(items)) == items
+    assert SinaFeedDiscovery.parse_feed(json.dumps({'result': {'data': None}})) == []
+
+
+def test_to_article_filters_title_and_domain():
+    article = SinaFeedDiscovery.to_article(feed_item(1, title="<b>海军某驱逐舰支队</b>远海训练"))
+    assert article['title'] == "海军某驱逐舰支队远海训练"
+    assert article['link'].endswith('doc-0001.shtml')
+    assert article['time']
+
+    assert SinaFeedDiscovery.to_article(feed_item(2, url="//mil.news.sina.com.cn/doc-2.shtml"))['link'] \
+        == "https://mil.news.sina.com.cn/doc-2.shtml"
+    # 标题过短、非新浪域名、不是字典的条目都丢弃
+    assert SinaFeedDiscovery.to_article(feed_item(3, title="<i>短</i>")) is None
+    assert SinaFeedDiscovery.to_article(feed_item(4, url="https://example.com/doc-4.shtml")) is None
+    assert SinaFeedDiscovery.to_article("not an item") is None
+
+
+@pytest.mark.parametrize('jsonp', [True, False])
+def test_pages_until_empty_page(feed_server, jsonp):
+    server = feed_server([[feed_item(n) for n in range(0, 3)],
+                          [feed_item(n) for n in range(3, 5)]], jsonp=jsonp)
+    feed = SinaFeedDiscovery(feed_url=server.url, page_size=3)
+
+    batches = list(feed.iter_batches(target_count=100))
+
+    assert [len(batch) for batch in batches] == [3, 2]
+    # 第3页为空页，请求后停止
+    assert server.requested == [1, 2, 3]
+    assert set(batches[0][0]) == {'title', 'link', 'time'}
+
+
+def test_stops_at_target_count(feed_server):
+    server = feed_server([[feed_item(n) for n in range(0, 3)],
+                          [feed_item(n) for n in range(3, 6)]])
+    feed = SinaFeedDiscovery(feed_url=server.url, page_size=3)
+
+    articles = list(feed.iter_articles(target_count=4))
+
+    assert len(articles) == 4
+    assert server.requested == [1, 2]
+
+
+def test_dedup_across_pages_and_filters(feed_server):
+    server = feed_server([
+        [feed_item(1), feed_item(2), feed_item(3, title="太短"), feed_item(4, url="https://example.com/x")],
+        [feed_item(2), feed_item(5)],
+    ])
+    feed = SinaFeedDiscovery(feed_url=server.url)
+
+    links = [article['link'] for article in feed.iter_articles(target_count=100)]
+
+    assert [link.rsplit('-', 1)[1] for link in links] == ['0001.shtml', '0002.shtml', '0005.shtml']
+
+
+def test_skips_articles_in_seen_index(feed_server, tmp_path):
+    server = feed_server([[feed_item(n) for n in range(1, 5)]])
+    with SeenIndex(str(tmp_path / "seen.db"), expected_items=1000) as seen_index:
+        seen_index.add(feed_item(1)['url'], 'text')
+        seen_index.add(feed_item(2)['url'], 'image_article')
+        feed = SinaFeedDiscovery(feed_url=server.url, seen_index=seen_index, seen_kind='text')
+
+        links = [article['link'] for article in feed.iter_articles(target_count=2)]
+
+    # 已处理的文章不计入目标数量，其他类型的记录不影响
+    assert links == [feed_item(2)['url'], feed_item(3)['url']]